@@ -0,0 +1,32 @@
+"""add waitlist priority ordering index
+
+Revision ID: 0003_waitlist_priority_index
+Revises: 0002_add_drops_waitlist
+Create Date: 2026-10-18 09:00:00
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_waitlist_priority_index"
+down_revision: Union[str, None] = "0002_add_drops_waitlist"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_waitlist_entries_drop_state_priority",
+        "waitlist_entries",
+        ["drop_id", "state", sa.text("priority_score DESC"), "joined_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_waitlist_entries_drop_state_priority", table_name="waitlist_entries")
@@ -0,0 +1,33 @@
+"""add drop listing indexes
+
+Revision ID: 0004_drop_listing_indexes
+Revises: 0003_waitlist_priority_index
+Create Date: 2026-10-18 10:30:00
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_drop_listing_indexes"
+down_revision: Union[str, None] = "0003_waitlist_priority_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_drops_active_window",
+        "drops",
+        ["is_active", "claim_window_start", "id"],
+        unique=False,
+    )
+    op.create_index("ix_drops_created_at_id", "drops", ["created_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_drops_created_at_id", table_name="drops")
+    op.drop_index("ix_drops_active_window", table_name="drops")
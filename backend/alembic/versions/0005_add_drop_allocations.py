@@ -0,0 +1,43 @@
+"""add drop allocations
+
+Revision ID: 0005_drop_allocations
+Revises: 0004_drop_listing_indexes
+Create Date: 2026-10-18 12:00:00
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_drop_allocations"
+down_revision: Union[str, None] = "0004_drop_listing_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("drops", sa.Column("settled_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_table(
+        "drop_allocations",
+        sa.Column("drop_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("entry_id", sa.Integer(), nullable=False),
+        sa.Column("rank", sa.Integer(), nullable=False),
+        sa.Column("claim_code", sa.String(length=64), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["drop_id"], ["drops.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["entry_id"], ["waitlist_entries.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("drop_id", "user_id"),
+        sa.UniqueConstraint("entry_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("drop_allocations")
+    op.drop_column("drops", "settled_at")
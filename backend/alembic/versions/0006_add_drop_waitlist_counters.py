@@ -0,0 +1,48 @@
+"""add drop waitlist counters
+
+Revision ID: 0006_drop_waitlist_counters
+Revises: 0005_drop_allocations
+Create Date: 2026-10-18 13:00:00
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_drop_waitlist_counters"
+down_revision: Union[str, None] = "0005_drop_allocations"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "drops",
+        sa.Column("joined_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "drops",
+        sa.Column("claimed_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.execute(
+        """
+        UPDATE drops SET
+            joined_count = (
+                SELECT COUNT(*) FROM waitlist_entries
+                WHERE waitlist_entries.drop_id = drops.id AND waitlist_entries.state = 'joined'
+            ),
+            claimed_count = (
+                SELECT COUNT(*) FROM waitlist_entries
+                WHERE waitlist_entries.drop_id = drops.id AND waitlist_entries.state = 'claimed'
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("drops", "claimed_count")
+    op.drop_column("drops", "joined_count")
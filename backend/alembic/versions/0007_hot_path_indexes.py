@@ -0,0 +1,59 @@
+"""rework waitlist and drop hot-path indexes
+
+Revision ID: 0007_hot_path_indexes
+Revises: 0006_drop_waitlist_counters
+Create Date: 2026-10-18 15:00:00
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_hot_path_indexes"
+down_revision: Union[str, None] = "0006_drop_waitlist_counters"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Primary keys are indexed already, drop_id leads
+# ix_waitlist_entries_drop_state_priority and user_id leads uq_waitlist_user_drop.
+REDUNDANT_INDEXES = (
+    ("ix_users_id", "users", ["id"]),
+    ("ix_drops_id", "drops", ["id"]),
+    ("ix_waitlist_entries_id", "waitlist_entries", ["id"]),
+    ("ix_waitlist_entries_drop_id", "waitlist_entries", ["drop_id"]),
+    ("ix_waitlist_entries_user_id", "waitlist_entries", ["user_id"]),
+)
+
+
+def upgrade() -> None:
+    claim_code_set = sa.text("claim_code IS NOT NULL")
+    op.create_index(
+        "ix_waitlist_entries_claim_code",
+        "waitlist_entries",
+        ["claim_code"],
+        unique=False,
+        sqlite_where=claim_code_set,
+        postgresql_where=claim_code_set,
+    )
+    unsettled = sa.text("settled_at IS NULL")
+    op.create_index(
+        "ix_drops_unsettled_window",
+        "drops",
+        ["is_active", "claim_window_start"],
+        unique=False,
+        sqlite_where=unsettled,
+        postgresql_where=unsettled,
+    )
+    for name, table, _ in REDUNDANT_INDEXES:
+        op.drop_index(name, table_name=table)
+
+
+def downgrade() -> None:
+    for name, table, columns in reversed(REDUNDANT_INDEXES):
+        op.create_index(name, table, columns, unique=False)
+    op.drop_index("ix_drops_unsettled_window", table_name="drops")
+    op.drop_index("ix_waitlist_entries_claim_code", table_name="waitlist_entries")
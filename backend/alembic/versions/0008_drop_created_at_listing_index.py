@@ -0,0 +1,27 @@
+"""drop the created_at listing index
+
+Revision ID: 0008_drop_created_at_index
+Revises: 0007_hot_path_indexes
+Create Date: 2026-10-18 18:00:00
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_drop_created_at_index"
+down_revision: Union[str, None] = "0007_hot_path_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The admin listing pages on the primary key now.
+    op.drop_index("ix_drops_created_at_id", table_name="drops")
+
+
+def downgrade() -> None:
+    op.create_index("ix_drops_created_at_id", "drops", ["created_at", "id"], unique=False)
@@ -1,22 +1,31 @@
 from __future__ import annotations
 
-from fastapi import Depends, HTTPException, status
+import math
+from collections.abc import Awaitable, Callable
+
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, schemas
 from app.core.config import settings
+from app.core.rate_limit import rate_limited_requests, rate_limiter
 from app.db.session import get_db
+from app.services.principal_cache import principal_cache
 
 reusable_oauth = HTTPBearer(auto_error=True)
+optional_oauth = HTTPBearer(auto_error=False)
 
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(reusable_oauth),
     session: AsyncSession = Depends(get_db),
-):
-    token = credentials.credentials
+) -> schemas.UserPrincipal:
+    return await _resolve_principal(credentials.credentials, session)
+
+
+async def _resolve_principal(token: str, session: AsyncSession) -> schemas.UserPrincipal:
     try:
         payload = jwt.decode(
             token, settings.secret_key, algorithms=[settings.algorithm]
@@ -32,17 +41,20 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token subject missing",
         )
-    user = await crud.get_user_by_email(session, token_data.sub)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-        )
-    return user
+    principal = principal_cache.get(token_data.sub)
+    if principal is None:
+        principal = await crud.get_user_principal(session, token_data.sub)
+        if not principal:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
+        principal_cache.set(token_data.sub, principal)
+    return principal
 
 
 async def get_current_active_user(
-    current_user=Depends(get_current_user),
+    current_user: schemas.UserPrincipal = Depends(get_current_user),
 ):
     if not current_user.is_active:
         raise HTTPException(
@@ -53,7 +65,7 @@ async def get_current_active_user(
 
 
 async def get_current_admin_user(
-    current_user=Depends(get_current_active_user),
+    current_user: schemas.UserPrincipal = Depends(get_current_active_user),
 ):
     if not current_user.is_admin:
         raise HTTPException(
@@ -62,3 +74,66 @@ async def get_current_admin_user(
         )
     return current_user
 
+
+async def get_stream_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(optional_oauth),
+    access_token: str | None = Query(default=None),
+    session: AsyncSession = Depends(get_db),
+) -> schemas.UserPrincipal:
+    """Like ``get_current_active_user``, also accepting ``?access_token=``.
+
+    Browsers' ``EventSource`` cannot send an Authorization header.
+    """
+    token = credentials.credentials if credentials else access_token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+        )
+    return await get_current_active_user(await _resolve_principal(token, session))
+
+
+def _check_budget(route: str, scope: str, key: str, budget: str | None) -> None:
+    if budget is None:
+        return
+    retry_after = rate_limiter.acquire(f"{route}|{scope}|{key}", budget)
+    if retry_after:
+        rate_limited_requests.inc(route, scope)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please slow down",
+            headers={"Retry-After": str(max(math.ceil(retry_after), 1))},
+        )
+
+
+def _client_address(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit(route: str) -> Callable[..., Awaitable[None]]:
+    """Per-IP and per-user token buckets for ``route``, as set in ``settings``."""
+
+    async def dependency(
+        request: Request,
+        current_user: schemas.UserPrincipal = Depends(get_current_active_user),
+    ) -> None:
+        if not settings.rate_limit_enabled:
+            return
+        _check_budget(route, "ip", _client_address(request), settings.rate_limit_ip_budgets.get(route))
+        _check_budget(
+            route, "user", str(current_user.id), settings.rate_limit_user_budgets.get(route)
+        )
+
+    return dependency
+
+
+def ip_rate_limit(route: str) -> Callable[..., Awaitable[None]]:
+    """Per-IP token bucket for unauthenticated ``route``s such as login."""
+
+    async def dependency(request: Request) -> None:
+        if settings.rate_limit_enabled:
+            _check_budget(
+                route, "ip", _client_address(request), settings.rate_limit_ip_budgets.get(route)
+            )
+
+    return dependency
@@ -1,22 +1,70 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, schemas
 from app.api.deps import get_current_admin_user
+from app.core.dates import as_utc
+from app.core.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+)
 from app.db.session import get_db
-from app.models.user import User
+from app.services.allocation import AllocationService
+from app.services.drop_catalog import drop_list_snapshot
+from app.services.drop_events import drop_events
+from app.services.ranking import waitlist_rankings
+from app.services.waiting_room import waiting_room
+from app.services.waitlist import BULK_CHUNK_SIZE, WaitlistService
 
 router = APIRouter()
 
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+
+def _comparable(value: Any) -> Any:
+    # SQLite reads datetimes back naive; payload values are timezone aware.
+    return as_utc(value) if isinstance(value, datetime) else value
+
 
 @router.get("", response_model=list[schemas.DropRead])
 async def admin_list_drops(
-    _: User = Depends(get_current_admin_user),
+    response: Response,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    phase: schemas.DropPhase | None = None,
+    is_active: bool | None = None,
+    _: schemas.UserPrincipal = Depends(get_current_admin_user),
     session: AsyncSession = Depends(get_db),
 ) -> list[schemas.DropRead]:
-    drops = await crud.get_drops(session)
+    try:
+        after_id = decode_cursor(cursor)[1] if cursor else None
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    drops = list(
+        await crud.get_drops(
+            session,
+            limit=limit + 1,
+            after_id=after_id,
+            phase=phase,
+            is_active=is_active,
+        )
+    )
+    if len(drops) > limit:
+        drops = drops[:limit]
+        last = drops[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
     return [schemas.DropRead.model_validate(drop) for drop in drops]
 
 
@@ -27,11 +75,12 @@ async def admin_list_drops(
 )
 async def admin_create_drop(
     payload: schemas.DropCreate,
-    _: User = Depends(get_current_admin_user),
+    _: schemas.UserPrincipal = Depends(get_current_admin_user),
     session: AsyncSession = Depends(get_db),
 ) -> schemas.DropRead:
     drop = await crud.create_drop(session, payload)
     await session.commit()
+    drop_list_snapshot.invalidate()
     return schemas.DropRead.model_validate(drop)
 
 
@@ -42,14 +91,30 @@ async def admin_create_drop(
 async def admin_update_drop(
     drop_id: int,
     payload: schemas.DropUpdate,
-    _: User = Depends(get_current_admin_user),
+    _: schemas.UserPrincipal = Depends(get_current_admin_user),
     session: AsyncSession = Depends(get_db),
 ) -> schemas.DropRead:
     drop = await crud.get_drop(session, drop_id)
     if not drop:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Drop not found")
+    changed = {
+        field
+        for field, value in payload.model_dump(exclude_unset=True).items()
+        if _comparable(getattr(drop, field)) != _comparable(value)
+    }
     drop = await crud.update_drop(session, drop, payload)
+    if "capacity" in changed:
+        # The score's base term depends on capacity; rescore before the
+        # allocation is rebalanced or refilled from the new order.
+        await WaitlistService(session).rescore_drop(drop=drop)
+    await AllocationService(session).apply_drop_update(drop, changed=changed)
     await session.commit()
+    if not drop.is_active:
+        waiting_room.invalidate(drop.id)
+    elif changed & {"claim_window_start", "claim_window_end"}:
+        waiting_room.reschedule(drop)
+    drop_list_snapshot.invalidate()
+    drop_events.notify(drop.id)
     return schemas.DropRead.model_validate(drop)
 
 
@@ -60,7 +125,7 @@ async def admin_update_drop(
 )
 async def admin_delete_drop(
     drop_id: int,
-    _: User = Depends(get_current_admin_user),
+    _: schemas.UserPrincipal = Depends(get_current_admin_user),
     session: AsyncSession = Depends(get_db),
 ) -> Response:
     drop = await crud.get_drop(session, drop_id)
@@ -68,5 +133,183 @@ async def admin_delete_drop(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Drop not found")
     await crud.delete_drop(session, drop)
     await session.commit()
+    waitlist_rankings.invalidate(drop_id)
+    waiting_room.invalidate(drop_id)
+    drop_list_snapshot.invalidate()
+    drop_events.notify(drop_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
+
+@router.post(
+    "/{drop_id}/settle",
+    response_model=schemas.DropSettlement,
+)
+async def admin_settle_drop(
+    drop_id: int,
+    _: schemas.UserPrincipal = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_db),
+) -> schemas.DropSettlement:
+    """Re-run settlement now, replacing any unclaimed allocation."""
+    drop = await crud.get_drop(session, drop_id)
+    if not drop:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Drop not found")
+    service = AllocationService(session)
+    await service.settle(drop, force=True)
+    allocated = (await crud.get_allocation_summary(session, drop_id=drop_id))[0]
+    await session.commit()
+    drop_events.notify(drop_id)
+    return schemas.DropSettlement(drop_id=drop_id, settled_at=drop.settled_at, allocated=allocated)
+
+
+@router.post(
+    "/{drop_id}/rescore",
+    response_model=schemas.WaitlistRescoreResult,
+)
+async def admin_rescore_drop(
+    drop_id: int,
+    _: schemas.UserPrincipal = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_db),
+) -> schemas.WaitlistRescoreResult:
+    drop = await crud.get_drop(session, drop_id)
+    if not drop:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Drop not found")
+    rescored = await WaitlistService(session).rescore_drop(drop=drop)
+    await session.commit()
+    drop_events.notify(drop_id)
+    return schemas.WaitlistRescoreResult(drop_id=drop_id, rescored=rescored)
+
+
+@router.post(
+    "/{drop_id}/ranking/verify",
+    response_model=schemas.WaitlistRankingCheck,
+)
+async def admin_verify_ranking(
+    drop_id: int,
+    _: schemas.UserPrincipal = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_db),
+) -> schemas.WaitlistRankingCheck:
+    drop = await crud.get_drop(session, drop_id)
+    if not drop:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Drop not found")
+    consistent = await waitlist_rankings.verify(session, drop_id)
+    ranking = waitlist_rankings.get(drop_id)
+    return schemas.WaitlistRankingCheck(
+        drop_id=drop_id,
+        consistent=consistent,
+        size=len(ranking) if ranking is not None else 0,
+    )
+
+
+@router.get(
+    "/{drop_id}/claims/{claim_code}",
+    response_model=schemas.WaitlistEntryRead,
+)
+async def admin_lookup_claim(
+    drop_id: int,
+    claim_code: str,
+    _: schemas.UserPrincipal = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_db),
+) -> schemas.WaitlistEntryRead:
+    """Check a claim code presented at redemption."""
+    entry = await crud.get_waitlist_entry_by_claim_code(
+        session,
+        drop_id=drop_id,
+        claim_code=claim_code.upper(),
+    )
+    if not entry or entry.state != "claimed":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Claim not found")
+    return schemas.WaitlistEntryRead.model_validate(entry)
+
+
+def _parse_reference(value: object) -> int | str | None:
+    if isinstance(value, dict):
+        value = value.get("user_id", value.get("email"))
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and "@" in value:
+        return value.strip().lower()
+    return None
+
+
+async def _iter_ndjson_references(request: Request) -> AsyncIterator[int | str | None]:
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_ndjson_line(line)
+    if buffer.strip():
+        yield _parse_ndjson_line(buffer)
+
+
+def _parse_ndjson_line(line: bytes) -> int | str | None:
+    try:
+        return _parse_reference(json.loads(line))
+    except ValueError:
+        return None
+
+
+@router.post(
+    "/{drop_id}/waitlist/bulk",
+    response_model=schemas.BulkJoinResponse,
+)
+async def admin_bulk_join_waitlist(
+    drop_id: int,
+    request: Request,
+    _: schemas.UserPrincipal = Depends(get_current_admin_user),
+    session: AsyncSession = Depends(get_db),
+) -> schemas.BulkJoinResponse:
+    """Enrol users by id or email.
+
+    Accepts a JSON ``BulkJoinRequest`` body, or an NDJSON stream with one
+    user id, email, ``{"user_id": ...}`` or ``{"email": ...}`` per line. Each
+    chunk is committed as it is processed.
+    """
+    drop = await crud.get_drop(session, drop_id)
+    if not drop:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Drop not found")
+
+    service = WaitlistService(session)
+    results: list[schemas.BulkJoinRowResult] = []
+
+    async def flush(references: list[int | str | None]) -> None:
+        valid = [ref for ref in references if ref is not None]
+        processed = iter(await service.bulk_join_waitlist(drop=drop, references=valid))
+        await session.commit()
+        drop_events.notify(drop_id)
+        for ref in references:
+            if ref is None:
+                results.append(schemas.BulkJoinRowResult(status="invalid"))
+            else:
+                results.append(schemas.BulkJoinRowResult.model_validate(next(processed)))
+
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if media_type in NDJSON_MEDIA_TYPES:
+        pending: list[int | str | None] = []
+        async for reference in _iter_ndjson_references(request):
+            pending.append(reference)
+            if len(pending) >= BULK_CHUNK_SIZE:
+                await flush(pending)
+                pending = []
+        if pending:
+            await flush(pending)
+    else:
+        try:
+            payload = schemas.BulkJoinRequest.model_validate_json(await request.body())
+        except ValidationError as exc:
+            raise RequestValidationError(exc.errors()) from exc
+        references: list[int | str | None] = [*payload.user_ids, *payload.emails]
+        for start in range(0, len(references), BULK_CHUNK_SIZE):
+            await flush(references[start : start + BULK_CHUNK_SIZE])
+
+    created = sum(1 for result in results if result.status == WaitlistService.BULK_CREATED)
+    rejoined = sum(1 for result in results if result.status == WaitlistService.BULK_REJOINED)
+    return schemas.BulkJoinResponse(
+        results=results,
+        created=created,
+        rejoined=rejoined,
+        skipped=len(results) - created - rejoined,
+    )
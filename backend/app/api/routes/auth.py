@@ -4,16 +4,27 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, schemas
-from app.core.security import create_access_token
+from app.api.deps import ip_rate_limit
+from app.core.security import HashingOverloadedError, create_access_token
 from app.db.session import get_db
+from app.services.principal_cache import principal_cache
 
 router = APIRouter()
 
 
+def _hashing_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post(
     "/signup",
     status_code=status.HTTP_201_CREATED,
     response_model=schemas.AuthResponse,
+    dependencies=[Depends(ip_rate_limit("signup"))],
 )
 async def signup(
     payload: schemas.UserCreate,
@@ -25,8 +36,12 @@ async def signup(
             status_code=status.HTTP_409_CONFLICT,
             detail="Email already registered",
         )
-    user = await crud.create_user(session, user_in=payload)
+    try:
+        user = await crud.create_user(session, user_in=payload)
+    except HashingOverloadedError as exc:
+        raise _hashing_unavailable() from exc
     await session.commit()
+    principal_cache.set(user.email, schemas.UserPrincipal.model_validate(user))
     token = schemas.Token(access_token=create_access_token(user.email))
     return schemas.AuthResponse(
         token=token,
@@ -37,21 +52,26 @@ async def signup(
 @router.post(
     "/login",
     response_model=schemas.AuthResponse,
+    dependencies=[Depends(ip_rate_limit("login"))],
 )
 async def login(
     payload: schemas.UserLogin,
     session: AsyncSession = Depends(get_db),
 ) -> schemas.AuthResponse:
-    user = await crud.authenticate_user(
-        session,
-        email=payload.email,
-        password=payload.password,
-    )
+    try:
+        user = await crud.authenticate_user(
+            session,
+            email=payload.email,
+            password=payload.password,
+        )
+    except HashingOverloadedError as exc:
+        raise _hashing_unavailable() from exc
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
+    principal_cache.set(user.email, schemas.UserPrincipal.model_validate(user))
     token = schemas.Token(access_token=create_access_token(user.email))
     return schemas.AuthResponse(
         token=token,
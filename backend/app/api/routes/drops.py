@@ -1,43 +1,98 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+import math
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, schemas
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, get_stream_user, rate_limit
+from app.core.config import settings
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor
 from app.db.session import get_db
-from app.models.user import User
-from app.services.waitlist import WaitlistService
+from app.models.drop import Drop
+from app.services.drop_catalog import build_drop_list_page, drop_list_snapshot
+from app.services.drop_events import drop_events
+from app.services.group_commit import waitlist_pipeline
+from app.services.waiting_room import (
+    QUEUE_TICKET_HEADER,
+    ClaimSlotsBusyError,
+    InvalidTicketError,
+    QueueTicket,
+    waiting_room,
+)
+from app.services.waitlist import CapacityExceededError, WaitlistService
 
 router = APIRouter()
 
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip() for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
 @router.get("", response_model=list[schemas.DropRead])
-async def list_active_drops(session: AsyncSession = Depends(get_db)) -> list[schemas.DropRead]:
-    drops = await crud.get_active_drops(session)
-    return [schemas.DropRead.model_validate(drop) for drop in drops]
+async def list_active_drops(
+    request: Request,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    phase: schemas.DropPhase | None = None,
+    session: AsyncSession = Depends(get_db),
+) -> Response:
+    try:
+        if phase is None:
+            page = await drop_list_snapshot.get_page(session, limit=limit, cursor=cursor)
+        else:
+            page = await build_drop_list_page(
+                session,
+                limit=limit,
+                after=decode_cursor(cursor) if cursor else None,
+                phase=phase,
+            )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    headers = {
+        "ETag": page.etag,
+        "Cache-Control": f"public, max-age={settings.drop_list_max_age_seconds}, must-revalidate",
+    }
+    if page.next_cursor:
+        headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if _etag_matches(request.headers.get("if-none-match"), page.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=page.body, media_type="application/json", headers=headers)
 
 
 @router.post(
     "/{drop_id}/join",
     response_model=schemas.WaitlistJoinResponse,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(rate_limit("join"))],
 )
 async def join_waitlist(
     drop_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: schemas.UserPrincipal = Depends(get_current_active_user),
     session: AsyncSession = Depends(get_db),
 ) -> schemas.WaitlistJoinResponse:
     drop = await crud.get_drop(session, drop_id)
     if not drop or not drop.is_active:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Drop not found")
 
-    service = WaitlistService(session)
-    entry, created = await service.join_waitlist(
-        user=current_user,
-        drop=drop,
-    )
-    await session.commit()
+    if settings.waitlist_group_commit_enabled:
+        entry, created = await waitlist_pipeline.join(user=current_user, drop=drop)
+    else:
+        service = WaitlistService(session)
+        entry, created = await service.join_waitlist(
+            user=current_user,
+            drop=drop,
+        )
+        await session.commit()
+    drop_events.notify(drop_id)
 
     return schemas.WaitlistJoinResponse(
         entry=schemas.WaitlistEntryRead.model_validate(entry),
@@ -48,19 +103,24 @@ async def join_waitlist(
 @router.post(
     "/{drop_id}/leave",
     response_model=schemas.WaitlistLeaveResponse,
+    dependencies=[Depends(rate_limit("leave"))],
 )
 async def leave_waitlist(
     drop_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: schemas.UserPrincipal = Depends(get_current_active_user),
     session: AsyncSession = Depends(get_db),
 ) -> schemas.WaitlistLeaveResponse:
     drop = await crud.get_drop(session, drop_id)
     if not drop or not drop.is_active:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Drop not found")
 
-    service = WaitlistService(session)
-    entry = await service.leave_waitlist(user=current_user, drop=drop)
-    await session.commit()
+    if settings.waitlist_group_commit_enabled:
+        entry = await waitlist_pipeline.leave(user=current_user, drop=drop)
+    else:
+        service = WaitlistService(session)
+        entry = await service.leave_waitlist(user=current_user, drop=drop)
+        await session.commit()
+    drop_events.notify(drop_id)
 
     return schemas.WaitlistLeaveResponse(
         success=True,
@@ -68,19 +128,132 @@ async def leave_waitlist(
     )
 
 
+def _queue_status(ticket: QueueTicket, opens_at: float) -> schemas.QueueStatus:
+    admission = waiting_room.admission(ticket, opens_at=opens_at)
+    return schemas.QueueStatus(
+        drop_id=ticket.drop_id,
+        position=ticket.sequence,
+        admitted=admission.admitted,
+        ahead=admission.ahead,
+        retry_after_seconds=round(admission.retry_after, 3),
+    )
+
+
+def _retry_after(seconds: float) -> dict[str, str]:
+    return {"Retry-After": str(max(math.ceil(seconds), 1))}
+
+
+@router.post(
+    "/{drop_id}/queue",
+    response_model=schemas.QueueTicketResponse,
+    dependencies=[Depends(rate_limit("queue"))],
+)
+async def enter_waiting_room(
+    drop_id: int,
+    current_user: schemas.UserPrincipal = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_db),
+) -> schemas.QueueTicketResponse:
+    drop = await crud.get_drop(session, drop_id)
+    if not drop or not drop.is_active:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Drop not found")
+    # Only entrants get a place, so other accounts cannot push them back.
+    entry = await crud.get_waitlist_entry(session, user_id=current_user.id, drop_id=drop_id)
+    if not entry or entry.state != WaitlistService.JOINED_STATE:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Join the waitlist before entering the queue",
+        )
+    token, ticket = waiting_room.issue(drop=drop, user_id=current_user.id)
+    queue_status = _queue_status(ticket, waiting_room.opens_at(drop.id))
+    return schemas.QueueTicketResponse(ticket=token, **queue_status.model_dump())
+
+
+@router.get(
+    "/{drop_id}/queue",
+    response_model=schemas.QueueStatus,
+)
+async def waiting_room_status(
+    drop_id: int,
+    response: Response,
+    ticket: str | None = Query(default=None),
+    ticket_header: str | None = Header(default=None, alias=QUEUE_TICKET_HEADER),
+    session: AsyncSession = Depends(get_db),
+) -> schemas.QueueStatus:
+    """Admission status of a queue ticket.
+
+    Needs no login, and reads the drop only when this worker has not seen
+    its claim window yet.
+    """
+    try:
+        decoded = waiting_room.verify(ticket or ticket_header or "", drop_id=drop_id)
+    except InvalidTicketError as exc:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
+    opens_at = waiting_room.opens_at(drop_id)
+    if opens_at is None:
+        drop = await crud.get_drop(session, drop_id)
+        if not drop:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Drop not found")
+        opens_at, _ = waiting_room.reschedule(drop)
+    queue_status = _queue_status(decoded, opens_at)
+    response.headers["Cache-Control"] = "no-store"
+    if not queue_status.admitted:
+        response.headers.update(_retry_after(queue_status.retry_after_seconds))
+    return queue_status
+
+
 @router.post(
     "/{drop_id}/claim",
     response_model=schemas.ClaimResponse,
+    dependencies=[Depends(rate_limit("claim"))],
 )
 async def claim_drop(
     drop_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: schemas.UserPrincipal = Depends(get_current_active_user),
     session: AsyncSession = Depends(get_db),
+    queue_ticket: str | None = Header(default=None, alias=QUEUE_TICKET_HEADER),
 ) -> schemas.ClaimResponse:
+    ticket = None
+    if settings.waiting_room_enabled:
+        # Rejected here, before the claim path touches the database.
+        try:
+            ticket = waiting_room.verify(
+                queue_ticket or "", drop_id=drop_id, user_id=current_user.id
+            )
+        except InvalidTicketError as exc:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
+
     drop = await crud.get_drop(session, drop_id)
     if not drop:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Drop not found")
+    if ticket is None:
+        return await _claim_drop(drop, current_user, session)
+
+    # Admission follows the drop's current window, which may have moved
+    # since the ticket was issued.
+    opens_at, _ = waiting_room.reschedule(drop)
+    admission = waiting_room.admission(ticket, opens_at=opens_at)
+    if not admission.admitted:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Queue ticket is not admitted yet",
+            headers=_retry_after(admission.retry_after),
+        )
+    try:
+        async with waiting_room.claim_slot(drop_id):
+            return await _claim_drop(drop, current_user, session)
+    except ClaimSlotsBusyError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers=_retry_after(1),
+        ) from exc
 
+
+async def _claim_drop(
+    drop: Drop,
+    current_user: schemas.UserPrincipal,
+    session: AsyncSession,
+) -> schemas.ClaimResponse:
     service = WaitlistService(session)
     try:
         entry, position = await service.claim_waitlist_entry(user=current_user, drop=drop)
@@ -89,15 +262,22 @@ async def claim_drop(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=str(exc),
         ) from exc
+    except CapacityExceededError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(exc),
+        ) from exc
     except PermissionError as exc:
-        message = str(exc)
-        status_code = status.HTTP_409_CONFLICT if "Capacity" in message else status.HTTP_403_FORBIDDEN
         raise HTTPException(
-            status_code=status_code,
-            detail=message,
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(exc),
         ) from exc
 
     await session.commit()
+    # Remaining stock is part of the listing; claims are bounded by capacity,
+    # so this invalidates far less often than joins would.
+    drop_list_snapshot.invalidate()
+    drop_events.notify(drop.id)
 
     if not entry.claim_code or not entry.claimed_at:
         raise HTTPException(
@@ -112,4 +292,40 @@ async def claim_drop(
     )
 
 
+@router.get("/{drop_id}/events")
+async def stream_drop_events(
+    drop_id: int,
+    current_user: schemas.UserPrincipal = Depends(get_stream_user),
+    session: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    """Server-sent events with the caller's position, eligibility and stock.
 
+    Browsers' ``EventSource`` cannot set headers, so the token may also be
+    passed as ``?access_token=``. An ``update`` event is sent on connect and
+    after every change (bursts are coalesced); the stream ends after a
+    ``closed`` update when the drop is removed or deactivated.
+    """
+    drop = await crud.get_drop(session, drop_id)
+    if not drop or not drop.is_active:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Drop not found")
+
+    async def events() -> AsyncIterator[str]:
+        subscription = drop_events.subscribe(drop_id, current_user.id)
+        try:
+            # Starlette cancels this generator when the client disconnects.
+            while True:
+                update = await subscription.next(settings.drop_events_heartbeat_seconds)
+                if update is None:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: update\ndata: {json.dumps(update)}\n\n"
+                if update["phase"] == "closed":
+                    break
+        finally:
+            drop_events.unsubscribe(drop_id, subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import secrets
 from functools import lru_cache
-from typing import Any, List
+from typing import Any, Dict, List, Literal
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -30,6 +30,149 @@ class Settings(BaseSettings):
         validation_alias="SYNC_DATABASE_URL",
     )
 
+    db_pool_size: int = Field(default=10, validation_alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, validation_alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(default=30.0, validation_alias="DB_POOL_TIMEOUT")
+    db_pool_recycle: int = Field(default=1800, validation_alias="DB_POOL_RECYCLE")
+    db_pool_pre_ping: bool = Field(default=True, validation_alias="DB_POOL_PRE_PING")
+    db_pool_warmup: int | None = Field(default=None, validation_alias="DB_POOL_WARMUP")
+    # asyncpg prepared statement cache per connection; 0 behind PgBouncer.
+    db_statement_cache_size: int = Field(
+        default=100, validation_alias="DB_STATEMENT_CACHE_SIZE"
+    )
+
+    # Only used when database_url is SQLite.
+    sqlite_journal_mode: str = Field(default="WAL", validation_alias="SQLITE_JOURNAL_MODE")
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = Field(
+        default="NORMAL", validation_alias="SQLITE_SYNCHRONOUS"
+    )
+    sqlite_busy_timeout_ms: int = Field(
+        default=5000, validation_alias="SQLITE_BUSY_TIMEOUT_MS"
+    )
+    sqlite_mmap_size: int = Field(
+        default=256 * 1024 * 1024, validation_alias="SQLITE_MMAP_SIZE"
+    )
+    # Negative values are KiB, as in PRAGMA cache_size.
+    sqlite_cache_size: int = Field(default=-64_000, validation_alias="SQLITE_CACHE_SIZE")
+    sqlite_single_writer: bool = Field(
+        default=True, validation_alias="SQLITE_SINGLE_WRITER"
+    )
+
+    password_hash_executor: Literal["thread", "process"] = Field(
+        default="thread", validation_alias="PASSWORD_HASH_EXECUTOR"
+    )
+    password_hash_workers: int = Field(
+        default=4, validation_alias="PASSWORD_HASH_WORKERS"
+    )
+    password_hash_max_pending: int = Field(
+        default=64, validation_alias="PASSWORD_HASH_MAX_PENDING"
+    )
+
+    auth_cache_max_size: int = Field(
+        default=10_000, validation_alias="AUTH_CACHE_MAX_SIZE"
+    )
+    auth_cache_ttl_seconds: float = Field(
+        default=30.0, validation_alias="AUTH_CACHE_TTL_SECONDS"
+    )
+
+    waitlist_ranking_enabled: bool = Field(
+        default=True, validation_alias="WAITLIST_RANKING_ENABLED"
+    )
+    waitlist_ranking_ttl_seconds: float = Field(
+        default=30.0, validation_alias="WAITLIST_RANKING_TTL_SECONDS"
+    )
+
+    drop_allocation_enabled: bool = Field(
+        default=True, validation_alias="DROP_ALLOCATION_ENABLED"
+    )
+    drop_allocation_interval_seconds: float = Field(
+        default=1.0, validation_alias="DROP_ALLOCATION_INTERVAL_SECONDS"
+    )
+
+    waitlist_group_commit_enabled: bool = Field(
+        default=False, validation_alias="WAITLIST_GROUP_COMMIT_ENABLED"
+    )
+    waitlist_group_commit_max_batch: int = Field(
+        default=100, validation_alias="WAITLIST_GROUP_COMMIT_MAX_BATCH"
+    )
+    waitlist_group_commit_max_wait_seconds: float = Field(
+        default=0.005, validation_alias="WAITLIST_GROUP_COMMIT_MAX_WAIT_SECONDS"
+    )
+
+    waiting_room_enabled: bool = Field(default=False, validation_alias="WAITING_ROOM_ENABLED")
+    # Queues live in process memory, so the rate, burst and concurrency below
+    # are per worker: N workers admit up to N times as many claims. Each
+    # worker also numbers its own tickets, so sequences from different
+    # workers overlap rather than forming one queue; run a single worker (or
+    # sticky routing per drop) when a strict global order matters.
+    waiting_room_admit_per_second: float = Field(
+        default=50.0, validation_alias="WAITING_ROOM_ADMIT_PER_SECOND"
+    )
+    waiting_room_burst: int = Field(default=50, validation_alias="WAITING_ROOM_BURST")
+    waiting_room_max_concurrent_claims: int = Field(
+        default=20, validation_alias="WAITING_ROOM_MAX_CONCURRENT_CLAIMS"
+    )
+
+    drop_events_coalesce_seconds: float = Field(
+        default=0.25, validation_alias="DROP_EVENTS_COALESCE_SECONDS"
+    )
+    drop_events_buffer_size: int = Field(
+        default=8, validation_alias="DROP_EVENTS_BUFFER_SIZE"
+    )
+    drop_events_heartbeat_seconds: float = Field(
+        default=15.0, validation_alias="DROP_EVENTS_HEARTBEAT_SECONDS"
+    )
+
+    drop_list_cache_ttl_seconds: float = Field(
+        default=30.0, validation_alias="DROP_LIST_CACHE_TTL_SECONDS"
+    )
+    drop_list_max_age_seconds: int = Field(
+        default=5, validation_alias="DROP_LIST_MAX_AGE_SECONDS"
+    )
+
+    # Debug aid: per-request SQL counts in an X-Query-Stats response header.
+    query_tracking_enabled: bool = Field(
+        default=False, validation_alias="QUERY_TRACKING_ENABLED"
+    )
+    query_repeat_threshold: int = Field(
+        default=3, validation_alias="QUERY_REPEAT_THRESHOLD"
+    )
+
+    rate_limit_enabled: bool = Field(default=False, validation_alias="RATE_LIMIT_ENABLED")
+    # "<requests>/<seconds>" per route name: the bucket holds <requests>
+    # tokens and refills at <requests>/<seconds> per second.
+    rate_limit_user_budgets: Dict[str, str] = Field(
+        default={"join": "10/60", "leave": "10/60", "claim": "5/10", "queue": "20/60"},
+        validation_alias="RATE_LIMIT_USER_BUDGETS",
+    )
+    rate_limit_ip_budgets: Dict[str, str] = Field(
+        default={
+            "join": "120/60",
+            "leave": "120/60",
+            "claim": "60/10",
+            "queue": "240/60",
+            "signup": "10/60",
+            "login": "30/60",
+        },
+        validation_alias="RATE_LIMIT_IP_BUDGETS",
+    )
+    rate_limit_max_keys: int = Field(default=100_000, validation_alias="RATE_LIMIT_MAX_KEYS")
+
+    load_shed_enabled: bool = Field(default=False, validation_alias="LOAD_SHED_ENABLED")
+    load_shed_max_in_flight: int = Field(default=512, validation_alias="LOAD_SHED_MAX_IN_FLIGHT")
+    load_shed_loop_lag_seconds: float = Field(
+        default=0.25, validation_alias="LOAD_SHED_LOOP_LAG_SECONDS"
+    )
+    load_shed_pool_wait_seconds: float = Field(
+        default=0.5, validation_alias="LOAD_SHED_POOL_WAIT_SECONDS"
+    )
+    load_shed_sample_seconds: float = Field(
+        default=0.5, validation_alias="LOAD_SHED_SAMPLE_SECONDS"
+    )
+    load_shed_retry_after_seconds: int = Field(
+        default=1, validation_alias="LOAD_SHED_RETRY_AFTER_SECONDS"
+    )
+
     cors_allow_origins: List[str] = Field(
         default=["*"], validation_alias="CORS_ALLOW_ORIGINS"
     )
@@ -51,6 +194,15 @@ class Settings(BaseSettings):
             return list(v)
         return ["*"]
 
+    @field_validator("rate_limit_user_budgets", "rate_limit_ip_budgets")
+    @classmethod
+    def validate_rate_budgets(cls, v: Dict[str, str]) -> Dict[str, str]:
+        for name, budget in v.items():
+            requests, _, seconds = budget.partition("/")
+            if not (requests.isdigit() and int(requests) > 0 and float(seconds or 0) > 0):
+                raise ValueError(f"Rate budget for {name!r} must look like '<requests>/<seconds>'")
+        return v
+
     @property
     def sync_database_uri(self) -> str:
         if self.sync_database_url:
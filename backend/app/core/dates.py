@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+
+def as_utc(value: datetime) -> datetime:
+    """``value`` as an aware UTC datetime.
+
+    SQLite reads datetimes back naive; they are stored in UTC, so a naive
+    value is taken to be UTC rather than local time.
+    """
+    if value.tzinfo is None or value.tzinfo.utcoffset(value) is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
@@ -0,0 +1,140 @@
+"""Global load shedding: reject new work early instead of queueing it.
+
+``LoadMonitor`` samples event-loop lag (how late a sleep wakes up) and the
+average connection-pool checkout wait every ``sample_seconds``.
+``LoadSheddingMiddleware`` answers ``503`` with ``Retry-After`` before
+routing when too many requests are already in flight or the last sample
+crossed a threshold. Health and metrics endpoints are never shed, so the
+overload stays observable.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from contextlib import suppress
+
+from sqlalchemy.pool import Pool
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.pool import PoolStats
+
+EXEMPT_PATHS = ("/health", "/metrics")
+# Server-sent event streams stay open for minutes; they are shed when the
+# process is overloaded but do not take an in-flight slot.
+STREAM_SUFFIX = "/events"
+
+requests_shed = metrics.counter(
+    "http_requests_shed_total", "Requests rejected by load shedding.", ("reason",)
+)
+event_loop_lag = metrics.gauge("event_loop_lag_seconds", "Event loop lag at the last sample.")
+
+
+class LoadMonitor:
+    def __init__(self, *, sample_seconds: float):
+        self.sample_seconds = sample_seconds
+        self.loop_lag = 0.0
+        self.pool_wait = 0.0
+        self._pool_totals: tuple[int, float, int] | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self, pool: Pool) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(pool))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self, pool: Pool) -> None:
+        loop = asyncio.get_running_loop()
+        stats: PoolStats | None = getattr(pool, "stats", None)
+        if stats is not None:
+            self.sample_pool(stats)
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.sample_seconds)
+            self.loop_lag = max(loop.time() - started - self.sample_seconds, 0.0)
+            event_loop_lag.set(self.loop_lag)
+            if stats is not None:
+                self.sample_pool(stats)
+
+    def sample_pool(self, stats: PoolStats) -> None:
+        """Average checkout wait since the previous sample."""
+        totals = (stats.checkouts, stats.wait_seconds_total, stats.timeouts)
+        previous, self._pool_totals = self._pool_totals, totals
+        if previous is None:
+            return
+        checkouts, waited, timeouts = (now - before for now, before in zip(totals, previous))
+        # A checkout that timed out waited longer than any threshold.
+        self.pool_wait = float("inf") if timeouts else (waited / checkouts if checkouts else 0.0)
+
+    def overload_reason(self) -> str | None:
+        if self.loop_lag > settings.load_shed_loop_lag_seconds:
+            return "loop_lag"
+        if self.pool_wait > settings.load_shed_pool_wait_seconds:
+            return "pool_wait"
+        return None
+
+    def stats(self) -> dict[str, float]:
+        return {"loop_lag_seconds": self.loop_lag, "pool_wait_seconds": self.pool_wait}
+
+
+load_monitor = LoadMonitor(sample_seconds=settings.load_shed_sample_seconds)
+
+
+class LoadSheddingMiddleware:
+    """Pure ASGI; a no-op unless ``settings.load_shed_enabled``."""
+
+    def __init__(self, app: ASGIApp, monitor: LoadMonitor = load_monitor):
+        self.app = app
+        self.monitor = monitor
+        self.in_flight = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not settings.load_shed_enabled
+            or scope["path"].startswith(EXEMPT_PATHS)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        streaming = scope["path"].endswith(STREAM_SUFFIX)
+        reason = self.monitor.overload_reason()
+        if reason is None and not streaming and 0 < settings.load_shed_max_in_flight <= self.in_flight:
+            reason = "in_flight"
+        if reason is not None:
+            requests_shed.inc(reason)
+            await self._reject(send)
+            return
+        if streaming:
+            await self.app(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    @staticmethod
+    async def _reject(send: Send) -> None:
+        body = json.dumps({"detail": "Server is busy, please retry shortly"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(settings.load_shed_retry_after_seconds).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,294 @@
+"""Prometheus metrics for this worker process (see ``app.core.process``).
+
+Every update happens on the event loop thread, from the ASGI middleware,
+SQLAlchemy cursor events (which the async engine runs inside the loop's
+greenlet) or request handlers, so metrics are plain dict and list updates
+with no locks. ``render`` produces the Prometheus text exposition format.
+"""
+
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator, Sequence
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+UNMATCHED_ROUTE = "<unmatched>"
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def set(self, value: float, *labels: str) -> None:
+        """Mirror a total kept elsewhere, e.g. pool checkout counters."""
+        self._values[labels] = value
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: [per-bucket counts..., +Inf count, sum]. Cumulative
+        # counts are only computed when rendering.
+        self._series: dict[LabelValues, list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def total(self, *labels: str) -> float:
+        series = self._series.get(labels)
+        return series[-1] if series else 0.0
+
+    def samples(self) -> Iterator[str]:
+        names = self.labelnames + ("le",)
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, observed in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += observed
+                le = "+Inf" if bound == float("inf") else _format_value(float(bound))
+                yield f"{self.name}_bucket{_format_labels(names, labels + (le,))} {int(cumulative)}"
+            suffix = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{suffix} {_format_value(series[-1])}"
+            yield f"{self.name}_count{suffix} {int(cumulative)}"
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets=buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Run ``collector`` before each render, to refresh gauges read from elsewhere."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter(
+    "http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status")
+)
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route")
+)
+http_requests_in_flight = metrics.gauge("http_requests_in_flight", "HTTP requests being served.")
+http_request_db_statements = metrics.histogram(
+    "http_request_db_statements",
+    "SQL statements executed per HTTP request.",
+    ("route",),
+    buckets=STATEMENT_BUCKETS,
+)
+http_request_db_duration = metrics.histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per HTTP request.", ("route",)
+)
+db_statements = metrics.counter("db_statements_total", "SQL statements executed.")
+db_statement_duration = metrics.counter(
+    "db_statement_seconds_total", "Time spent executing SQL statements."
+)
+waitlist_outcomes = metrics.counter(
+    "waitlist_operations_total", "Waitlist join/leave/claim outcomes.", ("operation", "outcome")
+)
+waitlist_commit_batch_size = metrics.histogram(
+    "waitlist_commit_batch_size",
+    "Waitlist joins/leaves applied per group commit.",
+    buckets=STATEMENT_BUCKETS,
+)
+
+_request_sql: ContextVar[list[float] | None] = ContextVar("request_sql", default=None)
+_STARTED_KEY = "metrics_statement_started"
+
+
+def instrument_engine(sync_engine: Engine) -> None:
+    """Count and time every statement on ``sync_engine``, also per current request."""
+    if event.contains(sync_engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault(_STARTED_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info[_STARTED_KEY].pop()
+    _record_statement(time.perf_counter() - started)
+
+
+def _handle_error(exception_context) -> None:
+    conn = exception_context.connection
+    if conn is not None and conn.info.get(_STARTED_KEY):
+        _record_statement(time.perf_counter() - conn.info[_STARTED_KEY].pop())
+
+
+def _record_statement(elapsed: float) -> None:
+    db_statements.inc()
+    db_statement_duration.inc(amount=elapsed)
+    current = _request_sql.get()
+    if current is not None:
+        current[0] += 1
+        current[1] += elapsed
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, status and SQL work per route template."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._templates: dict[object, str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        sql = [0, 0.0]
+        token = _request_sql.set(sql)
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec()
+            _request_sql.reset(token)
+            route = self._route_template(scope)
+            method = scope["method"]
+            http_requests.inc(method, route, str(status_code))
+            http_request_duration.observe(elapsed, method, route)
+            http_request_db_statements.observe(sql[0], route)
+            http_request_db_duration.observe(sql[1], route)
+
+    def _route_template(self, scope: Scope) -> str:
+        # Starlette records the matched endpoint, not the route; map it back
+        # to the path template so labels stay bounded.
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        template = self._templates.get(endpoint)
+        if template is None:
+            app = scope.get("app")
+            for route in getattr(app, "routes", ()):
+                if getattr(route, "endpoint", None) is endpoint:
+                    template = route.path
+                    break
+            else:
+                template = UNMATCHED_ROUTE
+            self._templates[endpoint] = template
+        return template
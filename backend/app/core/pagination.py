@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+Cursor = tuple[datetime, int]
+
+
+def encode_cursor(value: datetime, row_id: int) -> str:
+    raw = f"{value.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        value, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(value), int(row_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid pagination cursor") from exc
@@ -2,7 +2,14 @@ from __future__ import annotations
 
 import hashlib
 import os
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
 from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from app.core.dates import as_utc
 
 
 SEED_VALUE = os.getenv("DROPSPOT_SEED", "5d75cfcdfd3f")
@@ -29,3 +36,159 @@ def hash_context_value(*parts: str) -> int:
     digest = hashlib.sha256(raw.encode()).hexdigest()
     return int(digest[:8], 16)
 
+
+def compute_priority_score(
+    *,
+    user_id: int,
+    user_created_at: datetime,
+    drop_id: int,
+    drop_capacity: int,
+    joined_at: datetime,
+    coefficients: PriorityCoefficients,
+) -> float:
+    """Reference scoring formula; request paths use ``PriorityScorer``."""
+    joined_at = as_utc(joined_at)
+    delta = joined_at - as_utc(user_created_at)
+    delta_ms = max(int(delta.total_seconds() * 1000), 0)
+    account_age_days = max(delta.days, 0)
+    rapid_metric = hash_context_value(str(user_id), str(drop_id), "rapid") % 100
+    base = (drop_capacity % 100) + (hash_context_value(str(drop_id), "base") % 100)
+    score = (
+        base
+        + (delta_ms % coefficients.a)
+        + (account_age_days % coefficients.b)
+        - (rapid_metric % coefficients.c)
+    )
+    fractional = (hash_context_value(str(user_id), joined_at.isoformat()) % 1000) / 1000
+    return float(max(score, 0) + fractional)
+
+
+def compute_priority_scores(
+    *,
+    user_ids: Sequence[int],
+    user_created_ats: Sequence[datetime],
+    joined_ats: Sequence[datetime],
+    drop_id: int,
+    drop_capacity: int,
+    coefficients: PriorityCoefficients,
+) -> array:
+    """Score many entries of one drop; element-wise identical to ``compute_priority_score``."""
+    return PriorityScorer(coefficients).score_many(
+        user_ids=user_ids,
+        user_created_ats=user_created_ats,
+        joined_ats=joined_ats,
+        drop_id=drop_id,
+        drop_capacity=drop_capacity,
+    )
+
+
+class PriorityScorer:
+    """Precompiled ``compute_priority_score`` for one set of coefficients.
+
+    The drop-constant base term is memoised per ``(drop_id, capacity)`` in a
+    bounded LRU, and each score hashes the ``"{user_id}|"`` prefix once and
+    forks the digest state for both per-user hashes.
+    """
+
+    def __init__(self, coefficients: PriorityCoefficients, *, max_drops: int = 1024):
+        self.coefficients = coefficients
+        self.max_drops = max_drops
+        self._bases: OrderedDict[tuple[int, int], int] = OrderedDict()
+
+    def base(self, drop_id: int, drop_capacity: int) -> int:
+        key = (drop_id, drop_capacity)
+        base = self._bases.get(key)
+        if base is None:
+            base = (drop_capacity % 100) + (hash_context_value(str(drop_id), "base") % 100)
+            self._bases[key] = base
+            if len(self._bases) > self.max_drops:
+                self._bases.popitem(last=False)
+        else:
+            self._bases.move_to_end(key)
+        return base
+
+    def score(
+        self,
+        *,
+        user_id: int,
+        user_created_at: datetime,
+        drop_id: int,
+        drop_capacity: int,
+        joined_at: datetime,
+    ) -> float:
+        joined_at = as_utc(joined_at)
+        return self._score(
+            self.base(drop_id, drop_capacity),
+            f"{drop_id}|rapid".encode(),
+            user_id,
+            joined_at - as_utc(user_created_at),
+            joined_at.isoformat().encode(),
+        )
+
+    def score_many(
+        self,
+        *,
+        user_ids: Sequence[int],
+        user_created_ats: Sequence[datetime],
+        joined_ats: Sequence[datetime],
+        drop_id: int,
+        drop_capacity: int,
+    ) -> array:
+        """Batch ``score`` for one drop as an ``array('d')``.
+
+        NumPy can wrap the result without copying via ``numpy.frombuffer``.
+        """
+        if not (len(user_ids) == len(user_created_ats) == len(joined_ats)):
+            raise ValueError("user_ids, user_created_ats and joined_ats must have the same length")
+        base = self.base(drop_id, drop_capacity)
+        rapid_suffix = f"{drop_id}|rapid".encode()
+        score = self._score
+        scores = array("d", bytes(8 * len(user_ids)))
+        # Bulk imports share one join time; only re-derive it when it changes.
+        last_joined_at = joined_utc = joined_iso = None
+        for index, (user_id, user_created_at, joined_at) in enumerate(
+            zip(user_ids, user_created_ats, joined_ats)
+        ):
+            if joined_at is not last_joined_at:
+                last_joined_at = joined_at
+                joined_utc = as_utc(joined_at)
+                joined_iso = joined_utc.isoformat().encode()
+            scores[index] = score(
+                base,
+                rapid_suffix,
+                user_id,
+                joined_utc - as_utc(user_created_at),
+                joined_iso,
+            )
+        return scores
+
+    def _score(
+        self,
+        base: int,
+        rapid_suffix: bytes,
+        user_id: int,
+        delta: timedelta,
+        joined_iso: bytes,
+    ) -> float:
+        coefficients = self.coefficients
+        delta_ms = max(int(delta.total_seconds() * 1000), 0)
+        account_age_days = max(delta.days, 0)
+        prefix = hashlib.sha256(f"{user_id}|".encode())
+        rapid_hash = prefix.copy()
+        rapid_hash.update(rapid_suffix)
+        prefix.update(joined_iso)
+        rapid_metric = int(rapid_hash.hexdigest()[:8], 16) % 100
+        score = (
+            base
+            + (delta_ms % coefficients.a)
+            + (account_age_days % coefficients.b)
+            - (rapid_metric % coefficients.c)
+        )
+        fractional = (int(prefix.hexdigest()[:8], 16) % 1000) / 1000
+        return float(max(score, 0) + fractional)
+
+
+@lru_cache
+def get_priority_scorer() -> PriorityScorer:
+    """Process-wide scorer for ``DROPSPOT_SEED``."""
+    return PriorityScorer(compute_coefficients())
@@ -0,0 +1,28 @@
+"""State and background work owned by one worker process.
+
+Module-level singletons such as metrics, rate-limit buckets, waiting-room
+sequences, rankings and the drop listing snapshot live in process memory.
+Each worker process keeps its own copy, so anything they count or limit
+applies per worker, and writes made through another worker only show up
+once the local copy expires or is invalidated.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+def start_background_task(coro: Coroutine[Any, Any, T]) -> asyncio.Task[T]:
+    """Run ``coro`` as a task that does not inherit the caller's context.
+
+    Long-lived tasks are started lazily by the first request that needs
+    them. A task copies its creator's context variables, so it would
+    otherwise report its SQL to that request's metrics and query tracker
+    for as long as it runs.
+    """
+    return asyncio.create_task(coro, context=contextvars.Context())
@@ -0,0 +1,71 @@
+"""Token-bucket rate limiting keyed by user or client address.
+
+Budgets come from ``settings.rate_limit_user_budgets`` and
+``settings.rate_limit_ip_budgets`` as ``"<requests>/<seconds>"`` per route
+name. Buckets live in a bounded LRU in process memory (see
+``app.core.process``).
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+rate_limited_requests = metrics.counter(
+    "http_requests_rate_limited_total", "Requests rejected by a rate budget.", ("route", "scope")
+)
+
+
+def parse_budget(budget: str) -> tuple[int, float]:
+    """``"10/60"`` -> ``(10, 60.0)``: bucket size and the seconds to refill it."""
+    requests, _, seconds = budget.partition("/")
+    return int(requests), float(seconds)
+
+
+class TokenBucketLimiter:
+    def __init__(self, *, max_keys: int):
+        self.max_keys = max_keys
+        # key -> [tokens, last refill (monotonic)]
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+        self.allowed = 0
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def acquire(self, key: str, budget: str, *, now: float | None = None) -> float:
+        """Take one token from ``key``'s bucket.
+
+        Returns ``0.0`` when allowed, otherwise the seconds until a token is
+        available; a rejected call does not consume anything.
+        """
+        capacity, per_seconds = parse_budget(budget)
+        rate = capacity / per_seconds
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(capacity), now]
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            self.allowed += 1
+            return 0.0
+        self.rejected += 1
+        return (1 - bucket[0]) / rate
+
+    def reset(self) -> None:
+        self._buckets.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"keys": len(self._buckets), "allowed": self.allowed, "rejected": self.rejected}
+
+
+rate_limiter = TokenBucketLimiter(max_keys=settings.rate_limit_max_keys)
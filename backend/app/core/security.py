@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import asyncio
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Callable, TypeVar
 
 from jose import jwt
 from passlib.context import CryptContext
@@ -10,6 +13,12 @@ from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
+T = TypeVar("T")
+
+
+class HashingOverloadedError(RuntimeError):
+    pass
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -19,6 +28,111 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHasher:
+    """Runs password hashing on a bounded executor instead of the event loop.
+
+    At most ``workers`` hashes run at once. Callers beyond that wait in a
+    queue of at most ``max_pending``; further callers are rejected with
+    ``HashingOverloadedError`` so a login storm cannot build an unbounded
+    backlog.
+    """
+
+    def __init__(self, *, workers: int, max_pending: int, use_processes: bool = False):
+        self.workers = max(workers, 1)
+        self.max_pending = max_pending
+        self.use_processes = use_processes
+        self._executor: Executor | None = None
+        self._slots = asyncio.Semaphore(self.workers)
+        self.in_flight = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="password-hash",
+                )
+        return self._executor
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.queued >= self.max_pending:
+            self.rejected += 1
+            raise HashingOverloadedError("Too many concurrent password operations")
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        started = time.perf_counter()
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+        self.wait_seconds_total += time.perf_counter() - started
+        try:
+            job = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        self.in_flight += 1
+        # The slot belongs to the job, not to the awaiter: a cancelled caller
+        # stops waiting, but the hash keeps its worker until it finishes.
+        loop = asyncio.get_running_loop()
+        job.add_done_callback(lambda done: self._call_in_loop(loop, self._finish, done))
+        return await asyncio.wrap_future(job)
+
+    @staticmethod
+    def _call_in_loop(loop: asyncio.AbstractEventLoop, callback: Callable[..., None], *args: Any) -> None:
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            # The loop closed while the job ran; nobody is left to account for it.
+            pass
+
+    def _finish(self, job: Future[Any]) -> None:
+        self.in_flight -= 1
+        if job.cancelled() or job.exception() is not None:
+            self.failed += 1
+        else:
+            self.succeeded += 1
+        self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict[str, float | int]:
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+    use_processes=settings.password_hash_executor == "process",
+)
+
+
 def create_access_token(subject: str, expires_delta: timedelta | None = None) -> str:
     expire = datetime.now(timezone.utc) + (
         expires_delta
@@ -27,4 +141,3 @@ def create_access_token(subject: str, expires_delta: timedelta | None = None) ->
     )
     to_encode: dict[str, Any] = {"exp": expire, "sub": str(subject)}
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
-
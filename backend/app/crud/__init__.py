@@ -1,34 +1,90 @@
-from app.crud.claim import list_waitlist_by_drop
+from app.crud.allocation import (
+    delete_drop_allocations,
+    get_allocation_summary,
+    get_drop_allocation,
+    get_due_unsettled_drops,
+    insert_drop_allocations,
+    list_allocated_entries,
+    list_allocation_candidates,
+    list_drop_allocations,
+    mark_drop_settled,
+    renumber_drop_allocations,
+)
+from app.crud.claim import count_waitlist_ahead, list_waitlist_by_drop, list_waitlist_ranking
 from app.crud.drop import (
+    adjust_drop_counts,
     create_drop,
     delete_drop,
     get_active_drops,
     get_drop,
     get_drops,
+    lock_drop,
+    reserve_claim_slot,
     update_drop,
 )
-from app.crud.user import authenticate_user, create_user, get_user_by_email
+from app.crud.user import (
+    authenticate_user,
+    create_user,
+    get_user_by_email,
+    get_user_principal,
+    get_user_principals,
+)
 from app.crud.waitlist import (
+    bulk_insert_waitlist_entries,
+    bulk_rejoin_waitlist_entries,
+    bulk_update_waitlist_entries,
     create_waitlist_entry,
     delete_waitlist_entry,
     get_waitlist_entry,
+    get_waitlist_entry_by_claim_code,
+    get_waitlist_states,
+    leave_waitlist_entry,
+    list_waitlist_scoring_inputs,
+    mark_waitlist_entry_claimed,
     update_waitlist_entry_state,
+    upsert_waitlist_join,
 )
 
 __all__ = [
+    "adjust_drop_counts",
     "authenticate_user",
-    "create_user",
+    "bulk_insert_waitlist_entries",
+    "bulk_rejoin_waitlist_entries",
+    "bulk_update_waitlist_entries",
+    "count_waitlist_ahead",
     "create_drop",
+    "create_user",
     "create_waitlist_entry",
-    "delete_waitlist_entry",
     "delete_drop",
+    "delete_drop_allocations",
+    "delete_waitlist_entry",
     "get_active_drops",
+    "get_allocation_summary",
     "get_drop",
+    "get_drop_allocation",
     "get_drops",
-    "list_waitlist_by_drop",
+    "get_due_unsettled_drops",
     "get_user_by_email",
+    "get_user_principal",
+    "get_user_principals",
     "get_waitlist_entry",
+    "get_waitlist_entry_by_claim_code",
+    "get_waitlist_states",
+    "insert_drop_allocations",
+    "leave_waitlist_entry",
+    "list_allocated_entries",
+    "list_allocation_candidates",
+    "list_drop_allocations",
+    "list_waitlist_by_drop",
+    "list_waitlist_ranking",
+    "list_waitlist_scoring_inputs",
+    "lock_drop",
+    "mark_drop_settled",
+    "mark_waitlist_entry_claimed",
+    "renumber_drop_allocations",
+    "reserve_claim_slot",
     "update_drop",
     "update_waitlist_entry_state",
+    "upsert_waitlist_join",
 ]
 
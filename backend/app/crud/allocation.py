@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import case, delete, exists, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.dialect import dialect_insert
+from app.models.drop import Drop
+from app.models.drop_allocation import DropAllocation
+from app.models.waitlist_entry import WaitlistEntry
+
+
+async def get_drop_allocation(
+    session: AsyncSession,
+    *,
+    drop_id: int,
+    user_id: int,
+) -> DropAllocation | None:
+    statement = select(DropAllocation).where(
+        DropAllocation.drop_id == drop_id,
+        DropAllocation.user_id == user_id,
+    )
+    result = await session.execute(statement)
+    return result.scalars().first()
+
+
+async def get_due_unsettled_drops(session: AsyncSession, *, now: datetime) -> list[Drop]:
+    statement = select(Drop).where(
+        Drop.is_active.is_(True),
+        Drop.settled_at.is_(None),
+        Drop.claim_window_start <= now,
+        Drop.claim_window_end > now,
+    )
+    result = await session.execute(statement)
+    return list(result.scalars().all())
+
+
+async def mark_drop_settled(
+    session: AsyncSession,
+    *,
+    drop_id: int,
+    settled_at: datetime | None,
+    only_unsettled: bool = True,
+) -> bool:
+    """Set ``settled_at``; with ``only_unsettled`` this is a compare-and-set.
+
+    Concurrent settlers race on this row, and only the one that flips
+    ``settled_at`` from ``NULL`` goes on to allocate.
+    """
+    statement = update(Drop).where(Drop.id == drop_id).values(settled_at=settled_at)
+    if only_unsettled:
+        statement = statement.where(Drop.settled_at.is_(None))
+    statement = statement.returning(Drop).execution_options(
+        populate_existing=True,
+        synchronize_session=False,
+    )
+    result = await session.execute(statement)
+    return result.first() is not None
+
+
+async def list_allocation_candidates(
+    session: AsyncSession,
+    *,
+    drop_id: int,
+    limit: int,
+) -> list[tuple[int, int, Decimal, datetime]]:
+    """Best unallocated entries as ``(entry_id, user_id, priority_score, joined_at)``.
+
+    Entries that were claimed before settlement already hold a slot, so they
+    sort first; joined entries follow in waitlist order.
+    """
+    if limit <= 0:
+        return []
+    allocated = exists().where(DropAllocation.entry_id == WaitlistEntry.id)
+    statement = (
+        select(
+            WaitlistEntry.id,
+            WaitlistEntry.user_id,
+            WaitlistEntry.priority_score,
+            WaitlistEntry.joined_at,
+        )
+        .where(
+            WaitlistEntry.drop_id == drop_id,
+            WaitlistEntry.state.in_(("joined", "claimed")),
+            ~allocated,
+        )
+        .order_by(
+            case((WaitlistEntry.state == "claimed", 0), else_=1),
+            WaitlistEntry.priority_score.desc(),
+            WaitlistEntry.joined_at,
+            WaitlistEntry.id,
+        )
+        .limit(limit)
+    )
+    result = await session.execute(statement)
+    return [tuple(row) for row in result.all()]
+
+
+async def insert_drop_allocations(
+    session: AsyncSession,
+    rows: Sequence[dict[str, Any]],
+) -> int:
+    if not rows:
+        return 0
+    statement = (
+        dialect_insert(session, DropAllocation)
+        .values(list(rows))
+        .on_conflict_do_nothing()
+        .returning(DropAllocation.user_id)
+    )
+    result = await session.execute(statement)
+    return len(result.all())
+
+
+async def get_allocation_summary(session: AsyncSession, *, drop_id: int) -> tuple[int, int]:
+    """``(allocated slots, highest rank handed out)`` for ``drop_id``."""
+    statement = select(func.count(), func.coalesce(func.max(DropAllocation.rank), 0)).where(
+        DropAllocation.drop_id == drop_id
+    )
+    result = await session.execute(statement)
+    count, max_rank = result.one()
+    return int(count), int(max_rank)
+
+
+async def renumber_drop_allocations(session: AsyncSession, *, drop_id: int) -> int:
+    """Close gaps left by released slots so ranks run ``1..n``; returns ``n``.
+
+    Ranks are computed in one ``SELECT`` and written back by primary key, so
+    the result does not depend on the order the database updates rows in.
+    """
+    dense_rank = func.row_number().over(order_by=(DropAllocation.rank, DropAllocation.user_id))
+    statement = select(DropAllocation.user_id, DropAllocation.rank, dense_rank).where(
+        DropAllocation.drop_id == drop_id
+    )
+    result = await session.execute(statement)
+    ranked = result.all()
+    rows = [
+        {"drop_id": drop_id, "user_id": user_id, "rank": new_rank}
+        for user_id, rank, new_rank in ranked
+        if rank != new_rank
+    ]
+    if rows:
+        await session.execute(update(DropAllocation), rows)
+    return len(ranked)
+
+
+async def list_drop_allocations(
+    session: AsyncSession,
+    *,
+    drop_id: int,
+) -> list[tuple[int, int, str]]:
+    """``(user_id, rank, entry state)`` for every slot of ``drop_id`` in rank order."""
+    statement = (
+        select(DropAllocation.user_id, DropAllocation.rank, WaitlistEntry.state)
+        .join(WaitlistEntry, WaitlistEntry.id == DropAllocation.entry_id)
+        .where(DropAllocation.drop_id == drop_id)
+        .order_by(DropAllocation.rank)
+    )
+    result = await session.execute(statement)
+    return [tuple(row) for row in result.all()]
+
+
+async def list_allocated_entries(session: AsyncSession, *, drop_id: int) -> list[tuple[int, int, int]]:
+    """``(user_id, entry_id, rank)`` for every slot of ``drop_id``."""
+    statement = select(DropAllocation.user_id, DropAllocation.entry_id, DropAllocation.rank).where(
+        DropAllocation.drop_id == drop_id
+    )
+    result = await session.execute(statement)
+    return [tuple(row) for row in result.all()]
+
+
+async def delete_drop_allocations(
+    session: AsyncSession,
+    *,
+    drop_id: int,
+    user_ids: Sequence[int] | None = None,
+) -> int:
+    statement = delete(DropAllocation).where(DropAllocation.drop_id == drop_id)
+    if user_ids is not None:
+        if not user_ids:
+            return 0
+        statement = statement.where(DropAllocation.user_id.in_(user_ids))
+    result = await session.execute(statement.execution_options(synchronize_session=False))
+    return result.rowcount
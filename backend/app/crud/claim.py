@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from sqlalchemy import Select, select
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import Select, and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.waitlist_entry import WaitlistEntry
@@ -14,7 +17,62 @@ async def list_waitlist_by_drop(
     statement: Select[tuple[WaitlistEntry]] = select(WaitlistEntry).where(
         WaitlistEntry.drop_id == drop_id,
         WaitlistEntry.state == "joined",
-    ).order_by(WaitlistEntry.priority_score.desc(), WaitlistEntry.joined_at)
+    ).order_by(WaitlistEntry.priority_score.desc(), WaitlistEntry.joined_at, WaitlistEntry.id)
     result = await session.execute(statement)
     return list(result.scalars().all())
 
+
+async def count_waitlist_ahead(
+    session: AsyncSession,
+    *,
+    entry: WaitlistEntry,
+    limit: int | None = None,
+) -> int:
+    """Count joined entries ordered before ``entry`` in its drop.
+
+    Mirrors the ``priority_score DESC, joined_at, id`` ordering of
+    ``list_waitlist_by_drop`` without loading the list. When ``limit`` is
+    given the scan stops after that many rows, which is all a capacity
+    check needs.
+    """
+    ahead = or_(
+        WaitlistEntry.priority_score > entry.priority_score,
+        and_(
+            WaitlistEntry.priority_score == entry.priority_score,
+            or_(
+                WaitlistEntry.joined_at < entry.joined_at,
+                and_(
+                    WaitlistEntry.joined_at == entry.joined_at,
+                    WaitlistEntry.id < entry.id,
+                ),
+            ),
+        ),
+    )
+    ids = select(WaitlistEntry.id).where(
+        WaitlistEntry.drop_id == entry.drop_id,
+        WaitlistEntry.state == "joined",
+        WaitlistEntry.priority_score >= entry.priority_score,
+        ahead,
+    )
+    if limit is not None:
+        ids = ids.limit(limit)
+    statement = select(func.count()).select_from(ids.subquery())
+    result = await session.execute(statement)
+    return int(result.scalar_one())
+
+
+async def list_waitlist_ranking(
+    session: AsyncSession,
+    *,
+    drop_id: int,
+) -> list[tuple[int, Decimal, datetime]]:
+    statement = (
+        select(WaitlistEntry.id, WaitlistEntry.priority_score, WaitlistEntry.joined_at)
+        .where(
+            WaitlistEntry.drop_id == drop_id,
+            WaitlistEntry.state == "joined",
+        )
+        .order_by(WaitlistEntry.priority_score.desc(), WaitlistEntry.joined_at, WaitlistEntry.id)
+    )
+    result = await session.execute(statement)
+    return [tuple(row) for row in result.all()]
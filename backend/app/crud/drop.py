@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
 from typing import Sequence
 
-from sqlalchemy import Select, select
+from sqlalchemy import ColumnElement, Select, and_, delete, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import Cursor
 from app.models.drop import Drop
-from app.schemas.drop import DropCreate, DropUpdate
+from app.models.drop_allocation import DropAllocation
+from app.models.waitlist_entry import WaitlistEntry
+from app.schemas.drop import DropCreate, DropPhase, DropUpdate
 
 
 async def get_drop(session: AsyncSession, drop_id: int) -> Drop | None:
@@ -15,16 +19,100 @@ async def get_drop(session: AsyncSession, drop_id: int) -> Drop | None:
     return result.scalars().first()
 
 
-async def get_active_drops(session: AsyncSession) -> list[Drop]:
+async def lock_drop(session: AsyncSession, drop_id: int) -> None:
+    """Serialise writers on ``drop_id`` (``SELECT ... FOR UPDATE``; a no-op on SQLite)."""
+    await session.execute(select(Drop.id).where(Drop.id == drop_id).with_for_update())
+
+
+async def adjust_drop_counts(
+    session: AsyncSession,
+    drop_id: int,
+    *,
+    joined: int = 0,
+    claimed: int = 0,
+) -> None:
+    values = {}
+    if joined:
+        values["joined_count"] = Drop.joined_count + joined
+    if claimed:
+        values["claimed_count"] = Drop.claimed_count + claimed
+    if not values:
+        return
+    # Counter bumps are not edits to the drop; keep ``updated_at`` as is.
+    statement = update(Drop).where(Drop.id == drop_id).values(updated_at=Drop.updated_at, **values)
+    await session.execute(statement)
+
+
+async def reserve_claim_slot(session: AsyncSession, drop_id: int) -> bool:
+    """Atomically move one entry from joined to claimed if stock remains.
+
+    The ``claimed_count < capacity`` guard is evaluated under the row lock
+    on PostgreSQL and under SQLite's single writer, so concurrent claims
+    can never push ``claimed_count`` past ``capacity``.
+    """
+    statement = (
+        update(Drop)
+        .where(Drop.id == drop_id, Drop.claimed_count < Drop.capacity)
+        .values(
+            joined_count=Drop.joined_count - 1,
+            claimed_count=Drop.claimed_count + 1,
+            updated_at=Drop.updated_at,
+        )
+        .returning(Drop.id)
+    )
+    result = await session.execute(statement)
+    return result.first() is not None
+
+
+def _phase_filter(phase: DropPhase, now: datetime) -> ColumnElement[bool]:
+    if phase is DropPhase.UPCOMING:
+        return Drop.claim_window_start > now
+    if phase is DropPhase.LIVE:
+        return and_(Drop.claim_window_start <= now, Drop.claim_window_end >= now)
+    return Drop.claim_window_end < now
+
+
+async def get_active_drops(
+    session: AsyncSession,
+    *,
+    limit: int | None = None,
+    after: Cursor | None = None,
+    phase: DropPhase | None = None,
+) -> list[Drop]:
     statement: Select[tuple[Drop]] = (
-        select(Drop).where(Drop.is_active.is_(True)).order_by(Drop.claim_window_start)
+        select(Drop)
+        .where(Drop.is_active.is_(True))
+        .order_by(Drop.claim_window_start, Drop.id)
     )
+    if after is not None:
+        statement = statement.where(tuple_(Drop.claim_window_start, Drop.id) > tuple_(*after))
+    if phase is not None:
+        statement = statement.where(_phase_filter(phase, datetime.now(timezone.utc)))
+    if limit is not None:
+        statement = statement.limit(limit)
     result = await session.execute(statement)
     return list(result.scalars().all())
 
 
-async def get_drops(session: AsyncSession) -> Sequence[Drop]:
-    statement: Select[tuple[Drop]] = select(Drop).order_by(Drop.created_at.desc())
+async def get_drops(
+    session: AsyncSession,
+    *,
+    limit: int | None = None,
+    after_id: int | None = None,
+    phase: DropPhase | None = None,
+    is_active: bool | None = None,
+) -> Sequence[Drop]:
+    # Newest first by id: ids follow creation order and never tie, whereas
+    # SQLite stores ``created_at`` in whole seconds.
+    statement: Select[tuple[Drop]] = select(Drop).order_by(Drop.id.desc())
+    if after_id is not None:
+        statement = statement.where(Drop.id < after_id)
+    if phase is not None:
+        statement = statement.where(_phase_filter(phase, datetime.now(timezone.utc)))
+    if is_active is not None:
+        statement = statement.where(Drop.is_active.is_(is_active))
+    if limit is not None:
+        statement = statement.limit(limit)
     result = await session.execute(statement)
     return result.scalars().all()
 
@@ -40,7 +128,6 @@ async def create_drop(session: AsyncSession, drop_in: DropCreate) -> Drop:
     )
     session.add(drop)
     await session.flush()
-    await session.refresh(drop)
     return drop
 
 
@@ -48,11 +135,14 @@ async def update_drop(session: AsyncSession, drop: Drop, drop_in: DropUpdate) ->
     for field, value in drop_in.model_dump(exclude_unset=True).items():
         setattr(drop, field, value)
     await session.flush()
-    await session.refresh(drop)
     return drop
 
 
 async def delete_drop(session: AsyncSession, drop: Drop) -> None:
+    # Relationships are not loaded, so cascade the entries explicitly rather
+    # than relying on ON DELETE CASCADE (SQLite does not enforce it by default).
+    await session.execute(delete(DropAllocation).where(DropAllocation.drop_id == drop.id))
+    await session.execute(delete(WaitlistEntry).where(WaitlistEntry.drop_id == drop.id))
     await session.delete(drop)
     await session.flush()
 
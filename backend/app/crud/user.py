@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from collections.abc import Sequence
+
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
+from app.core.security import password_hasher
 from app.models.user import User
-from app.schemas.user import UserCreate
+from app.schemas.user import UserCreate, UserPrincipal
 
 
 async def get_user_by_email(
@@ -17,6 +19,41 @@ async def get_user_by_email(
     return result.scalars().first()
 
 
+async def get_user_principal(
+    session: AsyncSession,
+    email: str,
+) -> UserPrincipal | None:
+    statement = select(
+        User.id,
+        User.email,
+        User.is_active,
+        User.is_admin,
+        User.created_at,
+    ).where(User.email == email.lower())
+    result = await session.execute(statement)
+    row = result.first()
+    return UserPrincipal.model_validate(row) if row else None
+
+
+async def get_user_principals(
+    session: AsyncSession,
+    *,
+    user_ids: Sequence[int] = (),
+    emails: Sequence[str] = (),
+) -> list[UserPrincipal]:
+    if not user_ids and not emails:
+        return []
+    statement = select(
+        User.id,
+        User.email,
+        User.is_active,
+        User.is_admin,
+        User.created_at,
+    ).where(or_(User.id.in_(user_ids), User.email.in_([email.lower() for email in emails])))
+    result = await session.execute(statement)
+    return [UserPrincipal.model_validate(row) for row in result.all()]
+
+
 async def create_user(
     session: AsyncSession,
     *,
@@ -24,11 +61,10 @@ async def create_user(
 ) -> User:
     user = User(
         email=user_in.email.lower(),
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await password_hasher.hash(user_in.password),
     )
     session.add(user)
     await session.flush()
-    await session.refresh(user)
     return user
 
 
@@ -41,7 +77,7 @@ async def authenticate_user(
     user = await get_user_by_email(session, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await password_hasher.verify(password, user.hashed_password):
         return None
     return user
 
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from datetime import datetime
+from typing import Any
 
-from sqlalchemy import Select, select
+from sqlalchemy import Select, case, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.dialect import dialect_insert
+from app.models.user import User
 from app.models.waitlist_entry import WaitlistEntry
 
 
@@ -25,6 +29,20 @@ async def get_waitlist_entry(
     return result.scalars().first()
 
 
+async def get_waitlist_entry_by_claim_code(
+    session: AsyncSession,
+    *,
+    drop_id: int,
+    claim_code: str,
+) -> WaitlistEntry | None:
+    statement: Select[tuple[WaitlistEntry]] = select(WaitlistEntry).where(
+        WaitlistEntry.claim_code == claim_code,
+        WaitlistEntry.drop_id == drop_id,
+    )
+    result = await session.execute(statement)
+    return result.scalars().first()
+
+
 async def create_waitlist_entry(
     session: AsyncSession,
     *,
@@ -42,10 +60,117 @@ async def create_waitlist_entry(
     )
     session.add(entry)
     await session.flush()
-    await session.refresh(entry)
     return entry
 
 
+async def upsert_waitlist_join(
+    session: AsyncSession,
+    *,
+    user_id: int,
+    drop_id: int,
+    priority_score: float,
+    now: datetime,
+) -> tuple[WaitlistEntry, bool, bool]:
+    """Insert the entry, or move a left entry back to ``joined`` with the new score.
+
+    The flags come from which statement wrote a row: ``INSERT ... ON
+    CONFLICT DO NOTHING`` only returns a row it created, and the rejoin
+    ``UPDATE`` only matches a left entry. A first join is a single
+    statement; joined and claimed entries come back unchanged. Returns
+    ``(entry, created, changed)``.
+    """
+    insert_statement = (
+        dialect_insert(session, WaitlistEntry)
+        .values(
+            user_id=user_id,
+            drop_id=drop_id,
+            priority_score=priority_score,
+            joined_at=now,
+            state="joined",
+            created_at=now,
+            updated_at=now,
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "drop_id"])
+        .returning(WaitlistEntry)
+        .execution_options(populate_existing=True)
+    )
+    entry = (await session.execute(insert_statement)).scalars().first()
+    if entry is not None:
+        return entry, True, True
+
+    rejoin_statement = (
+        update(WaitlistEntry)
+        .where(
+            WaitlistEntry.user_id == user_id,
+            WaitlistEntry.drop_id == drop_id,
+            WaitlistEntry.state == "left",
+        )
+        .values(
+            state="joined",
+            priority_score=priority_score,
+            joined_at=now,
+            claim_code=None,
+            claimed_at=None,
+            updated_at=now,
+        )
+        .returning(WaitlistEntry)
+        .execution_options(populate_existing=True, synchronize_session=False)
+    )
+    entry = (await session.execute(rejoin_statement)).scalars().first()
+    if entry is not None:
+        return entry, False, True
+    return await get_waitlist_entry(session, user_id=user_id, drop_id=drop_id), False, False
+
+
+async def leave_waitlist_entry(
+    session: AsyncSession,
+    *,
+    user_id: int,
+    drop_id: int,
+    now: datetime,
+) -> tuple[WaitlistEntry, bool] | None:
+    """Mark a joined entry as left with a conditional ``UPDATE ... RETURNING``.
+
+    Claimed entries are final and come back unchanged. Returns ``(entry,
+    changed)``, or ``None`` if the user never joined.
+    """
+    statement = (
+        update(WaitlistEntry)
+        .where(
+            WaitlistEntry.user_id == user_id,
+            WaitlistEntry.drop_id == drop_id,
+            WaitlistEntry.state == "joined",
+        )
+        .values(state="left", updated_at=now)
+        .returning(WaitlistEntry)
+        .execution_options(populate_existing=True, synchronize_session=False)
+    )
+    entry = (await session.execute(statement)).scalars().first()
+    if entry is not None:
+        return entry, True
+    entry = await get_waitlist_entry(session, user_id=user_id, drop_id=drop_id)
+    return (entry, False) if entry is not None else None
+
+
+async def mark_waitlist_entry_claimed(
+    session: AsyncSession,
+    *,
+    entry_id: int,
+    claim_code: str,
+    claimed_at: datetime,
+) -> WaitlistEntry | None:
+    """Claim a joined entry by primary key; ``None`` if it is no longer joined."""
+    statement = (
+        update(WaitlistEntry)
+        .where(WaitlistEntry.id == entry_id, WaitlistEntry.state == "joined")
+        .values(state="claimed", claim_code=claim_code, claimed_at=claimed_at, updated_at=claimed_at)
+        .returning(WaitlistEntry)
+        .execution_options(populate_existing=True, synchronize_session=False)
+    )
+    result = await session.execute(statement)
+    return result.scalars().first()
+
+
 async def update_waitlist_entry_state(
     session: AsyncSession,
     entry: WaitlistEntry,
@@ -53,17 +178,19 @@ async def update_waitlist_entry_state(
     state: str,
     joined_at: datetime | None = None,
     priority_score: float | None = None,
+    claim_code: str | None = None,
+    claimed_at: datetime | None = None,
 ) -> WaitlistEntry:
     entry.state = state
     if joined_at is not None:
         entry.joined_at = joined_at
     if priority_score is not None:
         entry.priority_score = priority_score
-    if state != "claimed":
-        entry.claim_code = None
-        entry.claimed_at = None
+    # Claim details are written together with the state so the change is a
+    # single UPDATE; any other state clears them.
+    entry.claim_code = claim_code if state == "claimed" else None
+    entry.claimed_at = claimed_at if state == "claimed" else None
     await session.flush()
-    await session.refresh(entry)
     return entry
 
 
@@ -71,3 +198,100 @@ async def delete_waitlist_entry(session: AsyncSession, entry: WaitlistEntry) ->
     await session.delete(entry)
     await session.flush()
 
+
+async def get_waitlist_states(
+    session: AsyncSession,
+    *,
+    drop_id: int,
+    user_ids: Sequence[int],
+) -> dict[int, tuple[int, str]]:
+    if not user_ids:
+        return {}
+    statement = select(WaitlistEntry.user_id, WaitlistEntry.id, WaitlistEntry.state).where(
+        WaitlistEntry.drop_id == drop_id,
+        WaitlistEntry.user_id.in_(user_ids),
+    )
+    result = await session.execute(statement)
+    return {user_id: (entry_id, state) for user_id, entry_id, state in result.all()}
+
+
+async def bulk_insert_waitlist_entries(
+    session: AsyncSession,
+    rows: Sequence[dict[str, Any]],
+) -> dict[int, int]:
+    """Insert ``rows`` in one statement, skipping users already on the waitlist.
+
+    Returns ``{user_id: entry_id}`` for the rows that were actually inserted.
+    """
+    if not rows:
+        return {}
+    statement = (
+        dialect_insert(session, WaitlistEntry)
+        .values(list(rows))
+        .on_conflict_do_nothing(index_elements=["user_id", "drop_id"])
+        .returning(WaitlistEntry.user_id, WaitlistEntry.id)
+    )
+    result = await session.execute(statement)
+    return {user_id: entry_id for user_id, entry_id in result.all()}
+
+
+async def bulk_rejoin_waitlist_entries(
+    session: AsyncSession,
+    *,
+    scores: dict[int, float],
+    joined_at: datetime,
+) -> set[int]:
+    """Flip left entries (``{entry_id: priority_score}``) back to joined in one UPDATE.
+
+    Only rows still in ``left`` change, so an entry joined concurrently is
+    not counted twice. Returns the ids that were actually rejoined.
+    """
+    if not scores:
+        return set()
+    statement = (
+        update(WaitlistEntry)
+        .where(WaitlistEntry.id.in_(list(scores)), WaitlistEntry.state == "left")
+        .values(
+            state="joined",
+            joined_at=joined_at,
+            claim_code=None,
+            claimed_at=None,
+            priority_score=case(scores, value=WaitlistEntry.id),
+        )
+        .returning(WaitlistEntry.id)
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.execute(statement)
+    return set(result.scalars().all())
+
+
+async def bulk_update_waitlist_entries(
+    session: AsyncSession,
+    rows: Sequence[dict[str, Any]],
+) -> None:
+    """Apply per-row changes keyed by entry ``id`` as a single executemany."""
+    if rows:
+        await session.execute(update(WaitlistEntry), list(rows))
+
+
+async def list_waitlist_scoring_inputs(
+    session: AsyncSession,
+    *,
+    drop_id: int,
+    after_id: int = 0,
+    limit: int,
+) -> list[tuple[int, int, datetime, datetime]]:
+    """``(entry_id, user_id, user_created_at, joined_at)`` of joined entries, keyset by id."""
+    statement = (
+        select(WaitlistEntry.id, WaitlistEntry.user_id, User.created_at, WaitlistEntry.joined_at)
+        .join(User, User.id == WaitlistEntry.user_id)
+        .where(
+            WaitlistEntry.drop_id == drop_id,
+            WaitlistEntry.state == "joined",
+            WaitlistEntry.id > after_id,
+        )
+        .order_by(WaitlistEntry.id)
+        .limit(limit)
+    )
+    result = await session.execute(statement)
+    return [tuple(row) for row in result.all()]
@@ -1,7 +1,8 @@
 from app.db.base_class import Base
 from app.models.drop import Drop
+from app.models.drop_allocation import DropAllocation
 from app.models.user import User
 from app.models.waitlist_entry import WaitlistEntry
 
-__all__ = ["Base", "User", "Drop", "WaitlistEntry"]
+__all__ = ["Base", "User", "Drop", "DropAllocation", "WaitlistEntry"]
 
@@ -11,6 +11,10 @@ class Base(DeclarativeBase):
 
 
 class TimestampMixin:
+    # Fetch server-generated timestamps with RETURNING on flush instead of
+    # expiring them and paying for a SELECT on next access.
+    __mapper_args__ = {"eager_defaults": True}
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def dialect_insert(session: AsyncSession, entity: Any) -> Any:
+    """``INSERT`` construct with ``ON CONFLICT`` support for the session's backend."""
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        return postgresql.insert(entity)
+    if dialect_name == "sqlite":
+        return sqlite.insert(entity)
+    raise NotImplementedError(f"ON CONFLICT inserts are not supported on {dialect_name}")
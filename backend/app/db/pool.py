@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+
+class PoolStats:
+    """Checkout counters for one pool; plain attribute updates, no locking."""
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, waited: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += waited
+        if waited > self.max_wait_seconds:
+            self.max_wait_seconds = waited
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """``AsyncAdaptedQueuePool`` that records how long each checkout took.
+
+    The time covers waiting for a free slot plus, when the pool grows, the
+    new connection and its pre-ping, which is what a request actually waits.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.record(time.perf_counter() - started)
+
+
+def pool_status(pool: Pool) -> dict[str, float | int]:
+    if not isinstance(pool, InstrumentedAsyncPool):
+        return {}
+    stats = pool.stats
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    return {
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "utilisation": round(checked_out / capacity, 4) if capacity else 0.0,
+        "checkouts": stats.checkouts,
+        "timeouts": stats.timeouts,
+        "wait_seconds_total": round(stats.wait_seconds_total, 6),
+        "wait_seconds_avg": round(stats.wait_seconds_total / stats.checkouts, 6) if stats.checkouts else 0.0,
+        "wait_seconds_max": round(stats.max_wait_seconds, 6),
+    }
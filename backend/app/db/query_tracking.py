@@ -0,0 +1,139 @@
+"""Opt-in per-request SQL accounting and N+1 detection.
+
+While a ``QueryTracker`` is active (see ``track_queries``) every statement
+on an instrumented engine is counted together with the rows it returned,
+and every ORM instance loaded or refreshed is counted as an object. The
+same SQL text executed several times with different parameters is
+reported as repeated, which is how an N+1 pattern looks from here.
+
+The counters are read by ``QueryTrackingMiddleware``, which adds them to
+the response as ``X-Query-Stats`` when ``QUERY_TRACKING_ENABLED`` is set,
+and by the ``query_budget`` test fixture.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.base_class import Base
+
+QUERY_STATS_HEADER = "X-Query-Stats"
+
+logger = logging.getLogger(__name__)
+
+_tracker: ContextVar[QueryTracker | None] = ContextVar("query_tracker", default=None)
+
+
+class QueryTracker:
+    def __init__(self, *, repeat_threshold: int = 3):
+        self.repeat_threshold = repeat_threshold
+        self.statements = 0
+        self.rows = 0
+        self.objects = 0
+        self.executed: list[str] = []
+        self._parameters: dict[str, set[str]] = {}
+
+    def record_statement(self, statement: str, parameters: object) -> None:
+        self.statements += 1
+        self.executed.append(statement)
+        self._parameters.setdefault(statement, set()).add(repr(parameters))
+
+    def repeated(self) -> dict[str, int]:
+        """SQL run at least ``repeat_threshold`` times with differing parameters."""
+        counts = Counter(self.executed)
+        return {
+            statement: count
+            for statement, count in counts.items()
+            if count >= self.repeat_threshold and len(self._parameters[statement]) > 1
+        }
+
+    def summary(self) -> str:
+        return (
+            f"statements={self.statements}; rows={self.rows}; "
+            f"objects={self.objects}; repeated={len(self.repeated())}"
+        )
+
+
+@contextmanager
+def track_queries(*, repeat_threshold: int | None = None) -> Iterator[QueryTracker]:
+    tracker = QueryTracker(
+        repeat_threshold=repeat_threshold or settings.query_repeat_threshold
+    )
+    token = _tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _tracker.reset(token)
+
+
+def install_query_tracking(sync_engine: Engine) -> None:
+    if event.contains(sync_engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    if not event.contains(Base, "load", _on_load):
+        event.listen(Base, "load", _on_load, propagate=True)
+        event.listen(Base, "refresh", _on_refresh, propagate=True)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    tracker = _tracker.get()
+    if tracker is None:
+        return
+    tracker.record_statement(statement, parameters)
+    # The async drivers' adapted cursors buffer the whole result on execute.
+    rows = getattr(cursor, "_rows", None)
+    if rows is not None:
+        tracker.rows += len(rows)
+
+
+def _on_load(target, context) -> None:
+    tracker = _tracker.get()
+    if tracker is not None:
+        tracker.objects += 1
+
+
+def _on_refresh(target, context, attrs) -> None:
+    _on_load(target, context)
+
+
+class QueryTrackingMiddleware:
+    """Adds ``X-Query-Stats`` to responses and logs repeated statements.
+
+    A no-op unless ``settings.query_tracking_enabled``; meant for debugging.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.query_tracking_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as tracker:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append(QUERY_STATS_HEADER, tracker.summary())
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        for statement, count in tracker.repeated().items():
+            logger.warning(
+                "%s %s ran the same statement %d times: %s",
+                scope["method"],
+                scope["path"],
+                count,
+                statement,
+            )
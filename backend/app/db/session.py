@@ -1,17 +1,52 @@
 from __future__ import annotations
 
+import asyncio
 from collections.abc import AsyncIterator
-from typing import AsyncGenerator
+from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
-from app.core.config import settings
+from app.core.config import Settings, settings
+from app.core.metrics import instrument_engine
+from app.db.pool import InstrumentedAsyncPool
+from app.db.query_tracking import install_query_tracking
+from app.db.sqlite import SQLiteWriteQueue, configure_sqlite
 
-engine = create_async_engine(
-    settings.database_url,
-    future=True,
-    echo=False,
-)
+
+def engine_options(config: Settings) -> dict[str, Any]:
+    """``create_async_engine`` keyword arguments for ``config.database_url``.
+
+    Pool tuning applies to server databases; SQLite keeps SQLAlchemy's
+    default pool for its URL.
+    """
+    url = make_url(config.database_url)
+    options: dict[str, Any] = {"future": True, "echo": False}
+    if url.get_backend_name() == "sqlite":
+        return options
+    options.update(
+        poolclass=InstrumentedAsyncPool,
+        pool_size=config.db_pool_size,
+        max_overflow=config.db_max_overflow,
+        pool_timeout=config.db_pool_timeout,
+        pool_recycle=config.db_pool_recycle,
+        pool_pre_ping=config.db_pool_pre_ping,
+    )
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "prepared_statement_cache_size": config.db_statement_cache_size,
+        }
+    return options
+
+
+engine = create_async_engine(settings.database_url, **engine_options(settings))
+instrument_engine(engine.sync_engine)
+if settings.query_tracking_enabled:
+    install_query_tracking(engine.sync_engine)
+
+sqlite_writer: SQLiteWriteQueue | None = None
+if engine.dialect.name == "sqlite":
+    sqlite_writer = configure_sqlite(engine, settings)
 
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -20,7 +55,16 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+async def warm_pool(async_engine: AsyncEngine, connections: int) -> int:
+    """Open ``connections`` connections at once and return them to the pool."""
+    if connections <= 0 or not isinstance(async_engine.pool, InstrumentedAsyncPool):
+        return 0
+    opened = await asyncio.gather(*(async_engine.connect().start() for _ in range(connections)))
+    for connection in opened:
+        await connection.close()
+    return len(opened)
+
+
 async def get_db() -> AsyncIterator[AsyncSession]:
     async with AsyncSessionLocal() as session:
         yield session
-
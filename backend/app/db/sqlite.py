@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.util import await_only
+
+from app.core.config import Settings
+
+_WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+_HOLDS_WRITER_KEY = "sqlite_holds_writer"
+
+
+class SQLiteWriteQueue:
+    """Hands SQLite's single write lock to one transaction at a time, in FIFO order.
+
+    The sqlite driver only opens a transaction at the first INSERT, UPDATE or
+    DELETE, so a transaction joins the queue right before that statement and
+    leaves it at commit or rollback. Concurrent writers then wait here, on
+    the event loop, instead of spinning on ``database is locked`` inside the
+    driver threads.
+    """
+
+    def __init__(self, timeout_seconds: float):
+        self.timeout_seconds = timeout_seconds
+        self._lock = asyncio.Lock()
+        self.waiting = 0
+        self.transactions = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def acquire(self) -> None:
+        started = time.perf_counter()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._lock.acquire(), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise exc.TimeoutError(
+                f"SQLite writer queue timed out after {self.timeout_seconds}s"
+            ) from None
+        finally:
+            self.waiting -= 1
+        waited = time.perf_counter() - started
+        self.transactions += 1
+        self.wait_seconds_total += waited
+        if waited > self.max_wait_seconds:
+            self.max_wait_seconds = waited
+
+    def release(self) -> None:
+        if self._lock.locked():
+            self._lock.release()
+
+    def stats(self) -> dict[str, float | int]:
+        return {
+            "busy": int(self._lock.locked()),
+            "waiting": self.waiting,
+            "transactions": self.transactions,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.max_wait_seconds, 6),
+        }
+
+
+def sqlite_pragmas(config: Settings) -> list[str]:
+    return [
+        f"PRAGMA journal_mode={config.sqlite_journal_mode}",
+        f"PRAGMA busy_timeout={config.sqlite_busy_timeout_ms}",
+        f"PRAGMA synchronous={config.sqlite_synchronous}",
+        f"PRAGMA mmap_size={config.sqlite_mmap_size}",
+        f"PRAGMA cache_size={config.sqlite_cache_size}",
+    ]
+
+
+def configure_sqlite(async_engine: AsyncEngine, config: Settings) -> SQLiteWriteQueue | None:
+    """Apply the connection pragmas and, if enabled, route writes through a queue."""
+    sync_engine = async_engine.sync_engine
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    if not config.sqlite_single_writer:
+        return None
+    writer = SQLiteWriteQueue(timeout_seconds=config.sqlite_busy_timeout_ms / 1000)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _join_writer_queue(conn, cursor, statement, parameters, context, executemany) -> None:
+        if conn.info.get(_HOLDS_WRITER_KEY):
+            return
+        if not statement.lstrip()[:7].upper().startswith(_WRITE_PREFIXES):
+            return
+        # Runs inside SQLAlchemy's greenlet, so the queue can be awaited here.
+        await_only(writer.acquire())
+        conn.info[_HOLDS_WRITER_KEY] = True
+
+    def _leave_writer_queue(info: dict) -> None:
+        if info.pop(_HOLDS_WRITER_KEY, False):
+            writer.release()
+
+    @event.listens_for(sync_engine, "commit")
+    def _after_commit(conn) -> None:
+        _leave_writer_queue(conn.info)
+
+    @event.listens_for(sync_engine, "rollback")
+    def _after_rollback(conn) -> None:
+        _leave_writer_queue(conn.info)
+
+    @event.listens_for(sync_engine.pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record) -> None:
+        # Covers connections returned without an explicit commit or rollback.
+        _leave_writer_queue(connection_record.info)
+
+    return writer
@@ -1,18 +1,73 @@
-from fastapi import FastAPI
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from app import crud
 from app.api.routes import api_router
 from app.core.config import settings
+from app.core.load_shedding import LoadSheddingMiddleware, load_monitor
+from app.core.metrics import MetricsMiddleware, metrics
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.rate_limit import rate_limiter
+from app.core.security import password_hasher
+from app.db.pool import pool_status
+from app.db.query_tracking import QUERY_STATS_HEADER, QueryTrackingMiddleware
+from app.db.session import AsyncSessionLocal, engine, sqlite_writer, warm_pool
+from app.services.allocation import run_allocation_scheduler
+from app.services.drop_events import drop_events
+from app.services.group_commit import waitlist_pipeline
+from app.services.ranking import waitlist_rankings
+from app.services.waiting_room import waiting_room
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    await warm_pool(
+        engine,
+        settings.db_pool_size if settings.db_pool_warmup is None else settings.db_pool_warmup,
+    )
+    if settings.waitlist_ranking_enabled:
+        async with AsyncSessionLocal() as session:
+            drops = await crud.get_active_drops(session)
+            await waitlist_rankings.warm(session, [drop.id for drop in drops])
+    if settings.load_shed_enabled:
+        load_monitor.start(engine.pool)
+    scheduler = None
+    if settings.drop_allocation_enabled:
+        scheduler = asyncio.create_task(
+            run_allocation_scheduler(
+                AsyncSessionLocal,
+                interval_seconds=settings.drop_allocation_interval_seconds,
+            )
+        )
+    yield
+    if scheduler is not None:
+        scheduler.cancel()
+        with suppress(asyncio.CancelledError):
+            await scheduler
+    await load_monitor.stop()
+    await waitlist_pipeline.close()
+    drop_events.close()
+    password_hasher.shutdown()
 
-app = FastAPI(title=settings.project_name)
 
+app = FastAPI(title=settings.project_name, lifespan=lifespan)
+
+app.add_middleware(LoadSheddingMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_allow_origins,
     allow_credentials=True,
     allow_methods=settings.cors_allow_methods,
     allow_headers=settings.cors_allow_headers,
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", QUERY_STATS_HEADER],
 )
+app.add_middleware(QueryTrackingMiddleware)
+
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(api_router, prefix=settings.api_prefix)
 
@@ -21,3 +76,65 @@ app.include_router(api_router, prefix=settings.api_prefix)
 async def healthcheck() -> dict[str, str]:
     return {"status": "ok"}
 
+
+@app.get("/health/runtime", tags=["health"])
+async def runtime_stats() -> dict[str, dict[str, float | int]]:
+    return {
+        "password_hashing": password_hasher.stats(),
+        "db_pool": pool_status(engine.pool),
+        "sqlite_writer": sqlite_writer.stats() if sqlite_writer is not None else {},
+        "drop_events": drop_events.stats(),
+        "waitlist_group_commit": waitlist_pipeline.stats(),
+        "waiting_room": waiting_room.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "load": load_monitor.stats(),
+    }
+
+
+_pool_gauges = {
+    key: metrics.gauge(f"db_pool_{key}", f"Connection pool {key.replace('_', ' ')}.")
+    for key in ("size", "checked_out", "checked_in", "overflow")
+}
+_pool_checkouts = metrics.counter("db_pool_checkouts_total", "Connection pool checkouts.")
+_pool_timeouts = metrics.counter("db_pool_timeouts_total", "Connection pool checkout timeouts.")
+_pool_wait = metrics.counter("db_pool_wait_seconds_total", "Time spent waiting for a pooled connection.")
+
+
+def _collect_pool_stats() -> None:
+    status = pool_status(engine.pool)
+    if not status:
+        return
+    for key, gauge in _pool_gauges.items():
+        gauge.set(status[key])
+    _pool_checkouts.set(status["checkouts"])
+    _pool_timeouts.set(status["timeouts"])
+    _pool_wait.set(status["wait_seconds_total"])
+
+
+metrics.add_collector(_collect_pool_stats)
+
+_hash_queued = metrics.gauge("password_hash_queued", "Password operations waiting for a hashing worker.")
+_hash_in_flight = metrics.gauge("password_hash_in_flight", "Password operations running on a hashing worker.")
+_hash_operations = metrics.counter(
+    "password_hash_operations_total", "Finished password operations.", ("outcome",)
+)
+_hash_rejected = metrics.counter(
+    "password_hash_rejected_total", "Password operations rejected because the queue was full."
+)
+
+
+def _collect_password_hash_stats() -> None:
+    stats = password_hasher.stats()
+    _hash_queued.set(stats["queued"])
+    _hash_in_flight.set(stats["in_flight"])
+    _hash_operations.set(stats["succeeded"], "succeeded")
+    _hash_operations.set(stats["failed"], "failed")
+    _hash_rejected.set(stats["rejected"])
+
+
+metrics.add_collector(_collect_password_hash_stats)
+
+
+@app.get("/metrics", tags=["health"], include_in_schema=False)
+async def prometheus_metrics() -> Response:
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
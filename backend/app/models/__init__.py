@@ -1,6 +1,7 @@
 from app.models.drop import Drop
+from app.models.drop_allocation import DropAllocation
 from app.models.user import User
 from app.models.waitlist_entry import WaitlistEntry
 
-__all__ = ["User", "Drop", "WaitlistEntry"]
+__all__ = ["User", "Drop", "DropAllocation", "WaitlistEntry"]
 
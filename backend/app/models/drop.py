@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, Integer, String, Text
+from sqlalchemy import DateTime, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base_class import Base, TimestampMixin
@@ -11,21 +11,36 @@ from app.db.base_class import Base, TimestampMixin
 class Drop(TimestampMixin, Base):
     __tablename__ = "drops"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=True)
     capacity: Mapped[int] = mapped_column(Integer, nullable=False)
     claim_window_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     claim_window_end: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     is_active: Mapped[bool] = mapped_column(default=True, nullable=False)
+    settled_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Denormalised waitlist counters, maintained by the waitlist service.
+    joined_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    claimed_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
 
     waitlist_entries = relationship(
         "WaitlistEntry",
         back_populates="drop",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,
+        lazy="raise",
     )
 
     def __repr__(self) -> str:
         return f"Drop(id={self.id!r}, name={self.name!r})"
 
+
+Index("ix_drops_active_window", Drop.is_active, Drop.claim_window_start, Drop.id)
+# The settlement scheduler polls this every few seconds; settled drops drop out of it.
+Index(
+    "ix_drops_unsettled_window",
+    Drop.is_active,
+    Drop.claim_window_start,
+    sqlite_where=Drop.settled_at.is_(None),
+    postgresql_where=Drop.settled_at.is_(None),
+)
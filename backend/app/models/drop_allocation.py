@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base_class import Base, TimestampMixin
+
+
+class DropAllocation(TimestampMixin, Base):
+    """A winning waitlist slot, fixed when the drop's claim window opens."""
+
+    __tablename__ = "drop_allocations"
+
+    drop_id: Mapped[int] = mapped_column(
+        ForeignKey("drops.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    entry_id: Mapped[int] = mapped_column(
+        ForeignKey("waitlist_entries.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+    )
+    rank: Mapped[int] = mapped_column(Integer, nullable=False)
+    claim_code: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"DropAllocation(drop_id={self.drop_id!r}, user_id={self.user_id!r}, rank={self.rank!r})"
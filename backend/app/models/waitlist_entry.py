@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String, UniqueConstraint
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Numeric, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base_class import Base, TimestampMixin
@@ -14,7 +14,7 @@ class WaitlistEntry(TimestampMixin, Base):
         UniqueConstraint("user_id", "drop_id", name="uq_waitlist_user_drop"),
     )
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
@@ -35,9 +35,24 @@ class WaitlistEntry(TimestampMixin, Base):
         nullable=True,
     )
 
-    user = relationship("User", back_populates="waitlist_entries", lazy="joined")
-    drop = relationship("Drop", back_populates="waitlist_entries", lazy="joined")
+    user = relationship("User", back_populates="waitlist_entries", lazy="raise")
+    drop = relationship("Drop", back_populates="waitlist_entries", lazy="raise")
 
     def __repr__(self) -> str:
         return f"WaitlistEntry(id={self.id!r}, user_id={self.user_id!r}, drop_id={self.drop_id!r})"
 
+
+Index(
+    "ix_waitlist_entries_drop_state_priority",
+    WaitlistEntry.drop_id,
+    WaitlistEntry.state,
+    WaitlistEntry.priority_score.desc(),
+    WaitlistEntry.joined_at,
+    WaitlistEntry.id,
+)
+Index(
+    "ix_waitlist_entries_claim_code",
+    WaitlistEntry.claim_code,
+    sqlite_where=WaitlistEntry.claim_code.is_not(None),
+    postgresql_where=WaitlistEntry.claim_code.is_not(None),
+)
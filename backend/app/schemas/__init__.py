@@ -1,24 +1,43 @@
 from app.schemas.auth import AuthResponse
-from app.schemas.claim import ClaimResponse
-from app.schemas.drop import DropCreate, DropRead, DropUpdate
+from app.schemas.claim import ClaimResponse, DropSettlement, QueueStatus, QueueTicketResponse
+from app.schemas.drop import DropCreate, DropPhase, DropRead, DropUpdate
 from app.schemas.token import Token, TokenPayload
-from app.schemas.user import UserCreate, UserInDB, UserLogin, UserRead
-from app.schemas.waitlist import WaitlistEntryRead, WaitlistJoinResponse, WaitlistLeaveResponse
+from app.schemas.user import UserCreate, UserInDB, UserLogin, UserPrincipal, UserRead
+from app.schemas.waitlist import (
+    BulkJoinRequest,
+    BulkJoinResponse,
+    BulkJoinRowResult,
+    WaitlistEntryRead,
+    WaitlistJoinResponse,
+    WaitlistLeaveResponse,
+    WaitlistRankingCheck,
+    WaitlistRescoreResult,
+)
 
 __all__ = [
     "AuthResponse",
+    "BulkJoinRequest",
+    "BulkJoinResponse",
+    "BulkJoinRowResult",
     "ClaimResponse",
     "DropCreate",
+    "DropPhase",
     "DropRead",
+    "DropSettlement",
     "DropUpdate",
+    "QueueStatus",
+    "QueueTicketResponse",
     "Token",
     "TokenPayload",
     "UserCreate",
     "UserInDB",
     "UserLogin",
+    "UserPrincipal",
     "UserRead",
     "WaitlistEntryRead",
     "WaitlistJoinResponse",
     "WaitlistLeaveResponse",
+    "WaitlistRankingCheck",
+    "WaitlistRescoreResult",
 ]
 
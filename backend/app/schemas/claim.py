@@ -10,3 +10,20 @@ class ClaimResponse(BaseModel):
     claimed_at: datetime
     position: int
 
+
+class QueueStatus(BaseModel):
+    drop_id: int
+    position: int
+    admitted: bool
+    ahead: int
+    retry_after_seconds: float
+
+
+class QueueTicketResponse(QueueStatus):
+    ticket: str
+
+
+class DropSettlement(BaseModel):
+    drop_id: int
+    settled_at: datetime | None
+    allocated: int
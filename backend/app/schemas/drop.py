@@ -1,8 +1,15 @@
 from __future__ import annotations
 
 from datetime import datetime
+from enum import Enum
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field
+
+
+class DropPhase(str, Enum):
+    UPCOMING = "upcoming"
+    LIVE = "live"
+    ENDED = "ended"
 
 
 class DropBase(BaseModel):
@@ -29,8 +36,15 @@ class DropUpdate(BaseModel):
 
 class DropRead(DropBase):
     id: int
+    joined_count: int = 0
+    claimed_count: int = 0
     created_at: datetime
     updated_at: datetime
 
+    @computed_field
+    @property
+    def remaining(self) -> int:
+        return max(self.capacity - self.claimed_count, 0)
+
     model_config = {"from_attributes": True}
 
@@ -31,3 +31,12 @@ class UserRead(UserBase):
 class UserInDB(UserRead):
     hashed_password: str
 
+
+class UserPrincipal(BaseModel):
+    id: int
+    email: EmailStr
+    is_active: bool
+    is_admin: bool
+    created_at: datetime
+
+    model_config = {"from_attributes": True, "frozen": True}
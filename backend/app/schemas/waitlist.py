@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, EmailStr, Field
 
 
 class WaitlistEntryRead(BaseModel):
@@ -29,3 +29,34 @@ class WaitlistLeaveResponse(BaseModel):
     success: bool
     state: str
 
+
+class WaitlistRescoreResult(BaseModel):
+    drop_id: int
+    rescored: int
+
+
+class WaitlistRankingCheck(BaseModel):
+    drop_id: int
+    consistent: bool
+    size: int
+
+
+class BulkJoinRequest(BaseModel):
+    user_ids: list[int] = Field(default_factory=list)
+    emails: list[EmailStr] = Field(default_factory=list)
+
+
+class BulkJoinRowResult(BaseModel):
+    user_id: int | None = None
+    email: str | None = None
+    status: str
+    entry_id: int | None = None
+
+    model_config = {"from_attributes": True}
+
+
+class BulkJoinResponse(BaseModel):
+    results: list[BulkJoinRowResult]
+    created: int
+    rejoined: int
+    skipped: int
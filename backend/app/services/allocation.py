@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app import crud
+from app.core.dates import as_utc
+from app.models.drop import Drop
+from app.services.drop_events import drop_events
+
+logger = logging.getLogger(__name__)
+
+
+def claim_code_for(
+    *,
+    user_id: int,
+    drop_id: int,
+    priority_score: float | Decimal,
+    joined_at: datetime,
+) -> str:
+    raw = f"{user_id}|{drop_id}|{float(priority_score):.4f}|{as_utc(joined_at).isoformat()}"
+    digest = hashlib.sha256(raw.encode()).hexdigest()
+    return digest[:16].upper()
+
+
+class AllocationService:
+    """Fixes a drop's winning entries once its claim window opens.
+
+    Settlement ranks the waitlist once and stores the top ``capacity``
+    entries, with their claim codes, in ``drop_allocations``. Claims then only
+    need a primary-key lookup. Slots freed by leaves or capacity increases
+    are refilled from the best unallocated entries; capacity decreases drop
+    the lowest-ranked unclaimed slots.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def settle(self, drop: Drop, *, now: datetime | None = None, force: bool = False) -> int:
+        """Allocate ``drop``; returns the number of slots handed out.
+
+        Without ``force`` this is a no-op if the drop was already settled,
+        including by a concurrent request.
+        """
+        now = now or datetime.now(timezone.utc)
+        if force:
+            await crud.delete_drop_allocations(self.session, drop_id=drop.id)
+        settled = await crud.mark_drop_settled(
+            self.session,
+            drop_id=drop.id,
+            settled_at=now,
+            only_unsettled=not force,
+        )
+        if not settled:
+            return 0
+        return await self._fill(drop, start_rank=0, slots=drop.capacity)
+
+    async def refill(self, drop: Drop) -> int:
+        # Concurrent refills would otherwise each see a free slot and overfill.
+        await crud.lock_drop(self.session, drop.id)
+        # Ranks are reported as claim positions, so close the gaps left by
+        # released slots before appending new ones.
+        allocated = await crud.renumber_drop_allocations(self.session, drop_id=drop.id)
+        return await self._fill(drop, start_rank=allocated, slots=drop.capacity - allocated)
+
+    async def release(self, drop: Drop, *, user_id: int) -> int:
+        """Free ``user_id``'s slot after a leave and hand it to the next entry."""
+        released = await crud.delete_drop_allocations(
+            self.session,
+            drop_id=drop.id,
+            user_ids=[user_id],
+        )
+        if not released:
+            return 0
+        return await self.refill(drop)
+
+    async def rebalance(self, drop: Drop) -> None:
+        """Match the allocation to a changed ``drop.capacity``.
+
+        Claimed slots are never revoked, so a drop shrunk below its claimed
+        count stays over-allocated.
+        """
+        allocations = await crud.list_drop_allocations(self.session, drop_id=drop.id)
+        excess = len(allocations) - drop.capacity
+        if excess <= 0:
+            await self.refill(drop)
+            return
+        revocable = [user_id for user_id, _, state in reversed(allocations) if state != "claimed"]
+        await crud.delete_drop_allocations(
+            self.session,
+            drop_id=drop.id,
+            user_ids=revocable[:excess],
+        )
+        await crud.renumber_drop_allocations(self.session, drop_id=drop.id)
+
+    async def reset(self, drop: Drop) -> None:
+        """Forget the allocation so the drop settles again when its window opens."""
+        await crud.delete_drop_allocations(self.session, drop_id=drop.id)
+        await crud.mark_drop_settled(
+            self.session,
+            drop_id=drop.id,
+            settled_at=None,
+            only_unsettled=False,
+        )
+
+    async def apply_drop_update(self, drop: Drop, *, changed: Iterable[str]) -> None:
+        if drop.settled_at is None:
+            return
+        changed = set(changed)
+        if "claim_window_start" in changed:
+            await self.reset(drop)
+        elif "capacity" in changed:
+            await self.rebalance(drop)
+
+    async def _fill(self, drop: Drop, *, start_rank: int, slots: int) -> int:
+        candidates = await crud.list_allocation_candidates(
+            self.session,
+            drop_id=drop.id,
+            limit=slots,
+        )
+        rows = [
+            {
+                "drop_id": drop.id,
+                "user_id": user_id,
+                "entry_id": entry_id,
+                "rank": start_rank + offset,
+                "claim_code": claim_code_for(
+                    user_id=user_id,
+                    drop_id=drop.id,
+                    priority_score=priority_score,
+                    joined_at=joined_at,
+                ),
+            }
+            for offset, (entry_id, user_id, priority_score, joined_at) in enumerate(
+                candidates, start=1
+            )
+        ]
+        return await crud.insert_drop_allocations(self.session, rows)
+
+
+async def settle_due_drops(session: AsyncSession, *, now: datetime | None = None) -> list[int]:
+    now = now or datetime.now(timezone.utc)
+    service = AllocationService(session)
+    settled = []
+    for drop in await crud.get_due_unsettled_drops(session, now=now):
+        await service.settle(drop, now=now)
+        await session.commit()
+        settled.append(drop.id)
+    return settled
+
+
+async def run_allocation_scheduler(
+    session_factory: async_sessionmaker[AsyncSession],
+    *,
+    interval_seconds: float,
+) -> None:
+    """Settle drops as their claim windows open until cancelled."""
+    while True:
+        try:
+            async with session_factory() as session:
+                for drop_id in await settle_due_drops(session):
+                    drop_events.notify(drop_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Drop settlement failed")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from dataclasses import dataclass
+
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.core.config import settings
+from app.core.pagination import Cursor, decode_cursor, encode_cursor
+from app.schemas.drop import DropPhase, DropRead
+
+_drop_list_adapter = TypeAdapter(list[DropRead])
+
+
+@dataclass(frozen=True)
+class DropListPage:
+    body: bytes
+    etag: str
+    next_cursor: str | None = None
+
+
+async def build_drop_list_page(
+    session: AsyncSession,
+    *,
+    limit: int,
+    after: Cursor | None = None,
+    phase: DropPhase | None = None,
+) -> DropListPage:
+    drops = await crud.get_active_drops(session, limit=limit + 1, after=after, phase=phase)
+    next_cursor = None
+    if len(drops) > limit:
+        drops = drops[:limit]
+        next_cursor = encode_cursor(drops[-1].claim_window_start, drops[-1].id)
+    body = _drop_list_adapter.dump_json([DropRead.model_validate(drop) for drop in drops])
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    return DropListPage(body=body, etag=etag, next_cursor=next_cursor)
+
+
+class DropListSnapshot:
+    """Serialized pages of the public drop list.
+
+    Pages are kept until an admin change calls ``invalidate``. ``ttl_seconds``
+    only bounds how long another worker process can serve a page after such
+    a change. Phase-filtered pages depend on the clock and are not cached.
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_pages: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_pages = max_pages
+        self._version = 0
+        self._pages: dict[tuple[int, str | None], tuple[float, DropListPage]] = {}
+
+    async def get_page(
+        self,
+        session: AsyncSession,
+        *,
+        limit: int,
+        cursor: str | None = None,
+    ) -> DropListPage:
+        key = (limit, cursor)
+        cached = self._pages.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        version = self._version
+        after = decode_cursor(cursor) if cursor else None
+        page = await build_drop_list_page(session, limit=limit, after=after)
+        # Skip storing a page built from data an admin change has since replaced.
+        if version == self._version:
+            if len(self._pages) >= self.max_pages:
+                self._pages.clear()
+            self._pages[key] = (time.monotonic() + self.ttl_seconds, page)
+        return page
+
+    def invalidate(self) -> None:
+        self._version += 1
+        self._pages.clear()
+
+
+drop_list_snapshot = DropListSnapshot(ttl_seconds=settings.drop_list_cache_ttl_seconds)
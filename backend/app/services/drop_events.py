@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app import crud
+from app.core.config import settings
+from app.core.dates import as_utc
+from app.core.process import start_background_task
+from app.db.session import AsyncSessionLocal
+from app.models.drop import Drop
+from app.schemas.drop import DropPhase
+from app.services.ranking import DropRanking, waitlist_rankings
+
+logger = logging.getLogger(__name__)
+
+# Keeps the IN list of the per-tick state lookup bounded.
+_STATE_CHUNK_SIZE = 1000
+
+
+def drop_phase(drop: Drop, now: datetime) -> DropPhase:
+    if now < as_utc(drop.claim_window_start):
+        return DropPhase.UPCOMING
+    if now <= as_utc(drop.claim_window_end):
+        return DropPhase.LIVE
+    return DropPhase.ENDED
+
+
+class DropSubscription:
+    """One client's view of a drop: a small buffer of its latest updates.
+
+    Updates identical to the last one queued are skipped, and once
+    ``buffer_size`` updates are waiting the oldest is dropped, so a slow
+    client only ever falls behind to the newest state.
+    """
+
+    def __init__(self, user_id: int, *, buffer_size: int):
+        self.user_id = user_id
+        self._buffer: deque[dict[str, Any]] = deque(maxlen=buffer_size)
+        self._ready = asyncio.Event()
+        self._last: dict[str, Any] | None = None
+        self.dropped = 0
+
+    def push(self, update: dict[str, Any]) -> None:
+        if update == self._last:
+            return
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._last = update
+        self._buffer.append(update)
+        self._ready.set()
+
+    async def next(self, timeout: float) -> dict[str, Any] | None:
+        """The oldest buffered update, or ``None`` after ``timeout`` seconds idle."""
+        if not self._buffer:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._buffer.popleft()
+
+
+class DropBroadcaster:
+    """Computes a drop's state once per burst of changes and fans it out.
+
+    ``notify`` only marks the drop dirty; a single task waits
+    ``coalesce_seconds`` so that a burst of joins costs one publish, reads
+    the drop, its ranking and the subscribers' entries, and pushes each
+    subscriber its own position. The task also wakes at the claim window's
+    start and end so phase transitions are pushed without any write.
+    """
+
+    def __init__(
+        self,
+        drop_id: int,
+        *,
+        session_factory: async_sessionmaker[AsyncSession],
+        coalesce_seconds: float,
+    ):
+        self.drop_id = drop_id
+        self.session_factory = session_factory
+        self.coalesce_seconds = coalesce_seconds
+        self.subscribers: set[DropSubscription] = set()
+        self._dirty = asyncio.Event()
+        self._transitions: list[datetime] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._dirty.set()
+            self._task = start_background_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def notify(self) -> None:
+        self._dirty.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._dirty.wait(), self._seconds_to_transition())
+            except asyncio.TimeoutError:
+                pass
+            self._dirty.clear()
+            await asyncio.sleep(self.coalesce_seconds)
+            try:
+                await self.publish()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Publishing drop %s events failed", self.drop_id)
+
+    def _seconds_to_transition(self) -> float | None:
+        now = datetime.now(timezone.utc)
+        upcoming = [moment for moment in self._transitions if moment > now]
+        if not upcoming:
+            return None
+        return (min(upcoming) - now).total_seconds()
+
+    async def publish(self) -> None:
+        subscribers = list(self.subscribers)
+        async with self.session_factory() as session:
+            drop = await crud.get_drop(session, self.drop_id)
+            if drop is None or not drop.is_active:
+                for subscriber in subscribers:
+                    subscriber.push({"drop_id": self.drop_id, "phase": "closed"})
+                self._transitions = []
+                return
+            self._transitions = [as_utc(drop.claim_window_start), as_utc(drop.claim_window_end)]
+
+            states: dict[int, tuple[int, str]] = {}
+            user_ids = sorted({subscriber.user_id for subscriber in subscribers})
+            for start in range(0, len(user_ids), _STATE_CHUNK_SIZE):
+                states.update(
+                    await crud.get_waitlist_states(
+                        session,
+                        drop_id=drop.id,
+                        user_ids=user_ids[start : start + _STATE_CHUNK_SIZE],
+                    )
+                )
+            position_of = await self._position_lookup(session, drop)
+
+        remaining = max(drop.capacity - drop.claimed_count, 0)
+        shared = {
+            "drop_id": drop.id,
+            "phase": drop_phase(drop, datetime.now(timezone.utc)).value,
+            "capacity": drop.capacity,
+            "joined_count": drop.joined_count,
+            "remaining": remaining,
+        }
+        for subscriber in subscribers:
+            entry_id, state = states.get(subscriber.user_id, (None, None))
+            position = position_of(subscriber.user_id, entry_id) if state == "joined" else None
+            subscriber.push(
+                {
+                    **shared,
+                    "state": state,
+                    "position": position,
+                    "eligible": position is not None and position <= drop.capacity and remaining > 0,
+                }
+            )
+
+    async def _position_lookup(
+        self,
+        session: AsyncSession,
+        drop: Drop,
+    ) -> Callable[[int, int | None], int | None]:
+        """``(user_id, entry_id) -> position`` the way a claim would rank the user."""
+        ranking = None
+        if settings.waitlist_ranking_enabled:
+            ranking = await waitlist_rankings.get_or_load(session, drop.id)
+        if ranking is None:
+            ranking = DropRanking(drop.id, await crud.list_waitlist_ranking(session, drop_id=drop.id))
+        if not (settings.drop_allocation_enabled and drop.settled_at is not None):
+            return lambda user_id, entry_id: ranking.position(entry_id) if entry_id else None
+
+        allocated = await crud.list_allocated_entries(session, drop_id=drop.id)
+        ranks = {user_id: rank for user_id, _, rank in allocated}
+        # Unclaimed winners are still in the ranking; the rest of the queue
+        # continues after the last allocated slot without counting them again.
+        winners = sorted(filter(None, (ranking.position(entry_id) for _, entry_id, _ in allocated)))
+
+        def position_of(user_id: int, entry_id: int | None) -> int | None:
+            if user_id in ranks:
+                return ranks[user_id]
+            queued = ranking.position(entry_id) if entry_id else None
+            if queued is None:
+                return None
+            return len(ranks) + queued - bisect_left(winners, queued)
+
+        return position_of
+
+
+class DropEventHub:
+    """Process-wide registry with one broadcaster per drop that has subscribers."""
+
+    def __init__(
+        self,
+        *,
+        session_factory: async_sessionmaker[AsyncSession],
+        coalesce_seconds: float,
+        buffer_size: int,
+    ):
+        self.session_factory = session_factory
+        self.coalesce_seconds = coalesce_seconds
+        self.buffer_size = buffer_size
+        self._broadcasters: dict[int, DropBroadcaster] = {}
+
+    def subscribe(self, drop_id: int, user_id: int) -> DropSubscription:
+        broadcaster = self._broadcasters.get(drop_id)
+        if broadcaster is None:
+            broadcaster = self._broadcasters[drop_id] = DropBroadcaster(
+                drop_id,
+                session_factory=self.session_factory,
+                coalesce_seconds=self.coalesce_seconds,
+            )
+        subscription = DropSubscription(user_id, buffer_size=self.buffer_size)
+        broadcaster.subscribers.add(subscription)
+        broadcaster.start()
+        # The new client needs its first snapshot.
+        broadcaster.notify()
+        return subscription
+
+    def unsubscribe(self, drop_id: int, subscription: DropSubscription) -> None:
+        broadcaster = self._broadcasters.get(drop_id)
+        if broadcaster is None:
+            return
+        broadcaster.subscribers.discard(subscription)
+        if not broadcaster.subscribers:
+            broadcaster.stop()
+            del self._broadcasters[drop_id]
+
+    def notify(self, drop_id: int) -> None:
+        broadcaster = self._broadcasters.get(drop_id)
+        if broadcaster is not None:
+            broadcaster.notify()
+
+    def subscriber_count(self, drop_id: int | None = None) -> int:
+        if drop_id is not None:
+            broadcaster = self._broadcasters.get(drop_id)
+            return len(broadcaster.subscribers) if broadcaster else 0
+        return sum(len(broadcaster.subscribers) for broadcaster in self._broadcasters.values())
+
+    def stats(self) -> dict[str, int]:
+        return {"drops": len(self._broadcasters), "subscribers": self.subscriber_count()}
+
+    def close(self) -> None:
+        for broadcaster in self._broadcasters.values():
+            broadcaster.stop()
+        self._broadcasters.clear()
+
+
+drop_events = DropEventHub(
+    session_factory=AsyncSessionLocal,
+    coalesce_seconds=settings.drop_events_coalesce_seconds,
+    buffer_size=settings.drop_events_buffer_size,
+)
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import waitlist_commit_batch_size
+from app.core.process import start_background_task
+from app.db.session import AsyncSessionLocal
+from app.models.drop import Drop
+from app.models.waitlist_entry import WaitlistEntry
+from app.schemas.user import UserPrincipal
+from app.services.waitlist import WaitlistService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Mutation:
+    kind: Literal["join", "leave"]
+    user: UserPrincipal
+    drop: Drop
+    future: asyncio.Future = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+
+
+class WaitlistCommitPipeline:
+    """Group commit for waitlist joins and leaves.
+
+    Callers enqueue a mutation and await its future. A single flusher task
+    collects up to ``max_batch`` mutations, or whatever arrived within
+    ``max_wait_seconds`` of the first one, applies them in arrival order
+    through ``WaitlistService`` in one session and commits once, then
+    resolves each future with the service's own return value. Because one
+    task applies mutations in order, a user's join and leave land in the
+    order they were submitted, and repeats stay as idempotent as they are
+    without batching.
+
+    If anything in a batch fails, the batch is rolled back and replayed one
+    mutation per transaction, so a bad mutation only fails its own caller.
+    """
+
+    def __init__(
+        self,
+        *,
+        session_factory: async_sessionmaker[AsyncSession],
+        max_batch: int,
+        max_wait_seconds: float,
+    ):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_wait_seconds = max_wait_seconds
+        self._queue: asyncio.Queue[_Mutation | None] | None = None
+        self._task: asyncio.Task | None = None
+        self.batches = 0
+        self.mutations = 0
+        self.replays = 0
+
+    async def join(self, *, user: UserPrincipal, drop: Drop) -> tuple[WaitlistEntry, bool]:
+        return await self._submit("join", user, drop)
+
+    async def leave(self, *, user: UserPrincipal, drop: Drop) -> WaitlistEntry | None:
+        return await self._submit("leave", user, drop)
+
+    async def _submit(self, kind: Literal["join", "leave"], user: UserPrincipal, drop: Drop) -> Any:
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = start_background_task(self._run())
+        mutation = _Mutation(kind, user, drop)
+        self._queue.put_nowait(mutation)
+        return await mutation.future
+
+    async def _run(self) -> None:
+        # ``None`` is queued by ``close``; everything before it is flushed.
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            first = await self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = loop.time() + self.max_wait_seconds
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    mutation = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if mutation is None:
+                    closing = True
+                    break
+                batch.append(mutation)
+            try:
+                await self._flush(batch)
+            except asyncio.CancelledError:
+                for mutation in batch:
+                    mutation.future.cancel()
+                raise
+            except Exception:
+                logger.exception("Waitlist group commit failed")
+
+    async def _flush(self, batch: list[_Mutation]) -> None:
+        self.batches += 1
+        self.mutations += len(batch)
+        waitlist_commit_batch_size.observe(len(batch))
+        try:
+            async with self.session_factory() as session:
+                results = [await self._apply(session, mutation) for mutation in batch]
+                await session.commit()
+        except Exception as exc:
+            if len(batch) == 1:
+                self._fail(batch[0], exc)
+                return
+            self.replays += 1
+            for mutation in batch:
+                await self._flush_one(mutation)
+            return
+        for mutation, result in zip(batch, results):
+            if not mutation.future.done():
+                mutation.future.set_result(result)
+
+    async def _flush_one(self, mutation: _Mutation) -> None:
+        try:
+            async with self.session_factory() as session:
+                result = await self._apply(session, mutation)
+                await session.commit()
+        except Exception as exc:
+            self._fail(mutation, exc)
+            return
+        if not mutation.future.done():
+            mutation.future.set_result(result)
+
+    @staticmethod
+    async def _apply(session: AsyncSession, mutation: _Mutation) -> Any:
+        service = WaitlistService(session)
+        if mutation.kind == "join":
+            return await service.join_waitlist(user=mutation.user, drop=mutation.drop)
+        return await service.leave_waitlist(user=mutation.user, drop=mutation.drop)
+
+    @staticmethod
+    def _fail(mutation: _Mutation, exc: BaseException) -> None:
+        if not mutation.future.done():
+            mutation.future.set_exception(exc)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "batches": self.batches,
+            "mutations": self.mutations,
+            "replays": self.replays,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+    async def close(self) -> None:
+        """Apply what is already queued, then stop the flusher."""
+        if self._task is None:
+            return
+        self._queue.put_nowait(None)
+        task, self._task = self._task, None
+        await task
+
+
+waitlist_pipeline = WaitlistCommitPipeline(
+    session_factory=AsyncSessionLocal,
+    max_batch=settings.waitlist_group_commit_max_batch,
+    max_wait_seconds=settings.waitlist_group_commit_max_wait_seconds,
+)
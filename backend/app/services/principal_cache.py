@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.core.config import settings
+from app.models.user import User
+from app.schemas.user import UserPrincipal
+
+_INVALIDATED_KEY = "principal_cache_invalidated"
+_ALL = object()
+
+
+class PrincipalCache:
+    """Bounded LRU of authenticated principals keyed by token subject.
+
+    Entries expire after ``ttl_seconds``, which bounds how long another
+    worker process can serve a principal after the user row changes. Changes
+    made through the ORM in this process evict the entry immediately and
+    again once the change commits.
+    """
+
+    def __init__(self, *, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, UserPrincipal]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, subject: str) -> UserPrincipal | None:
+        key = subject.lower()
+        cached = self._entries.get(key)
+        if cached is None:
+            return None
+        expires_at, principal = cached
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return principal
+
+    def set(self, subject: str, principal: UserPrincipal) -> None:
+        if self.max_size <= 0:
+            return
+        key = subject.lower()
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, principal)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, subject: str | None = None) -> None:
+        if subject is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(subject.lower(), None)
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.auth_cache_max_size,
+    ttl_seconds=settings.auth_cache_ttl_seconds,
+)
+
+
+def _invalidate(session: Session, subject: str | None) -> None:
+    principal_cache.invalidate(subject)
+    session.info.setdefault(_INVALIDATED_KEY, set()).add(_ALL if subject is None else subject)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _evict_changed_user(mapper, connection, target: User) -> None:
+    subjects = {target.email, *inspect(target).attrs.email.history.deleted}
+    session = Session.object_session(target)
+    for subject in subjects:
+        if session is not None:
+            _invalidate(session, subject)
+        else:
+            principal_cache.invalidate(subject)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _evict_bulk_user_changes(orm_execute_state: ORMExecuteState) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is User:
+        # Bulk statements can touch any row; drop everything.
+        _invalidate(orm_execute_state.session, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed_users(session: Session) -> None:
+    # Requests that re-cached a principal before the commit landed would
+    # otherwise keep the old flags until the TTL expires.
+    for subject in session.info.pop(_INVALIDATED_KEY, ()):
+        principal_cache.invalidate(None if subject is _ALL else subject)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_users(session: Session) -> None:
+    session.info.pop(_INVALIDATED_KEY, None)
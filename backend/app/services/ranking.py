@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left, insort
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.dates import as_utc
+
+RankKey = tuple[Decimal, datetime, int]
+
+_SCORE_QUANTUM = Decimal("0.000001")
+_STAGED_KEY = "waitlist_ranking_ops"
+_STAGED_DROPS_KEY = "waitlist_ranking_staged_drops"
+_LOADED_KEY = "waitlist_ranking_loaded"
+
+
+def _rank_key(entry_id: int, priority_score: float | Decimal, joined_at: datetime) -> RankKey:
+    # Scores are stored as Numeric(16, 6); quantize so in-memory floats and
+    # database decimals compare the same way the database orders them.
+    score = Decimal(str(priority_score)).quantize(_SCORE_QUANTUM)
+    return (-score, as_utc(joined_at), entry_id)
+
+
+class DropRanking:
+    """Sorted ``(-priority_score, joined_at, entry_id)`` keys for one drop's joined entries."""
+
+    def __init__(self, drop_id: int, rows: Iterable[tuple[int, float | Decimal, datetime]] = ()):
+        self.drop_id = drop_id
+        self._by_entry: dict[int, RankKey] = {
+            entry_id: _rank_key(entry_id, score, joined_at) for entry_id, score, joined_at in rows
+        }
+        self._keys: list[RankKey] = sorted(self._by_entry.values())
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, entry_id: int) -> bool:
+        return entry_id in self._by_entry
+
+    def add(self, entry_id: int, priority_score: float | Decimal, joined_at: datetime) -> None:
+        self.discard(entry_id)
+        key = _rank_key(entry_id, priority_score, joined_at)
+        self._by_entry[entry_id] = key
+        insort(self._keys, key)
+
+    def discard(self, entry_id: int) -> None:
+        key = self._by_entry.pop(entry_id, None)
+        if key is None:
+            return
+        index = bisect_left(self._keys, key)
+        del self._keys[index]
+
+    def position(self, entry_id: int) -> int | None:
+        key = self._by_entry.get(entry_id)
+        if key is None:
+            return None
+        return bisect_left(self._keys, key) + 1
+
+    def top(self, count: int) -> list[int]:
+        return [key[2] for key in self._keys[:count]]
+
+    def entry_ids(self) -> list[int]:
+        return [key[2] for key in self._keys]
+
+
+class RankingRegistry:
+    """Process-local rankings keyed by drop id.
+
+    Rankings are rebuilt from ``waitlist_entries`` on a miss or once they are
+    older than ``ttl_seconds``, which bounds drift from writes made by other
+    processes. Staged changes only become visible once the session that
+    staged them commits.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._rankings: dict[int, DropRanking] = {}
+        self._loading: dict[int, list[Callable[[DropRanking], None]]] = {}
+
+    def get(self, drop_id: int) -> DropRanking | None:
+        ranking = self._rankings.get(drop_id)
+        if ranking is None:
+            return None
+        if time.monotonic() - ranking.loaded_at > self.ttl_seconds:
+            del self._rankings[drop_id]
+            return None
+        return ranking
+
+    async def load(self, session: AsyncSession, drop_id: int) -> DropRanking:
+        # Commits that land while the rows are being read are replayed on top.
+        replay = self._loading.setdefault(drop_id, [])
+        try:
+            rows = await crud.list_waitlist_ranking(session, drop_id=drop_id)
+        finally:
+            self._loading.pop(drop_id, None)
+        ranking = DropRanking(drop_id, rows)
+        for op in replay:
+            op(ranking)
+        self._rankings[drop_id] = ranking
+        session.info.setdefault(_LOADED_KEY, set()).add(drop_id)
+        return ranking
+
+    async def get_or_load(self, session: AsyncSession, drop_id: int) -> DropRanking | None:
+        """Ranking as seen by ``session``, or ``None`` if it has uncommitted changes to it."""
+        if drop_id in session.info.get(_STAGED_DROPS_KEY, ()):
+            return None
+        ranking = self.get(drop_id)
+        if ranking is None:
+            ranking = await self.load(session, drop_id)
+        return ranking
+
+    async def warm(self, session: AsyncSession, drop_ids: Iterable[int]) -> None:
+        for drop_id in drop_ids:
+            await self.load(session, drop_id)
+
+    async def verify(self, session: AsyncSession, drop_id: int) -> bool:
+        """Compare the cached ordering with the database and rebuild it on mismatch."""
+        ranking = self._rankings.get(drop_id)
+        rows = await crud.list_waitlist_ranking(session, drop_id=drop_id)
+        consistent = ranking is not None and ranking.entry_ids() == [row[0] for row in rows]
+        if not consistent:
+            self._rankings[drop_id] = DropRanking(drop_id, rows)
+        return consistent
+
+    def invalidate(self, drop_id: int | None = None) -> None:
+        if drop_id is None:
+            self._rankings.clear()
+        else:
+            self._rankings.pop(drop_id, None)
+
+    def stage_add(
+        self,
+        session: AsyncSession,
+        *,
+        drop_id: int,
+        entry_id: int,
+        priority_score: float | Decimal,
+        joined_at: datetime,
+    ) -> None:
+        self._stage(
+            session,
+            drop_id,
+            lambda ranking: ranking.add(entry_id, priority_score, joined_at),
+        )
+
+    def stage_discard(self, session: AsyncSession, *, drop_id: int, entry_id: int) -> None:
+        self._stage(session, drop_id, lambda ranking: ranking.discard(entry_id))
+
+    def stage_invalidate(self, session: AsyncSession, *, drop_id: int) -> None:
+        """Drop the ranking after commit; cheaper than replaying large batches."""
+        session.info.setdefault(_STAGED_KEY, []).append(lambda: self.invalidate(drop_id))
+        session.info.setdefault(_STAGED_DROPS_KEY, set()).add(drop_id)
+
+    def _stage(
+        self,
+        session: AsyncSession,
+        drop_id: int,
+        op: Callable[[DropRanking], None],
+    ) -> None:
+        session.info.setdefault(_STAGED_KEY, []).append(lambda: self._apply(drop_id, op))
+        session.info.setdefault(_STAGED_DROPS_KEY, set()).add(drop_id)
+
+    def _apply(self, drop_id: int, op: Callable[[DropRanking], None]) -> None:
+        ranking = self._rankings.get(drop_id)
+        if ranking is not None:
+            op(ranking)
+        if drop_id in self._loading:
+            self._loading[drop_id].append(op)
+
+
+waitlist_rankings = RankingRegistry(ttl_seconds=settings.waitlist_ranking_ttl_seconds)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_staged_ranking_ops(session: Session) -> None:
+    session.info.pop(_LOADED_KEY, None)
+    session.info.pop(_STAGED_DROPS_KEY, None)
+    for op in session.info.pop(_STAGED_KEY, ()):
+        op()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_staged_ranking_ops(session: Session) -> None:
+    loaded = session.info.pop(_LOADED_KEY, set())
+    session.info.pop(_STAGED_DROPS_KEY, None)
+    if session.info.pop(_STAGED_KEY, None):
+        # Rankings loaded inside this transaction may include its rolled back writes.
+        for drop_id in loaded:
+            waitlist_rankings.invalidate(drop_id)
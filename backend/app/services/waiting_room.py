@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import math
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.core.dates import as_utc
+from app.models.drop import Drop
+
+QUEUE_TICKET_HEADER = "X-Queue-Ticket"
+
+
+class InvalidTicketError(ValueError):
+    pass
+
+
+class ClaimSlotsBusyError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class QueueTicket:
+    drop_id: int
+    user_id: int
+    sequence: int
+    expires_at: float
+
+
+@dataclass(frozen=True)
+class Admission:
+    admitted: bool
+    ahead: int
+    retry_after: float
+
+
+class WaitingRoom:
+    """Orders claim attempts per drop and admits them at a fixed rate.
+
+    The first request for a drop's queue gets sequence 1, the next 2, and
+    so on; asking again returns the same sequence. The ticket carries the
+    sequence and an HMAC over it, so checking admission needs no per-ticket
+    state: at ``t`` seconds after the window opens, sequences up to
+    ``burst + t * admit_per_second`` are admitted. The window start is the
+    drop's current one, not the one at issue time, so moving a window moves
+    its queue. Admitted claims additionally share ``max_concurrent``
+    in-flight slots per drop.
+
+    Sequences are kept in process memory (see ``app.core.process``), and
+    drops are forgotten once their claim window closes.
+    """
+
+    def __init__(
+        self,
+        *,
+        secret_key: str,
+        admit_per_second: float,
+        burst: int,
+        max_concurrent: int,
+    ):
+        # Derived, so a ticket can never be mistaken for an access token.
+        self._key = hashlib.sha256(f"waiting-room|{secret_key}".encode()).digest()
+        self.admit_per_second = admit_per_second
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+        self._sequences: dict[int, dict[int, int]] = {}
+        # drop id -> (window start, window end) as last read from the drop.
+        self._windows: dict[int, tuple[float, float]] = {}
+        self._in_flight: dict[int, int] = {}
+        self.issued = 0
+        self.rejected_busy = 0
+
+    def issue(
+        self,
+        *,
+        drop: Drop,
+        user_id: int,
+        now: float | None = None,
+    ) -> tuple[str, QueueTicket]:
+        self._evict_closed(time.time() if now is None else now)
+        _, closes_at = self.reschedule(drop)
+        sequences = self._sequences.setdefault(drop.id, {})
+        sequence = sequences.get(user_id)
+        if sequence is None:
+            sequence = sequences[user_id] = len(sequences) + 1
+            self.issued += 1
+        ticket = QueueTicket(
+            drop_id=drop.id,
+            user_id=user_id,
+            sequence=sequence,
+            expires_at=closes_at,
+        )
+        return self._encode(ticket), ticket
+
+    def reschedule(self, drop: Drop) -> tuple[float, float]:
+        """Remember ``drop``'s current claim window; returns ``(opens_at, closes_at)``."""
+        window = (
+            as_utc(drop.claim_window_start).timestamp(),
+            as_utc(drop.claim_window_end).timestamp(),
+        )
+        self._windows[drop.id] = window
+        return window
+
+    def opens_at(self, drop_id: int) -> float | None:
+        """Window start last read from the drop by this process, if any."""
+        window = self._windows.get(drop_id)
+        return window[0] if window else None
+
+    def verify(self, token: str, *, drop_id: int, user_id: int | None = None) -> QueueTicket:
+        """Decode ``token``; raises ``InvalidTicketError`` unless it is for this drop (and user)."""
+        try:
+            body, signature = token.rsplit(".", 1)
+            expected = self._sign(body)
+            if not hmac.compare_digest(signature, expected):
+                raise InvalidTicketError("Invalid queue ticket")
+            fields = base64.urlsafe_b64decode(body.encode() + b"==").decode().split("|")
+            ticket = QueueTicket(
+                drop_id=int(fields[0]),
+                user_id=int(fields[1]),
+                sequence=int(fields[2]),
+                expires_at=float(fields[3]),
+            )
+        except (ValueError, IndexError) as exc:
+            raise InvalidTicketError("Invalid queue ticket") from exc
+        if ticket.drop_id != drop_id or (user_id is not None and ticket.user_id != user_id):
+            raise InvalidTicketError("Queue ticket belongs to another drop or user")
+        if ticket.expires_at < time.time():
+            raise InvalidTicketError("Queue ticket has expired")
+        return ticket
+
+    def admission(
+        self,
+        ticket: QueueTicket,
+        *,
+        opens_at: float,
+        now: float | None = None,
+    ) -> Admission:
+        """Whether ``ticket`` is admitted for a claim window starting at ``opens_at``."""
+        now = time.time() if now is None else now
+        elapsed = now - opens_at
+        frontier = self.burst + max(elapsed, 0.0) * self.admit_per_second
+        if elapsed >= 0 and ticket.sequence <= frontier:
+            return Admission(admitted=True, ahead=0, retry_after=0.0)
+        missing = ticket.sequence - frontier
+        retry_after = max(-elapsed, 0.0) + max(missing, 0.0) / self.admit_per_second
+        return Admission(
+            admitted=False,
+            ahead=max(ticket.sequence - 1 - math.floor(frontier), 0),
+            retry_after=retry_after,
+        )
+
+    @asynccontextmanager
+    async def claim_slot(self, drop_id: int) -> AsyncIterator[None]:
+        """Hold one of the drop's in-flight claim slots; raises ``ClaimSlotsBusyError`` when full."""
+        in_flight = self._in_flight.get(drop_id, 0)
+        if self.max_concurrent and in_flight >= self.max_concurrent:
+            self.rejected_busy += 1
+            raise ClaimSlotsBusyError("Too many claims in progress for this drop")
+        self._in_flight[drop_id] = in_flight + 1
+        try:
+            yield
+        finally:
+            self._in_flight[drop_id] -= 1
+
+    def invalidate(self, drop_id: int | None = None) -> None:
+        if drop_id is None:
+            self._sequences.clear()
+            self._windows.clear()
+        else:
+            self._sequences.pop(drop_id, None)
+            self._windows.pop(drop_id, None)
+
+    def _evict_closed(self, now: float) -> None:
+        closed = [drop_id for drop_id, (_, closes_at) in self._windows.items() if closes_at < now]
+        for drop_id in closed:
+            self.invalidate(drop_id)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "drops": len(self._sequences),
+            "issued": self.issued,
+            "in_flight": sum(self._in_flight.values()),
+            "rejected_busy": self.rejected_busy,
+        }
+
+    def _encode(self, ticket: QueueTicket) -> str:
+        raw = "|".join(
+            (
+                str(ticket.drop_id),
+                str(ticket.user_id),
+                str(ticket.sequence),
+                repr(ticket.expires_at),
+            )
+        )
+        body = base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+        return f"{body}.{self._sign(body)}"
+
+    def _sign(self, body: str) -> str:
+        digest = hmac.new(self._key, body.encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+
+waiting_room = WaitingRoom(
+    secret_key=settings.secret_key,
+    admit_per_second=settings.waiting_room_admit_per_second,
+    burst=settings.waiting_room_burst,
+    max_concurrent=settings.waiting_room_max_concurrent_claims,
+)
@@ -1,17 +1,36 @@
 from __future__ import annotations
 
-import hashlib
+from collections.abc import Sequence
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Tuple
+from typing import Any, Tuple
 
-from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
-from app.core.priority import PriorityCoefficients, compute_coefficients, hash_context_value
+from app.core.config import settings
+from app.core.dates import as_utc
+from app.core.metrics import waitlist_outcomes
+from app.core.priority import PriorityScorer, get_priority_scorer
 from app.models.drop import Drop
-from app.models.user import User
 from app.models.waitlist_entry import WaitlistEntry
+from app.schemas.user import UserPrincipal
+from app.services.allocation import AllocationService, claim_code_for
+from app.services.ranking import waitlist_rankings
+
+BULK_CHUNK_SIZE = 1000
+
+
+class CapacityExceededError(PermissionError):
+    pass
+
+
+@dataclass(frozen=True)
+class BulkJoinResult:
+    status: str
+    user_id: int | None = None
+    email: str | None = None
+    entry_id: int | None = None
 
 
 class WaitlistService:
@@ -19,125 +38,264 @@ class WaitlistService:
     LEFT_STATE = "left"
     CLAIMED_STATE = "claimed"
 
+    BULK_CREATED = "created"
+    BULK_REJOINED = "rejoined"
+    BULK_ALREADY_JOINED = "already_joined"
+    BULK_ALREADY_CLAIMED = "already_claimed"
+    BULK_DUPLICATE = "duplicate"
+    BULK_INACTIVE = "inactive"
+    BULK_NOT_FOUND = "not_found"
+
     def __init__(self, session: AsyncSession):
         self.session = session
-        self.coefficients: PriorityCoefficients = compute_coefficients()
-
-    @staticmethod
-    def _ensure_timezone(dt: datetime) -> datetime:
-        if dt.tzinfo is None or dt.tzinfo.utcoffset(dt) is None:
-            return dt.replace(tzinfo=timezone.utc)
-        return dt
+        self.scorer: PriorityScorer = get_priority_scorer()
+        self.rankings = waitlist_rankings if settings.waitlist_ranking_enabled else None
+        self.allocations = AllocationService(session) if settings.drop_allocation_enabled else None
 
     async def join_waitlist(
         self,
         *,
-        user: User,
+        user: UserPrincipal,
         drop: Drop,
     ) -> Tuple[WaitlistEntry, bool]:
         now = datetime.now(timezone.utc)
         priority_score = self.calculate_priority_score(user=user, drop=drop, joined_at=now)
 
-        entry = await crud.get_waitlist_entry(
+        entry, created, changed = await crud.upsert_waitlist_join(
             self.session,
             user_id=user.id,
             drop_id=drop.id,
-            for_update=False,
+            priority_score=priority_score,
+            now=now,
         )
-        if entry:
-            if entry.state == self.JOINED_STATE:
-                return entry, False
-            entry = await crud.update_waitlist_entry_state(
-                self.session,
-                entry,
-                state=self.JOINED_STATE,
-                joined_at=now,
-                priority_score=priority_score,
-            )
-            return entry, False
-
-        try:
-            entry = await crud.create_waitlist_entry(
-                self.session,
-                user_id=user.id,
-                drop_id=drop.id,
-                priority_score=priority_score,
-                joined_at=now,
-            )
-        except IntegrityError:
-            await self.session.rollback()
-            entry = await crud.get_waitlist_entry(
-                self.session,
-                user_id=user.id,
-                drop_id=drop.id,
-            )
-            if not entry:
-                raise
-            if entry.state != self.JOINED_STATE:
-                entry = await crud.update_waitlist_entry_state(
-                    self.session,
-                    entry,
-                    state=self.JOINED_STATE,
-                    joined_at=now,
-                    priority_score=priority_score,
-                )
-            return entry, False
-
-        return entry, True
+        if changed:
+            await crud.adjust_drop_counts(self.session, drop.id, joined=1)
+            self._stage_ranked(entry)
+        outcome = "created" if created else ("rejoined" if changed else "unchanged")
+        waitlist_outcomes.inc("join", outcome)
+        return entry, created
 
     async def leave_waitlist(
         self,
         *,
-        user: User,
+        user: UserPrincipal,
         drop: Drop,
     ) -> WaitlistEntry | None:
-        entry = await crud.get_waitlist_entry(
+        result = await crud.leave_waitlist_entry(
             self.session,
             user_id=user.id,
             drop_id=drop.id,
+            now=datetime.now(timezone.utc),
         )
-        if not entry:
+        if result is None:
+            waitlist_outcomes.inc("leave", "not_joined")
             return None
-        if entry.state == self.LEFT_STATE:
-            return entry
+        entry, changed = result
+        waitlist_outcomes.inc("leave", "left" if changed else "unchanged")
+        if changed:
+            await crud.adjust_drop_counts(self.session, drop.id, joined=-1)
+            self._stage_unranked(entry)
+            if self.allocations is not None and drop.settled_at is not None:
+                await self.allocations.release(drop, user_id=user.id)
+        return entry
+
+    async def bulk_join_waitlist(
+        self,
+        *,
+        drop: Drop,
+        references: Sequence[int | str],
+    ) -> list[BulkJoinResult]:
+        """Enrol users given by id (``int``) or email (``str``) into ``drop``.
+
+        Users are resolved, scored and written in chunks of ``BULK_CHUNK_SIZE``
+        using multi-row ``INSERT ... ON CONFLICT DO NOTHING``. Results are
+        returned in input order. Claimed entries are left untouched.
+        """
+        results: list[BulkJoinResult] = []
+        seen: set[int] = set()
+        for start in range(0, len(references), BULK_CHUNK_SIZE):
+            chunk = references[start : start + BULK_CHUNK_SIZE]
+            results.extend(await self._bulk_join_chunk(drop=drop, references=chunk, seen=seen))
+        return results
+
+    async def _bulk_join_chunk(
+        self,
+        *,
+        drop: Drop,
+        references: Sequence[int | str],
+        seen: set[int],
+    ) -> list[BulkJoinResult]:
+        user_ids = [ref for ref in references if isinstance(ref, int)]
+        emails = [ref for ref in references if isinstance(ref, str)]
+        principals = await crud.get_user_principals(self.session, user_ids=user_ids, emails=emails)
+        by_id = {principal.id: principal for principal in principals}
+        by_email = {principal.email.lower(): principal for principal in principals}
+        resolved: list[UserPrincipal | None] = [
+            by_id.get(ref) if isinstance(ref, int) else by_email.get(ref.lower())
+            for ref in references
+        ]
+        states = await crud.get_waitlist_states(
+            self.session,
+            drop_id=drop.id,
+            user_ids=[principal.id for principal in resolved if principal is not None],
+        )
+
+        now = datetime.now(timezone.utc)
+        statuses: list[tuple[str, UserPrincipal | None, int | None]] = []
+        new_rows: list[dict[str, Any]] = []
+        rejoin_rows: list[dict[str, Any]] = []
+        scored: list[tuple[UserPrincipal, dict[str, Any]]] = []
+        for principal in resolved:
+            if principal is None:
+                statuses.append((self.BULK_NOT_FOUND, None, None))
+                continue
+            if principal.id in seen:
+                statuses.append((self.BULK_DUPLICATE, principal, None))
+                continue
+            seen.add(principal.id)
+            if not principal.is_active:
+                statuses.append((self.BULK_INACTIVE, principal, None))
+                continue
+            existing = states.get(principal.id)
+            if existing is not None and existing[1] == self.JOINED_STATE:
+                statuses.append((self.BULK_ALREADY_JOINED, principal, existing[0]))
+                continue
+            if existing is not None and existing[1] == self.CLAIMED_STATE:
+                statuses.append((self.BULK_ALREADY_CLAIMED, principal, existing[0]))
+                continue
+            if existing is None:
+                row = {
+                    "user_id": principal.id,
+                    "drop_id": drop.id,
+                    "joined_at": now,
+                    "state": self.JOINED_STATE,
+                }
+                new_rows.append(row)
+                statuses.append((self.BULK_CREATED, principal, None))
+            else:
+                row = {"id": existing[0]}
+                rejoin_rows.append(row)
+                statuses.append((self.BULK_REJOINED, principal, existing[0]))
+            scored.append((principal, row))
 
-        entry = await crud.update_waitlist_entry_state(
+        scores = self.scorer.score_many(
+            user_ids=[principal.id for principal, _ in scored],
+            user_created_ats=[principal.created_at for principal, _ in scored],
+            joined_ats=[now] * len(scored),
+            drop_id=drop.id,
+            drop_capacity=drop.capacity,
+        )
+        for (_, row), score in zip(scored, scores):
+            row["priority_score"] = score
+
+        inserted = await crud.bulk_insert_waitlist_entries(self.session, new_rows)
+        rejoined = await crud.bulk_rejoin_waitlist_entries(
             self.session,
-            entry,
-            state=self.LEFT_STATE,
+            scores={row["id"]: row["priority_score"] for row in rejoin_rows},
+            joined_at=now,
         )
-        return entry
+        await crud.adjust_drop_counts(self.session, drop.id, joined=len(inserted) + len(rejoined))
+        if (inserted or rejoined) and self.rankings is not None:
+            self.rankings.stage_invalidate(self.session, drop_id=drop.id)
 
-    def calculate_priority_score(self, *, user: User, drop: Drop, joined_at: datetime) -> float:
-        coeffs = self.coefficients
-        joined_at = self._ensure_timezone(joined_at)
-        user_created_at = self._ensure_timezone(user.created_at)
-        delta = joined_at - user_created_at
-        delta_ms = max(int(delta.total_seconds() * 1000), 0)
-        account_age_days = max(delta.days, 0)
-        rapid_metric = hash_context_value(str(user.id), str(drop.id), "rapid") % 100
-        base = (drop.capacity % 100) + (hash_context_value(str(drop.id), "base") % 100)
-        score = (
-            base
-            + (delta_ms % coeffs.a)
-            + (account_age_days % coeffs.b)
-            - (rapid_metric % coeffs.c)
+        results = []
+        for (status, principal, entry_id), ref in zip(statuses, references):
+            if status == self.BULK_CREATED:
+                entry_id = inserted.get(principal.id)
+                if entry_id is None:
+                    # Joined concurrently between the state lookup and the insert.
+                    status = self.BULK_ALREADY_JOINED
+            elif status == self.BULK_REJOINED and entry_id not in rejoined:
+                # Rejoined through another request after the state lookup.
+                status = self.BULK_ALREADY_JOINED
+            results.append(
+                BulkJoinResult(
+                    status=status,
+                    user_id=principal.id if principal else (ref if isinstance(ref, int) else None),
+                    email=principal.email if principal else (ref if isinstance(ref, str) else None),
+                    entry_id=entry_id,
+                )
+            )
+        return results
+
+    def calculate_priority_score(self, *, user: UserPrincipal, drop: Drop, joined_at: datetime) -> float:
+        return self.scorer.score(
+            user_id=user.id,
+            user_created_at=user.created_at,
+            drop_id=drop.id,
+            drop_capacity=drop.capacity,
+            joined_at=joined_at,
         )
-        fractional = (hash_context_value(str(user.id), joined_at.isoformat()) % 1000) / 1000
-        return float(max(score, 0) + fractional)
+
+    async def rescore_drop(self, *, drop: Drop, chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        """Recompute stored scores of ``drop``'s joined entries; returns how many.
+
+        Needed after ``DROPSPOT_SEED`` rotates or ``drop.capacity`` changes.
+        Entries are read and written back in ``chunk_size`` batches. Claimed
+        entries, and an existing allocation, keep their scores and codes.
+        """
+        rescored = 0
+        after_id = 0
+        while True:
+            rows = await crud.list_waitlist_scoring_inputs(
+                self.session,
+                drop_id=drop.id,
+                after_id=after_id,
+                limit=chunk_size,
+            )
+            if not rows:
+                break
+            entry_ids, user_ids, user_created_ats, joined_ats = zip(*rows)
+            scores = self.scorer.score_many(
+                user_ids=user_ids,
+                user_created_ats=user_created_ats,
+                joined_ats=joined_ats,
+                drop_id=drop.id,
+                drop_capacity=drop.capacity,
+            )
+            await crud.bulk_update_waitlist_entries(
+                self.session,
+                [
+                    {"id": entry_id, "priority_score": score}
+                    for entry_id, score in zip(entry_ids, scores)
+                ],
+            )
+            rescored += len(rows)
+            after_id = entry_ids[-1]
+        if rescored and self.rankings is not None:
+            self.rankings.stage_invalidate(self.session, drop_id=drop.id)
+        return rescored
 
     async def claim_waitlist_entry(
         self,
         *,
-        user: User,
+        user: UserPrincipal,
         drop: Drop,
     ) -> tuple[WaitlistEntry, int]:
+        try:
+            claimed = await self._claim(user=user, drop=drop)
+        except ValueError:
+            waitlist_outcomes.inc("claim", "window_closed")
+            raise
+        except CapacityExceededError:
+            waitlist_outcomes.inc("claim", "capacity_exceeded")
+            raise
+        except PermissionError:
+            waitlist_outcomes.inc("claim", "not_eligible")
+            raise
+        waitlist_outcomes.inc("claim", "claimed")
+        return claimed
+
+    async def _claim(self, *, user: UserPrincipal, drop: Drop) -> tuple[WaitlistEntry, int]:
         now = datetime.now(timezone.utc)
-        claim_start = self._ensure_timezone(drop.claim_window_start)
-        claim_end = self._ensure_timezone(drop.claim_window_end)
+        claim_start = as_utc(drop.claim_window_start)
+        claim_end = as_utc(drop.claim_window_end)
         if now < claim_start or now > claim_end:
             raise ValueError("Claim window is not active")
 
+        if self.allocations is not None:
+            return await self._claim_allocated(user=user, drop=drop, now=now)
+
         entry = await crud.get_waitlist_entry(
             self.session,
             user_id=user.id,
@@ -146,35 +304,110 @@ class WaitlistService:
         if not entry or entry.state != self.JOINED_STATE:
             raise PermissionError("User is not eligible to claim this drop")
 
-        waitlist = await crud.list_waitlist_by_drop(self.session, drop_id=drop.id)
-        if not waitlist:
-            raise PermissionError("No waitlist entries available")
+        position = await self.get_waitlist_position(entry=entry, drop=drop)
+        if position > drop.capacity:
+            raise CapacityExceededError("Capacity exceeded for this drop")
 
-        position = next((idx for idx, item in enumerate(waitlist, start=1) if item.id == entry.id), None)
-        if position is None:
-            raise PermissionError("User waitlist entry not found in ordering")
+        entry = await self._claim_entry(
+            drop=drop,
+            entry_id=entry.id,
+            claim_code=self.generate_claim_code(user=user, drop=drop, entry=entry),
+            now=now,
+        )
+        return entry, position
 
-        if position > drop.capacity:
-            raise PermissionError("Capacity exceeded for this drop")
+    async def _claim_allocated(
+        self,
+        *,
+        user: UserPrincipal,
+        drop: Drop,
+        now: datetime,
+    ) -> tuple[WaitlistEntry, int]:
+        if drop.settled_at is None:
+            # The scheduler normally gets here first; settle inline otherwise.
+            await self.allocations.settle(drop, now=now)
+        allocation = await crud.get_drop_allocation(self.session, drop_id=drop.id, user_id=user.id)
+        if allocation is None:
+            entry = await crud.get_waitlist_entry(self.session, user_id=user.id, drop_id=drop.id)
+            if not entry or entry.state != self.JOINED_STATE:
+                raise PermissionError("User is not eligible to claim this drop")
+            # Leaves and admin capacity changes refill freed slots themselves,
+            # so only a drop that settled with spare slots is topped up here.
+            # Checked without the lock so a full drop never queues on it.
+            allocated, _ = await crud.get_allocation_summary(self.session, drop_id=drop.id)
+            if allocated < drop.capacity and await self.allocations.refill(drop):
+                allocation = await crud.get_drop_allocation(
+                    self.session,
+                    drop_id=drop.id,
+                    user_id=user.id,
+                )
+            if allocation is None:
+                raise CapacityExceededError("Capacity exceeded for this drop")
 
-        if entry.state == self.CLAIMED_STATE and entry.claim_code:
-            return entry, position
+        entry = await self._claim_entry(
+            drop=drop,
+            entry_id=allocation.entry_id,
+            claim_code=allocation.claim_code,
+            now=now,
+        )
+        return entry, allocation.rank
 
-        entry = await crud.update_waitlist_entry_state(
+    async def _claim_entry(
+        self,
+        *,
+        drop: Drop,
+        entry_id: int,
+        claim_code: str,
+        now: datetime,
+    ) -> WaitlistEntry:
+        # Only a joined entry can claim, so a repeat claim is refused as
+        # ineligible even once the drop has sold out.
+        entry = await crud.mark_waitlist_entry_claimed(
             self.session,
-            entry,
-            state=self.CLAIMED_STATE,
+            entry_id=entry_id,
+            claim_code=claim_code,
+            claimed_at=now,
         )
-        entry.claim_code = self.generate_claim_code(user=user, drop=drop, entry=entry)
-        entry.claimed_at = now
-        await self.session.flush()
-        await self.session.refresh(entry)
-        return entry, position
+        if entry is None:
+            raise PermissionError("User is not eligible to claim this drop")
+        # The counter is the hard capacity gate; the position checks above
+        # only decide who is entitled to one of the slots.
+        if not await crud.reserve_claim_slot(self.session, drop.id):
+            await crud.update_waitlist_entry_state(self.session, entry, state=self.JOINED_STATE)
+            raise CapacityExceededError("Capacity exceeded for this drop")
+        self._stage_unranked(entry)
+        return entry
+
+    async def get_waitlist_position(self, *, entry: WaitlistEntry, drop: Drop) -> int:
+        """1-based position of a joined entry, capped at ``drop.capacity + 1``."""
+        if self.rankings is not None:
+            ranking = await self.rankings.get_or_load(self.session, drop.id)
+            position = ranking.position(entry.id) if ranking is not None else None
+            if position is not None:
+                return min(position, drop.capacity + 1)
+        # Uncommitted changes in this transaction, or entries joined by another
+        # process, are not in the ranking yet; fall back to the rank query.
+        ahead = await crud.count_waitlist_ahead(self.session, entry=entry, limit=drop.capacity)
+        return ahead + 1
+
+    def _stage_ranked(self, entry: WaitlistEntry) -> None:
+        if self.rankings is not None:
+            self.rankings.stage_add(
+                self.session,
+                drop_id=entry.drop_id,
+                entry_id=entry.id,
+                priority_score=entry.priority_score,
+                joined_at=entry.joined_at,
+            )
 
-    def generate_claim_code(self, *, user: User, drop: Drop, entry: WaitlistEntry) -> str:
-        priority = float(entry.priority_score)
-        joined_at = self._ensure_timezone(entry.joined_at)
-        raw = f"{user.id}|{drop.id}|{priority:.4f}|{joined_at.isoformat()}"
-        digest = hashlib.sha256(raw.encode()).hexdigest()
-        return digest[:16].upper()
+    def _stage_unranked(self, entry: WaitlistEntry) -> None:
+        if self.rankings is not None:
+            self.rankings.stage_discard(self.session, drop_id=entry.drop_id, entry_id=entry.id)
 
+    def generate_claim_code(self, *, user: UserPrincipal, drop: Drop, entry: WaitlistEntry) -> str:
+        return claim_code_for(
+            user_id=user.id,
+            drop_id=drop.id,
+            priority_score=entry.priority_score,
+            joined_at=entry.joined_at,
+        )
@@ -0,0 +1,114 @@
+"""Claim latency: live ranking paths vs. the settled allocation.
+
+Every winner of a drop claims once per mode, each claim in its own
+transaction, and the p50/p99 of those claims is reported. Modes:
+
+* ``rank query``: the bounded ``count_waitlist_ahead`` query per claim.
+* ``ranking``: the warmed in-memory ranking.
+* ``allocation``: a primary-key lookup against the settled allocation.
+
+Usage::
+
+    python -m benchmarks.claim_allocation --sizes 10000 100000 --capacity 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app import crud
+from app.db.base import Base
+from app.models.drop import Drop
+from app.models.waitlist_entry import WaitlistEntry
+from app.services.allocation import AllocationService
+from app.services.ranking import waitlist_rankings
+from app.services.waitlist import WaitlistService
+from benchmarks.claim_position import build_dataset
+
+MODES = ("rank query", "ranking", "allocation")
+
+
+async def _reset_claims(session: AsyncSession, drop: Drop) -> None:
+    await session.execute(
+        update(WaitlistEntry)
+        .where(WaitlistEntry.drop_id == drop.id)
+        .values(state="joined", claim_code=None, claimed_at=None)
+    )
+    # The claim counters gate capacity, so every mode starts from the same totals.
+    joined = select(func.count()).where(WaitlistEntry.drop_id == drop.id).scalar_subquery()
+    await session.execute(
+        update(Drop).where(Drop.id == drop.id).values(joined_count=joined, claimed_count=0)
+    )
+    await session.commit()
+    waitlist_rankings.invalidate(drop.id)
+
+
+async def _claim_all(session: AsyncSession, drop: Drop, user_ids: list[int], mode: str) -> list[float]:
+    samples = []
+    for user_id in user_ids:
+        session.expunge_all()
+        service = WaitlistService(session)
+        if mode != "ranking":
+            service.rankings = None
+        if mode != "allocation":
+            service.allocations = None
+        started = time.perf_counter()
+        await service.claim_waitlist_entry(user=SimpleNamespace(id=user_id), drop=drop)
+        await session.commit()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def _p99(samples: list[float]) -> float:
+    return statistics.quantiles(samples, n=100)[98] if len(samples) > 1 else samples[0]
+
+
+async def run(sizes: list[int], capacity: int) -> None:
+    print(f"{'entries':>10} {'mode':>12} {'p50 ms':>9} {'p99 ms':>9}")
+    for size in sizes:
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        Session = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+        async with Session() as session:
+            drop = await build_dataset(session, size, capacity=min(capacity, size))
+            winners = await crud.list_waitlist_by_drop(session, drop_id=drop.id)
+            user_ids = [entry.user_id for entry in winners[: drop.capacity]]
+            random.Random(size).shuffle(user_ids)
+
+            started = time.perf_counter()
+            await AllocationService(session).settle(drop)
+            await session.commit()
+            settle_ms = (time.perf_counter() - started) * 1000
+
+            for mode in MODES:
+                await _reset_claims(session, drop)
+                if mode == "ranking":
+                    await waitlist_rankings.warm(session, [drop.id])
+                    await session.commit()
+                samples = await _claim_all(session, drop, user_ids, mode)
+                print(
+                    f"{size:>10} {mode:>12} {statistics.median(samples):>9.2f} {_p99(samples):>9.2f}"
+                )
+            print(f"{size:>10} {'settlement':>12} {settle_ms:>9.2f} {'(once)':>9}")
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--capacity", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.capacity))
+
+
+if __name__ == "__main__":
+    main()
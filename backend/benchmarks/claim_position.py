@@ -0,0 +1,115 @@
+"""Claim position lookup: full waitlist scan vs. bounded rank query.
+
+Usage::
+
+    python -m benchmarks.claim_position --sizes 1000 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app import crud
+from app.db.base import Base
+from app.models.drop import Drop
+from app.models.user import User
+from app.models.waitlist_entry import WaitlistEntry
+
+CAPACITY = 100
+CHUNK_SIZE = 5_000
+
+
+async def build_dataset(session: AsyncSession, size: int, capacity: int = CAPACITY) -> Drop:
+    now = datetime.now(timezone.utc)
+    drop = Drop(
+        name="Benchmark Drop",
+        capacity=capacity,
+        claim_window_start=now - timedelta(minutes=5),
+        claim_window_end=now + timedelta(hours=1),
+        is_active=True,
+    )
+    session.add(drop)
+    await session.flush()
+
+    for start in range(0, size, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, size)
+        await session.execute(
+            insert(User),
+            [
+                {"id": idx + 1, "email": f"bench{idx}@example.com", "hashed_password": "x"}
+                for idx in range(start, stop)
+            ],
+        )
+        await session.execute(
+            insert(WaitlistEntry),
+            [
+                {
+                    "user_id": idx + 1,
+                    "drop_id": drop.id,
+                    "priority_score": (idx * 7919) % 200_000 / 1000,
+                    "joined_at": now - timedelta(seconds=idx),
+                    "state": "joined",
+                }
+                for idx in range(start, stop)
+            ],
+        )
+    await session.commit()
+    return drop
+
+
+async def _legacy_position(session: AsyncSession, entry: WaitlistEntry) -> int | None:
+    waitlist = await crud.list_waitlist_by_drop(session, drop_id=entry.drop_id)
+    return next((idx for idx, item in enumerate(waitlist, start=1) if item.id == entry.id), None)
+
+
+async def _ranked_position(session: AsyncSession, entry: WaitlistEntry) -> int:
+    ahead = await crud.count_waitlist_ahead(session, entry=entry, limit=CAPACITY)
+    return ahead + 1
+
+
+async def _time(fn, session: AsyncSession, entry: WaitlistEntry, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        session.expunge_all()
+        started = time.perf_counter()
+        await fn(session, entry)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def run(sizes: list[int], repeat: int) -> None:
+    print(f"{'entries':>10} {'full scan ms':>14} {'rank query ms':>14}")
+    for size in sizes:
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        Session = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+        async with Session() as session:
+            drop = await build_dataset(session, size)
+            waitlist = await crud.list_waitlist_by_drop(session, drop_id=drop.id)
+            # An entry at the capacity boundary is the worst case for the rank query.
+            entry = waitlist[min(CAPACITY, len(waitlist)) - 1]
+            assert await _legacy_position(session, entry) == await _ranked_position(session, entry)
+            legacy = await _time(_legacy_position, session, entry, repeat)
+            ranked = await _time(_ranked_position, session, entry, repeat)
+        await engine.dispose()
+        print(f"{size:>10} {legacy:>14.2f} {ranked:>14.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
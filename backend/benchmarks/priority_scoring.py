@@ -0,0 +1,84 @@
+"""Priority scoring: per-request coefficients vs. the cached process scorer.
+
+``per request`` mirrors the old join path, which derived the coefficients
+for every new ``WaitlistService`` and re-hashed the drop's base term on
+every score. ``scorer`` is ``get_priority_scorer().score``; ``batch`` is
+``score_many`` over the same inputs. Outputs are checked to be identical.
+
+Usage::
+
+    python -m benchmarks.priority_scoring --count 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.core.priority import compute_coefficients, compute_priority_score, get_priority_scorer
+
+DROP_ID = 7
+DROP_CAPACITY = 250
+
+
+def run(count: int) -> None:
+    rng = random.Random(count)
+    now = datetime.now(timezone.utc)
+    user_ids = [rng.randint(1, 10**7) for _ in range(count)]
+    created_ats = [now - timedelta(seconds=rng.randint(0, 10**8)) for _ in range(count)]
+
+    started = time.perf_counter()
+    legacy = [
+        compute_priority_score(
+            user_id=user_id,
+            user_created_at=created_at,
+            drop_id=DROP_ID,
+            drop_capacity=DROP_CAPACITY,
+            joined_at=now,
+            coefficients=compute_coefficients(),
+        )
+        for user_id, created_at in zip(user_ids, created_ats)
+    ]
+    legacy_s = time.perf_counter() - started
+
+    scorer = get_priority_scorer()
+    started = time.perf_counter()
+    cached = [
+        scorer.score(
+            user_id=user_id,
+            user_created_at=created_at,
+            drop_id=DROP_ID,
+            drop_capacity=DROP_CAPACITY,
+            joined_at=now,
+        )
+        for user_id, created_at in zip(user_ids, created_ats)
+    ]
+    cached_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch = scorer.score_many(
+        user_ids=user_ids,
+        user_created_ats=created_ats,
+        joined_ats=[now] * count,
+        drop_id=DROP_ID,
+        drop_capacity=DROP_CAPACITY,
+    )
+    batch_s = time.perf_counter() - started
+
+    assert legacy == cached == batch.tolist()
+    print(f"{'path':>12} {'us/score':>10} {'speedup':>8}")
+    for name, seconds in (("per request", legacy_s), ("scorer", cached_s), ("batch", batch_s)):
+        print(f"{name:>12} {seconds / count * 1e6:>10.2f} {legacy_s / seconds:>7.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+    run(args.count)
+
+
+if __name__ == "__main__":
+    main()
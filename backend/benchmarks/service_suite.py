@@ -0,0 +1,274 @@
+"""Service and crud microbenchmarks over synthetic waitlists of growing size.
+
+For each ``--sizes`` entry a fresh database is filled with that many joined
+waitlist entries (plus ``size // 1000`` extra active drops) and each
+operation below is timed in isolation, ``--repeat`` times:
+
+* ``join_waitlist`` / ``leave_waitlist``: a new user joins, then leaves,
+  each in its own committed transaction.
+* ``claim_waitlist_entry``: winners of the settled drop claim one by one.
+* ``calculate_priority_score`` / ``generate_claim_code``: pure CPU, per call.
+* ``crud.list_waitlist_by_drop`` / ``crud.get_active_drops``: full reads.
+
+Timings exclude tracing; each operation then runs once more under
+``tracemalloc`` to record its Python allocation high-water mark, and the
+process max RSS is sampled after every size. Inputs are seeded, so runs are
+comparable: pass ``--baseline`` with an earlier ``--output`` file to get
+per-operation ratios and a non-zero exit when a median regresses by more
+than ``--tolerance``.
+
+``--database-url`` selects the backend; a PostgreSQL URL must point at a
+disposable database because its tables are dropped and recreated.
+
+Usage::
+
+    python -m benchmarks.service_suite --sizes 1000 10000 100000 1000000 --output base.json
+    python -m benchmarks.service_suite --baseline base.json --output head.json
+    python -m benchmarks.service_suite --database-url postgresql+asyncpg://bench@localhost/bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import sqlalchemy
+from sqlalchemy import insert, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app import crud
+from app.db.base import Base
+from app.models.drop import Drop
+from app.models.user import User
+from app.services.allocation import AllocationService
+from app.services.ranking import waitlist_rankings
+from app.services.waitlist import WaitlistService
+from benchmarks.claim_position import build_dataset
+from benchmarks.stampede import git_revision, percentile
+
+CAPACITY = 100
+
+
+async def _fresh_engine(database_url: str) -> AsyncEngine:
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    return engine
+
+
+async def _seed(session: AsyncSession, size: int, extra_users: int) -> tuple[Drop, list[User]]:
+    drop = await build_dataset(session, size, capacity=CAPACITY)
+    now = datetime.now(timezone.utc)
+    # Explicit ids follow build_dataset's users, which also use explicit ids.
+    await session.execute(
+        insert(User),
+        [
+            {"id": size + idx + 1, "email": f"joiner{idx}@example.com", "hashed_password": "x"}
+            for idx in range(extra_users)
+        ],
+    )
+    await session.execute(
+        insert(Drop),
+        [
+            {
+                "name": f"Filler {idx}",
+                "capacity": 10,
+                "claim_window_start": now + timedelta(hours=idx + 1),
+                "claim_window_end": now + timedelta(hours=idx + 2),
+                "is_active": True,
+            }
+            for idx in range(size // 1000)
+        ],
+    )
+    await session.commit()
+    result = await session.execute(select(User).where(User.id > size).order_by(User.id))
+    return drop, list(result.scalars().all())
+
+
+class Suite:
+    def __init__(self, session: AsyncSession, repeat: int):
+        self.session = session
+        self.repeat = repeat
+        self.results: list[dict] = []
+
+    async def measure(
+        self,
+        size: int,
+        name: str,
+        op: Callable[[int], Awaitable[object] | object],
+    ) -> None:
+        """Time ``op(i)`` for ``i in range(repeat)`` and once more under tracemalloc."""
+        samples = []
+        for i in range(self.repeat):
+            self.session.expunge_all()
+            started = time.perf_counter()
+            outcome = op(i)
+            if asyncio.iscoroutine(outcome):
+                await outcome
+            samples.append((time.perf_counter() - started) * 1000)
+
+        self.session.expunge_all()
+        tracemalloc.start()
+        try:
+            outcome = op(self.repeat)
+            if asyncio.iscoroutine(outcome):
+                await outcome
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        row = {
+            "size": size,
+            "op": name,
+            "median_ms": round(statistics.median(samples), 4),
+            "p95_ms": round(percentile(samples, 95), 4),
+            "min_ms": round(min(samples), 4),
+            "peak_kib": round(peak / 1024, 1),
+        }
+        self.results.append(row)
+        print(
+            f"{size:>9} {name:>26} {row['median_ms']:>10.3f} {row['p95_ms']:>10.3f}"
+            f" {row['peak_kib']:>11.1f}"
+        )
+
+
+async def run_size(database_url: str, size: int, repeat: int) -> tuple[list[dict], int]:
+    engine = await _fresh_engine(database_url)
+    Session = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    waitlist_rankings.invalidate()
+    try:
+        async with Session() as session:
+            # One extra user/winner per operation for the tracemalloc pass.
+            drop, joiners = await _seed(session, size, extra_users=repeat + 1)
+            await AllocationService(session).settle(drop)
+            await session.commit()
+            winners = [
+                SimpleNamespace(id=user_id)
+                for user_id, _, _ in await crud.list_drop_allocations(session, drop_id=drop.id)
+            ]
+            suite = Suite(session, repeat)
+            service = WaitlistService(session)
+            entry = (await crud.list_waitlist_by_drop(session, drop_id=drop.id))[0] if size else None
+
+            async def join(i: int) -> None:
+                await WaitlistService(session).join_waitlist(user=joiners[i], drop=drop)
+                await session.commit()
+
+            async def leave(i: int) -> None:
+                await WaitlistService(session).leave_waitlist(user=joiners[i], drop=drop)
+                await session.commit()
+
+            async def claim(i: int) -> None:
+                await WaitlistService(session).claim_waitlist_entry(user=winners[i], drop=drop)
+                await session.commit()
+
+            await suite.measure(size, "join_waitlist", join)
+            await suite.measure(size, "leave_waitlist", leave)
+            await suite.measure(size, "claim_waitlist_entry", claim)
+            await suite.measure(
+                size,
+                "calculate_priority_score",
+                lambda i: service.calculate_priority_score(
+                    user=joiners[i], drop=drop, joined_at=joiners[i].created_at
+                ),
+            )
+            await suite.measure(
+                size,
+                "generate_claim_code",
+                lambda i: service.generate_claim_code(user=joiners[i], drop=drop, entry=entry),
+            )
+            await suite.measure(
+                size,
+                "crud.list_waitlist_by_drop",
+                lambda i: crud.list_waitlist_by_drop(session, drop_id=drop.id),
+            )
+            await suite.measure(
+                size,
+                "crud.get_active_drops",
+                lambda i: crud.get_active_drops(session),
+            )
+            return suite.results, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+def compare(results: list[dict], baseline: dict, tolerance: float) -> list[str]:
+    previous = {(row["size"], row["op"]): row for row in baseline["results"]}
+    regressions = []
+    print(f"\n{'size':>9} {'op':>26} {'base ms':>10} {'now ms':>10} {'ratio':>7}")
+    for row in results:
+        before = previous.get((row["size"], row["op"]))
+        if before is None or not before["median_ms"]:
+            continue
+        ratio = row["median_ms"] / before["median_ms"]
+        flag = " !" if ratio > 1 + tolerance else ""
+        print(
+            f"{row['size']:>9} {row['op']:>26} {before['median_ms']:>10.3f}"
+            f" {row['median_ms']:>10.3f} {ratio:>7.2f}{flag}"
+        )
+        if flag:
+            regressions.append(f"{row['op']} @ {row['size']}: x{ratio:.2f}")
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> dict:
+    if args.repeat + 1 > CAPACITY:
+        raise SystemExit(f"--repeat must be below the drop capacity ({CAPACITY})")
+    print(f"{'size':>9} {'op':>26} {'median ms':>10} {'p95 ms':>10} {'peak KiB':>11}")
+    results, max_rss = [], {}
+    for size in args.sizes:
+        rows, rss = await run_size(args.database_url, size, args.repeat)
+        results.extend(rows)
+        max_rss[str(size)] = rss
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "backend": make_url(args.database_url).get_backend_name(),
+            "sizes": args.sizes,
+            "repeat": args.repeat,
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+        },
+        "max_rss_kib": max_rss,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///:memory:")
+    parser.add_argument("--output", type=Path, default=Path("service_suite.json"))
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"wrote {args.output}")
+    if args.baseline:
+        regressions = compare(report["results"], json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            print("regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""Drop-opening stampede: sign up, join, poll, then race the claim.
+
+Simulates ``--users`` users against either the ASGI app in-process (with a
+fresh database at ``--database-url``) or a running server (``--base-url``).
+Every user signs up, joins one drop and polls ``GET /drops``; the drop's
+claim window is then opened and all users claim at once. Per endpoint the
+run reports throughput, p50/p95/p99 latency and the rate of rejections
+(4xx, e.g. a lost claim) and errors (5xx or transport failures), and
+writes the same numbers to a JSON file for comparison across releases.
+
+Usage::
+
+    python -m benchmarks.stampede --users 2000 --capacity 200 --output stampede.json
+    python -m benchmarks.stampede --base-url http://127.0.0.1:8000 \\
+        --admin-email admin@example.com --admin-password secret
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import subprocess
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+from sqlalchemy import update
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.session import get_db
+from app.db.sqlite import configure_sqlite
+from app.main import app
+from app.models.user import User
+
+PASSWORD = "stampede-pass"
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Nearest-rank percentile; ``q`` in ``[0, 100]``."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.samples: dict[str, list[tuple[float, int]]] = defaultdict(list)
+        self.phases: dict[str, float] = {}
+
+    async def call(
+        self,
+        endpoint: str,
+        request: Callable[[], Awaitable[httpx.Response]],
+    ) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await request()
+        except httpx.HTTPError:
+            response = None
+        status = response.status_code if response is not None else 0
+        self.samples[endpoint].append(((time.perf_counter() - started) * 1000, status))
+        return response
+
+    def summary(self) -> dict[str, dict[str, float | int]]:
+        report = {}
+        for endpoint, samples in self.samples.items():
+            latencies = [latency for latency, _ in samples]
+            count = len(samples)
+            rejected = sum(1 for _, status in samples if 400 <= status < 500)
+            errors = sum(1 for _, status in samples if status == 0 or status >= 500)
+            wall = self.phases.get(endpoint, 0.0)
+            report[endpoint] = {
+                "count": count,
+                "ok": count - rejected - errors,
+                "rejected": rejected,
+                "errors": errors,
+                "rejection_rate": round(rejected / count, 4),
+                "error_rate": round(errors / count, 4),
+                "throughput_rps": round(count / wall, 1) if wall else 0.0,
+                "p50_ms": round(percentile(latencies, 50), 2),
+                "p95_ms": round(percentile(latencies, 95), 2),
+                "p99_ms": round(percentile(latencies, 99), 2),
+                "max_ms": round(max(latencies), 2),
+            }
+        return report
+
+
+async def _gather_limited(concurrency: int, jobs: list[Callable[[], Awaitable[object]]]) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _run(job: Callable[[], Awaitable[object]]) -> object:
+        async with semaphore:
+            return await job()
+
+    return await asyncio.gather(*(_run(job) for job in jobs))
+
+
+@asynccontextmanager
+async def in_process_client(
+    database_url: str,
+) -> AsyncIterator[tuple[httpx.AsyncClient, Callable[[str], Awaitable[None]]]]:
+    """Client for ``app.main:app`` bound to a fresh database at ``database_url``.
+
+    Also yields a callable that grants a user admin rights in that database.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:"):
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{url.database}{suffix}").unlink(missing_ok=True)
+    engine = create_async_engine(database_url)
+    if url.get_backend_name() == "sqlite":
+        configure_sqlite(engine, settings)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    async def _get_db() -> AsyncIterator[AsyncSession]:
+        async with Session() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = _get_db
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://stampede") as client:
+            yield client, lambda email: _promote_admin(Session, email)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        await engine.dispose()
+
+
+async def _promote_admin(Session: async_sessionmaker[AsyncSession], email: str) -> None:
+    async with Session() as session:
+        await session.execute(update(User).where(User.email == email).values(is_admin=True))
+        await session.commit()
+
+
+async def _admin_headers(
+    client: httpx.AsyncClient,
+    args: argparse.Namespace,
+    promote_admin: Callable[[str], Awaitable[None]] | None,
+) -> dict[str, str]:
+    if promote_admin is None:
+        response = await client.post(
+            "/api/auth/login",
+            json={"email": args.admin_email, "password": args.admin_password},
+        )
+    else:
+        email = f"admin-{uuid.uuid4().hex[:8]}@example.com"
+        response = await client.post("/api/auth/signup", json={"email": email, "password": PASSWORD})
+        await promote_admin(email)
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['token']['access_token']}"}
+
+
+async def run_stampede(
+    client: httpx.AsyncClient,
+    args: argparse.Namespace,
+    promote_admin: Callable[[str], Awaitable[None]] | None = None,
+) -> dict:
+    recorder = Recorder()
+    admin = await _admin_headers(client, args, promote_admin)
+    now = datetime.now(timezone.utc)
+    response = await client.post(
+        "/api/admin/drops",
+        headers=admin,
+        json={
+            "name": f"Stampede {now:%H%M%S}",
+            "capacity": args.capacity,
+            "claim_window_start": (now + timedelta(days=1)).isoformat(),
+            "claim_window_end": (now + timedelta(days=2)).isoformat(),
+        },
+    )
+    response.raise_for_status()
+    drop_id = response.json()["id"]
+    run_id = uuid.uuid4().hex[:8]
+
+    async def phase(name: str, jobs: list[Callable[[], Awaitable[object]]]) -> list:
+        started = time.perf_counter()
+        results = await _gather_limited(args.concurrency, jobs)
+        recorder.phases[name] = time.perf_counter() - started
+        return results
+
+    def signup(idx: int) -> Callable[[], Awaitable[str | None]]:
+        async def _signup() -> str | None:
+            payload = {"email": f"user{idx}-{run_id}@example.com", "password": PASSWORD}
+            response = await recorder.call(
+                "signup", lambda: client.post("/api/auth/signup", json=payload)
+            )
+            if response is None or response.status_code != 201:
+                return None
+            return response.json()["token"]["access_token"]
+
+        return _signup
+
+    tokens = [token for token in await phase("signup", [signup(i) for i in range(args.users)]) if token]
+    auth = [{"Authorization": f"Bearer {token}"} for token in tokens]
+
+    def call(endpoint: str, method: str, path: str, headers: dict[str, str]) -> Callable[[], Awaitable[object]]:
+        return lambda: recorder.call(endpoint, lambda: client.request(method, path, headers=headers))
+
+    await phase("join", [call("join", "POST", f"/api/drops/{drop_id}/join", h) for h in auth])
+    await phase(
+        "list_drops",
+        [call("list_drops", "GET", "/api/drops", h) for h in auth for _ in range(args.polls)],
+    )
+
+    response = await client.put(
+        f"/api/admin/drops/{drop_id}",
+        headers=admin,
+        json={"claim_window_start": (datetime.now(timezone.utc) - timedelta(seconds=1)).isoformat()},
+    )
+    response.raise_for_status()
+    # Everyone fires at once: no concurrency cap on the claim race.
+    started = time.perf_counter()
+    await asyncio.gather(*(call("claim", "POST", f"/api/drops/{drop_id}/claim", h)() for h in auth))
+    recorder.phases["claim"] = time.perf_counter() - started
+
+    claimed = sum(1 for _, status in recorder.samples["claim"] if status == 200)
+    return {
+        "meta": {
+            "started_at": now.isoformat(),
+            "target": args.base_url or f"in-process ({args.database_url})",
+            "users": args.users,
+            "capacity": args.capacity,
+            "concurrency": args.concurrency,
+            "polls": args.polls,
+            "revision": git_revision(),
+            "python": platform.python_version(),
+        },
+        "phases": {name: round(seconds, 3) for name, seconds in recorder.phases.items()},
+        "endpoints": recorder.summary(),
+        "claims": {
+            "succeeded": claimed,
+            "capacity": args.capacity,
+            "oversold": claimed > args.capacity,
+        },
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def print_report(result: dict) -> None:
+    print(f"{'endpoint':>12} {'count':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rej %':>6} {'err %':>6}")
+    for endpoint, row in result["endpoints"].items():
+        print(
+            f"{endpoint:>12} {row['count']:>7} {row['throughput_rps']:>8.1f} {row['p50_ms']:>8.2f}"
+            f" {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f}"
+            f" {row['rejection_rate'] * 100:>6.1f} {row['error_rate'] * 100:>6.1f}"
+        )
+    claims = result["claims"]
+    print(f"claims: {claims['succeeded']}/{claims['capacity']} succeeded, oversold={claims['oversold']}")
+
+
+async def run(args: argparse.Namespace) -> dict:
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+            return await run_stampede(client, args)
+    async with in_process_client(args.database_url) as (client, promote_admin):
+        return await run_stampede(client, args, promote_admin)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--capacity", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--polls", type=int, default=3, help="GET /drops calls per user")
+    parser.add_argument("--base-url", help="run against a server instead of in-process")
+    parser.add_argument("--admin-email")
+    parser.add_argument("--admin-password")
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///./stampede.db")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", type=Path, default=Path("stampede.json"))
+    args = parser.parse_args()
+    if args.base_url and not (args.admin_email and args.admin_password):
+        parser.error("--base-url needs --admin-email and --admin-password")
+
+    result = asyncio.run(run(args))
+    print_report(result)
+    args.output.write_text(json.dumps(result, indent=2))
+    print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
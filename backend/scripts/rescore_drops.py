@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+from app import crud
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.waitlist import BULK_CHUNK_SIZE, WaitlistService
+
+
+async def rescore_drops(drop_ids: list[int], chunk_size: int) -> None:
+    async with AsyncSessionLocal() as session:
+        if not drop_ids:
+            drop_ids = [drop.id for drop in await crud.get_active_drops(session)]
+        for drop_id in drop_ids:
+            drop = await crud.get_drop(session, drop_id)
+            if drop is None:
+                print(f"Drop {drop_id} not found, skipping.")
+                continue
+            rescored = await WaitlistService(session).rescore_drop(drop=drop, chunk_size=chunk_size)
+            await session.commit()
+            print(f"Re-scored {rescored} entries of drop {drop_id} in {settings.database_url}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Recompute waitlist priority scores, e.g. after DROPSPOT_SEED rotates."
+    )
+    parser.add_argument("drop_ids", type=int, nargs="*", help="Drops to re-score (default: all active)")
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+    args = parser.parse_args()
+    asyncio.run(rescore_drops(args.drop_ids, args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
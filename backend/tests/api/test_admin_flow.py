@@ -4,8 +4,10 @@ from datetime import datetime, timedelta, timezone
 
 import pytest
 from httpx import AsyncClient
-from sqlalchemy import update
+from sqlalchemy import literal_column, update
 
+from app import crud
+from app.models.drop import Drop
 from app.models.user import User
 
 
@@ -78,3 +80,115 @@ async def test_admin_drop_flow(async_session, client: AsyncClient):
     delete_resp = await client.delete(f"/api/admin/drops/{drop_id}", headers=headers)
     assert delete_resp.status_code == 204
 
+
+
+@pytest.mark.asyncio
+async def test_resending_an_unchanged_window_keeps_the_allocation(async_session, client: AsyncClient):
+    admin_payload = {"email": "admin-window@test.com", "password": "adminpassw"}
+    response = await client.post("/api/auth/signup", json=admin_payload)
+    headers = {"Authorization": f"Bearer {response.json()['token']['access_token']}"}
+    await async_session.execute(
+        update(User).where(User.email == admin_payload["email"]).values(is_admin=True)
+    )
+    await async_session.commit()
+
+    now = datetime.now(timezone.utc)
+    window_start = (now - timedelta(minutes=5)).isoformat()
+    create_resp = await client.post(
+        "/api/admin/drops",
+        json={
+            "name": "Unchanged Window Drop",
+            "capacity": 1,
+            "claim_window_start": window_start,
+            "claim_window_end": (now + timedelta(hours=1)).isoformat(),
+        },
+        headers=headers,
+    )
+    drop_id = create_resp.json()["id"]
+    user_resp = await client.post(
+        "/api/auth/signup", json={"email": "window-user@test.com", "password": "userpassw"}
+    )
+    user_headers = {"Authorization": f"Bearer {user_resp.json()['token']['access_token']}"}
+    await client.post(f"/api/drops/{drop_id}/join", headers=user_headers)
+    assert (await client.post(f"/api/drops/{drop_id}/claim", headers=user_headers)).status_code == 200
+
+    update_resp = await client.put(
+        f"/api/admin/drops/{drop_id}",
+        json={"claim_window_start": window_start, "description": "Same window"},
+        headers=headers,
+    )
+    assert update_resp.status_code == 200
+    allocations = await crud.list_drop_allocations(async_session, drop_id=drop_id)
+    assert len(allocations) == 1
+
+
+@pytest.mark.asyncio
+async def test_admin_listing_pages_drops_created_in_the_same_second(
+    async_session, client: AsyncClient
+):
+    admin_payload = {"email": "admin-pages@test.com", "password": "adminpassw"}
+    response = await client.post("/api/auth/signup", json=admin_payload)
+    headers = {"Authorization": f"Bearer {response.json()['token']['access_token']}"}
+    await async_session.execute(
+        update(User).where(User.email == admin_payload["email"]).values(is_admin=True)
+    )
+    now = datetime.now(timezone.utc)
+    drops = [
+        Drop(
+            name=f"Same second {idx}",
+            capacity=1,
+            claim_window_start=now + timedelta(hours=1),
+            claim_window_end=now + timedelta(hours=2),
+        )
+        for idx in range(5)
+    ]
+    async_session.add_all(drops)
+    await async_session.flush()
+    # The shape SQLite's CURRENT_TIMESTAMP default stores: whole seconds.
+    await async_session.execute(
+        update(Drop)
+        .where(Drop.id.in_([drop.id for drop in drops]))
+        .values(created_at=literal_column("'2026-01-01 12:00:00'"))
+    )
+    await async_session.commit()
+
+    seen: list[int] = []
+    cursor: str | None = None
+    for _ in range(100):
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = await client.get("/api/admin/drops", params=params, headers=headers)
+        assert page.status_code == 200
+        seen.extend(drop["id"] for drop in page.json())
+        cursor = page.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert len(seen) == len(set(seen))
+    ours = sorted((drop.id for drop in drops), reverse=True)
+    assert [drop_id for drop_id in seen if drop_id in ours] == ours
+
+
+@pytest.mark.asyncio
+async def test_claiming_again_after_sellout_is_refused_as_ineligible(
+    async_session, client: AsyncClient
+):
+    now = datetime.now(timezone.utc)
+    drop = Drop(
+        name="Sold Out Reclaim Drop",
+        capacity=1,
+        claim_window_start=now - timedelta(minutes=5),
+        claim_window_end=now + timedelta(hours=1),
+    )
+    async_session.add(drop)
+    await async_session.commit()
+
+    user_resp = await client.post(
+        "/api/auth/signup", json={"email": "reclaim-user@test.com", "password": "userpassw"}
+    )
+    user_headers = {"Authorization": f"Bearer {user_resp.json()['token']['access_token']}"}
+    await client.post(f"/api/drops/{drop.id}/join", headers=user_headers)
+    assert (await client.post(f"/api/drops/{drop.id}/claim", headers=user_headers)).status_code == 200
+
+    again = await client.post(f"/api/drops/{drop.id}/claim", headers=user_headers)
+    assert again.status_code == 403
+    assert again.json()["detail"] == "User is not eligible to claim this drop"
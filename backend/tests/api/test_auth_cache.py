@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, update
+
+from app.models.drop import Drop
+from app.models.user import User
+from app.services.principal_cache import principal_cache
+
+
+@pytest.mark.asyncio
+async def test_deactivation_evicts_cached_principal(async_session, client: AsyncClient):
+    now = datetime.now(timezone.utc)
+    drop = Drop(
+        name="Auth Cache Drop",
+        capacity=5,
+        claim_window_start=now + timedelta(hours=1),
+        claim_window_end=now + timedelta(hours=2),
+        is_active=True,
+    )
+    async_session.add(drop)
+    await async_session.commit()
+
+    payload = {"email": "cached@test.com", "password": "cachedpassw"}
+    response = await client.post("/api/auth/signup", json=payload)
+    headers = {"Authorization": f"Bearer {response.json()['token']['access_token']}"}
+    assert principal_cache.get(payload["email"]) is not None
+
+    join_resp = await client.post(f"/api/drops/{drop.id}/join", headers=headers)
+    assert join_resp.status_code == 200
+
+    user = (await async_session.execute(select(User).where(User.email == payload["email"]))).scalar_one()
+    user.is_active = False
+    await async_session.commit()
+    assert principal_cache.get(payload["email"]) is None
+
+    leave_resp = await client.post(f"/api/drops/{drop.id}/leave", headers=headers)
+    assert leave_resp.status_code == 403
+
+    await async_session.execute(
+        update(User).where(User.email == payload["email"]).values(is_active=True)
+    )
+    await async_session.commit()
+    leave_resp = await client.post(f"/api/drops/{drop.id}/leave", headers=headers)
+    assert leave_resp.status_code == 200
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, update
+
+from app.models.drop import Drop
+from app.models.user import User
+from app.models.waitlist_entry import WaitlistEntry
+
+
+@pytest.mark.asyncio
+async def test_admin_bulk_join_json_and_ndjson(async_session, client: AsyncClient):
+    admin_payload = {"email": "bulk-admin@test.com", "password": "adminpassw"}
+    response = await client.post("/api/auth/signup", json=admin_payload)
+    headers = {"Authorization": f"Bearer {response.json()['token']['access_token']}"}
+    await async_session.execute(
+        update(User).where(User.email == admin_payload["email"]).values(is_admin=True)
+    )
+
+    now = datetime.now(timezone.utc)
+    drop = Drop(
+        name="Bulk Drop",
+        capacity=10,
+        claim_window_start=now + timedelta(hours=1),
+        claim_window_end=now + timedelta(hours=2),
+        is_active=True,
+    )
+    users = [User(email=f"bulk{idx}@test.com", hashed_password="x", is_active=True) for idx in range(4)]
+    users[3].is_active = False
+    async_session.add_all([drop, *users])
+    await async_session.commit()
+
+    response = await client.post(
+        f"/api/admin/drops/{drop.id}/waitlist/bulk",
+        json={
+            "user_ids": [users[0].id, users[0].id, 999_999],
+            "emails": ["BULK1@test.com", "bulk3@test.com"],
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert [row["status"] for row in body["results"]] == [
+        "created",
+        "duplicate",
+        "not_found",
+        "created",
+        "inactive",
+    ]
+    assert body["created"] == 2 and body["skipped"] == 3
+
+    await async_session.execute(
+        update(WaitlistEntry).where(WaitlistEntry.user_id == users[1].id).values(state="left")
+    )
+    await async_session.commit()
+
+    ndjson = "\n".join(
+        [str(users[0].id), '{"email": "bulk1@test.com"}', f'{{"user_id": {users[2].id}}}', "nonsense"]
+    )
+    response = await client.post(
+        f"/api/admin/drops/{drop.id}/waitlist/bulk",
+        content=ndjson.encode(),
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert [row["status"] for row in response.json()["results"]] == [
+        "already_joined",
+        "rejoined",
+        "created",
+        "invalid",
+    ]
+
+    states = (
+        await async_session.execute(
+            select(WaitlistEntry.state).where(WaitlistEntry.drop_id == drop.id)
+        )
+    ).scalars().all()
+    assert sorted(states) == ["joined", "joined", "joined"]
+
+    response = await client.post(f"/api/admin/drops/{drop.id}/rescore", headers=headers)
+    assert response.json() == {"drop_id": drop.id, "rescored": 3}
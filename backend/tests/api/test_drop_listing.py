@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+
+from app.models.drop import Drop
+from app.models.user import User
+
+
+@pytest.mark.asyncio
+async def test_drop_list_keyset_pagination_and_phase(async_session, client: AsyncClient):
+    now = datetime.now(timezone.utc)
+    windows = {
+        "Pagination Ended": (now - timedelta(days=2), now - timedelta(days=1)),
+        "Pagination Live": (now - timedelta(hours=1), now + timedelta(hours=1)),
+        "Pagination Upcoming": (now + timedelta(days=1), now + timedelta(days=2)),
+        "Pagination Later": (now + timedelta(days=1), now + timedelta(days=3)),
+    }
+    drops = [
+        Drop(name=name, capacity=3, claim_window_start=start, claim_window_end=end, is_active=True)
+        for name, (start, end) in windows.items()
+    ]
+    inactive = Drop(
+        name="Pagination Hidden",
+        capacity=3,
+        claim_window_start=now,
+        claim_window_end=now + timedelta(hours=1),
+        is_active=False,
+    )
+    async_session.add_all([*drops, inactive])
+    await async_session.commit()
+
+    seen: list[int] = []
+    cursor: str | None = None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/api/drops", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 2
+        assert all(drop["remaining"] == drop["capacity"] - drop["claimed_count"] for drop in page)
+        seen.extend(drop["id"] for drop in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert len(seen) == len(set(seen))
+    ours = [drop.id for drop in drops]
+    assert [drop_id for drop_id in seen if drop_id in ours] == ours
+    assert inactive.id not in seen
+
+    live = await client.get("/api/drops", params={"phase": "live"})
+    live_ids = {drop["id"] for drop in live.json()}
+    assert drops[1].id in live_ids
+    assert not live_ids & {drops[0].id, drops[2].id, drops[3].id}
+
+    bad = await client.get("/api/drops", params={"cursor": "not-a-cursor"})
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_drop_list_snapshot_etag(async_session, client: AsyncClient, sql_statements):
+    first = await client.get("/api/drops")
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"].startswith("public")
+
+    with sql_statements.expect(0):
+        cached = await client.get("/api/drops", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert cached.content == b""
+
+    payload = {"email": "etag-admin@test.com", "password": "adminpassw"}
+    response = await client.post("/api/auth/signup", json=payload)
+    headers = {"Authorization": f"Bearer {response.json()['token']['access_token']}"}
+    await async_session.execute(update(User).where(User.email == payload["email"]).values(is_admin=True))
+    await async_session.commit()
+
+    now = datetime.now(timezone.utc)
+    created = await client.post(
+        "/api/admin/drops",
+        json={
+            "name": "Snapshot Drop",
+            "capacity": 1,
+            "claim_window_start": (now + timedelta(hours=1)).isoformat(),
+            "claim_window_end": (now + timedelta(hours=2)).isoformat(),
+        },
+        headers=headers,
+    )
+    refreshed = await client.get("/api/drops", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["ETag"] != etag
+    assert created.json()["id"] in {drop["id"] for drop in refreshed.json()}
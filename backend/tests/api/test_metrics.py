@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.metrics import (
+    Histogram,
+    http_request_db_statements,
+    http_requests,
+    instrument_engine,
+    waitlist_outcomes,
+)
+from app.models.drop import Drop
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("demo_seconds", "Demo.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, "/x")
+    assert list(histogram.samples()) == [
+        'demo_seconds_bucket{route="/x",le="0.1"} 1',
+        'demo_seconds_bucket{route="/x",le="1.0"} 3',
+        'demo_seconds_bucket{route="/x",le="+Inf"} 4',
+        'demo_seconds_sum{route="/x"} 4.05',
+        'demo_seconds_count{route="/x"} 4',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_routes_sql_and_outcomes(
+    async_engine, async_session, client: AsyncClient
+):
+    instrument_engine(async_engine.sync_engine)
+    now = datetime.now(timezone.utc)
+    drop = Drop(
+        name="Metrics Drop",
+        capacity=1,
+        claim_window_start=now + timedelta(hours=1),
+        claim_window_end=now + timedelta(hours=2),
+    )
+    async_session.add(drop)
+    await async_session.commit()
+
+    response = await client.post(
+        "/api/auth/signup", json={"email": "metrics@test.com", "password": "metricspass"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['token']['access_token']}"}
+
+    route = "/api/drops/{drop_id}/join"
+    requests_before = http_requests.get("POST", route, "200")
+    statements_before = http_request_db_statements.count(route)
+    statement_total_before = http_request_db_statements.total(route)
+    joins_before = waitlist_outcomes.get("join", "created")
+    claims_before = waitlist_outcomes.get("claim", "window_closed")
+
+    await client.post(f"/api/drops/{drop.id}/join", headers=headers)
+    await client.post(f"/api/drops/{drop.id}/claim", headers=headers)
+
+    assert http_requests.get("POST", route, "200") == requests_before + 1
+    assert http_request_db_statements.count(route) == statements_before + 1
+    assert http_request_db_statements.total(route) == statement_total_before + 3
+    assert waitlist_outcomes.get("join", "created") == joins_before + 1
+    assert waitlist_outcomes.get("claim", "window_closed") == claims_before + 1
+
+    response = await client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert f'http_request_duration_seconds_count{{method="POST",route="{route}"}}' in body
+    assert 'http_requests_total{method="POST",route="/api/drops/{drop_id}/claim",status="403"}' in body
+    assert "http_requests_in_flight 1" in body
+    assert 'http_request_db_statements_bucket{route="/api/drops/{drop_id}/join",le="3.0"}' in body
+    assert 'waitlist_operations_total{operation="join",outcome="created"}' in body
+    assert "password_hash_queued 0" in body
+    assert "password_hash_rejected_total 0" in body
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+
+from app import crud
+from app.core.config import settings
+from app.db.query_tracking import QUERY_STATS_HEADER, track_queries
+from app.models.drop import Drop
+
+
+async def _drop_and_user(
+    async_session, client: AsyncClient, email: str
+) -> tuple[int, dict[str, str]]:
+    now = datetime.now(timezone.utc)
+    drop = Drop(
+        name="Budget Drop",
+        capacity=3,
+        claim_window_start=now + timedelta(hours=1),
+        claim_window_end=now + timedelta(hours=2),
+    )
+    async_session.add(drop)
+    await async_session.commit()
+    response = await client.post(
+        "/api/auth/signup", json={"email": email, "password": "budgetpass"}
+    )
+    return drop.id, {"Authorization": f"Bearer {response.json()['token']['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_query_budget_fixture(async_session, client: AsyncClient, query_budget):
+    drop_id, headers = await _drop_and_user(async_session, client, "budget@test.com")
+
+    with query_budget(statements=3, rows=3, objects=3) as tracker:
+        await client.post(f"/api/drops/{drop_id}/join", headers=headers)
+    assert tracker.statements == 3
+
+    with pytest.raises(pytest.fail.Exception, match="statements: 3 > 2"):
+        with query_budget(statements=2):
+            await client.post(f"/api/drops/{drop_id}/leave", headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_repeated_statements_are_flagged(async_session, query_budget):
+    with pytest.raises(pytest.fail.Exception, match="repeated: 1 > 0"):
+        with query_budget(statements=10):
+            for drop_id in (101, 102, 103):
+                await crud.get_drop(async_session, drop_id)
+
+    with track_queries() as tracker:
+        for _ in range(3):
+            await crud.get_drop(async_session, 101)
+    # The same parameters every time is a cache miss, not an N+1.
+    assert tracker.repeated() == {}
+
+
+@pytest.mark.asyncio
+async def test_query_stats_header(async_session, client: AsyncClient, query_budget, monkeypatch):
+    drop_id, headers = await _drop_and_user(async_session, client, "budget-header@test.com")
+    monkeypatch.setattr(settings, "query_tracking_enabled", True)
+
+    response = await client.post(f"/api/drops/{drop_id}/join", headers=headers)
+
+    assert response.headers[QUERY_STATS_HEADER].startswith("statements=3; rows=")
+    assert response.headers[QUERY_STATS_HEADER].endswith("repeated=0")
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+
+from app.models.drop import Drop
+from app.models.user import User
+from app.services.allocation import AllocationService
+
+
+@pytest.mark.asyncio
+async def test_endpoint_statement_counts(async_session, client: AsyncClient, sql_statements):
+    admin_payload = {"email": "counts-admin@test.com", "password": "adminpassw"}
+    response = await client.post("/api/auth/signup", json=admin_payload)
+    admin_headers = {"Authorization": f"Bearer {response.json()['token']['access_token']}"}
+    await async_session.execute(
+        update(User).where(User.email == admin_payload["email"]).values(is_admin=True)
+    )
+    await async_session.commit()
+
+    now = datetime.now(timezone.utc)
+    drop_payload = {
+        "name": "Query Count Drop",
+        "capacity": 5,
+        "claim_window_start": (now - timedelta(minutes=5)).isoformat(),
+        "claim_window_end": (now + timedelta(hours=1)).isoformat(),
+    }
+    drop_id = (await client.post("/api/admin/drops", json=drop_payload, headers=admin_headers)).json()["id"]
+
+    user_payload = {"email": "counts-user@test.com", "password": "userpassw"}
+    with sql_statements.expect(2):
+        response = await client.post("/api/auth/signup", json=user_payload)
+    headers = {"Authorization": f"Bearer {response.json()['token']['access_token']}"}
+
+    with sql_statements.expect(1):
+        await client.post("/api/auth/login", json=user_payload)
+
+    with sql_statements.expect(1):
+        await client.get("/api/drops")
+
+    with sql_statements.expect(3):
+        await client.post(f"/api/drops/{drop_id}/join", headers=headers)
+
+    with sql_statements.expect(3):
+        await client.post(f"/api/drops/{drop_id}/leave", headers=headers)
+
+    await client.post(f"/api/drops/{drop_id}/join", headers=headers)
+    # Settlement normally runs from the scheduler when the window opens.
+    drop = await async_session.get(Drop, drop_id)
+    await AllocationService(async_session).settle(drop)
+    await async_session.commit()
+    with sql_statements.expect(4):
+        await client.post(f"/api/drops/{drop_id}/claim", headers=headers)
+
+    await client.delete(f"/api/admin/drops/{drop_id}", headers=admin_headers)
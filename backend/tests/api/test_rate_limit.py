@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.core.load_shedding import LoadMonitor, LoadSheddingMiddleware, load_monitor
+from app.core.rate_limit import TokenBucketLimiter, rate_limited_requests
+from app.db.pool import PoolStats
+from app.models.drop import Drop
+
+
+def test_token_bucket_refills_at_the_budget_rate():
+    limiter = TokenBucketLimiter(max_keys=10)
+    assert limiter.acquire("k", "2/10", now=0.0) == 0.0
+    assert limiter.acquire("k", "2/10", now=0.0) == 0.0
+    assert limiter.acquire("k", "2/10", now=1.0) == pytest.approx(4.0)
+    # The rejected call consumed nothing: one token is back after 5 s.
+    assert limiter.acquire("k", "2/10", now=5.0) == 0.0
+    assert limiter.acquire("other", "2/10", now=5.0) == 0.0
+    assert limiter.stats() == {"keys": 2, "allowed": 4, "rejected": 1}
+
+
+def test_token_bucket_evicts_least_recent_keys():
+    limiter = TokenBucketLimiter(max_keys=2)
+    for key in ("a", "b", "a", "c"):
+        limiter.acquire(key, "1/60", now=0.0)
+    assert len(limiter) == 2
+    assert limiter.acquire("a", "1/60", now=0.0) > 0
+    # "b" was evicted, so it starts with a full bucket again.
+    assert limiter.acquire("b", "1/60", now=0.0) == 0.0
+
+
+async def _signup(client: AsyncClient, email: str) -> dict[str, str]:
+    response = await client.post("/api/auth/signup", json={"email": email, "password": "limitpass"})
+    return {"Authorization": f"Bearer {response.json()['token']['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_user_budget_rejects_with_retry_after(async_session, client: AsyncClient, monkeypatch):
+    now = datetime.now(timezone.utc)
+    drop = Drop(
+        name="Rate limited",
+        capacity=5,
+        claim_window_start=now + timedelta(hours=1),
+        claim_window_end=now + timedelta(hours=2),
+    )
+    async_session.add(drop)
+    await async_session.commit()
+    hammering = await _signup(client, "limit-hammer@example.com")
+    polite = await _signup(client, "limit-polite@example.com")
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    monkeypatch.setattr(settings, "rate_limit_user_budgets", {"join": "2/60"})
+    rejected_before = rate_limited_requests.get("join", "user")
+    statuses = [
+        (await client.post(f"/api/drops/{drop.id}/join", headers=hammering)).status_code
+        for _ in range(3)
+    ]
+    assert statuses == [200, 200, 429]
+    limited = await client.post(f"/api/drops/{drop.id}/join", headers=hammering)
+    assert int(limited.headers["Retry-After"]) == 30
+    assert (await client.post(f"/api/drops/{drop.id}/join", headers=polite)).status_code == 200
+    assert rate_limited_requests.get("join", "user") == rejected_before + 2
+
+
+@pytest.mark.asyncio
+async def test_login_is_limited_per_address(client: AsyncClient, monkeypatch):
+    await _signup(client, "limit-login@example.com")
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    monkeypatch.setattr(settings, "rate_limit_ip_budgets", {"login": "1/60"})
+    payload = {"email": "limit-login@example.com", "password": "wrong-password"}
+    assert (await client.post("/api/auth/login", json=payload)).status_code == 401
+    assert (await client.post("/api/auth/login", json=payload)).status_code == 429
+
+
+@pytest.mark.asyncio
+async def test_overloaded_process_sheds_all_but_health(client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "load_shed_enabled", True)
+    monkeypatch.setattr(load_monitor, "loop_lag", settings.load_shed_loop_lag_seconds * 2)
+
+    shed = await client.get("/api/drops")
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == str(settings.load_shed_retry_after_seconds)
+    assert (await client.get("/health")).status_code == 200
+
+    monkeypatch.setattr(load_monitor, "loop_lag", 0.0)
+    assert (await client.get("/api/drops")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_in_flight_cap_sheds_excess_requests(monkeypatch):
+    monkeypatch.setattr(settings, "load_shed_enabled", True)
+    monkeypatch.setattr(settings, "load_shed_max_in_flight", 1)
+    release = asyncio.Event()
+
+    async def slow_app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware = LoadSheddingMiddleware(slow_app, monitor=LoadMonitor(sample_seconds=1))
+    sent: list[list[dict]] = [[], []]
+
+    def call(idx: int):
+        async def send(message):
+            sent[idx].append(message)
+
+        return middleware({"type": "http", "path": "/api/drops"}, None, send)
+
+    first = asyncio.create_task(call(0))
+    await asyncio.sleep(0)
+    await call(1)
+    release.set()
+    await first
+
+    assert sent[0][0]["status"] == 200
+    assert sent[1][0]["status"] == 503
+    assert middleware.in_flight == 0
+
+
+def test_monitor_reports_pool_wait_over_the_threshold(monkeypatch):
+    monkeypatch.setattr(settings, "load_shed_pool_wait_seconds", 0.1)
+    stats = PoolStats()
+    stats.record(5.0)
+    monitor = LoadMonitor(sample_seconds=1)
+    monitor.sample_pool(stats)
+    assert monitor.pool_wait == 0.0
+
+    stats.record(0.3)
+    stats.record(0.1)
+    monitor.sample_pool(stats)
+    assert monitor.pool_wait == pytest.approx(0.2)
+    assert monitor.overload_reason() == "pool_wait"
+
+    monitor.sample_pool(stats)
+    assert monitor.overload_reason() is None
+    stats.timeouts += 1
+    monitor.sample_pool(stats)
+    assert monitor.overload_reason() == "pool_wait"
+
+
+@pytest.mark.asyncio
+async def test_monitor_samples_until_stopped():
+    monitor = LoadMonitor(sample_seconds=0.001)
+    monitor.start(SimpleNamespace(stats=PoolStats()))
+    await asyncio.sleep(0.01)
+    await monitor.stop()
+    assert monitor.stats()["pool_wait_seconds"] == 0.0
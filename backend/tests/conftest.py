@@ -1,26 +1,47 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import AsyncIterator
-from contextlib import asynccontextmanager
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from datetime import datetime, timedelta, timezone
 from typing import AsyncGenerator
 
 import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.asyncio.session import async_sessionmaker
 
+from app.core.rate_limit import rate_limiter
+from app.core.security import get_password_hash
 from app.main import app as fastapi_app
 from app.db.base import Base
+from app.db.query_tracking import QueryTracker, install_query_tracking, track_queries
 from app.db.session import get_db
+from app.models.drop import Drop
+from app.models.user import User
+from app.services.drop_catalog import drop_list_snapshot
+from app.services.principal_cache import principal_cache
+from app.services.ranking import waitlist_rankings
+from app.services.waiting_room import waiting_room
+from app.services.waitlist import WaitlistService
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 
-@asynccontextmanager
-async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
-    yield
+class StatementCounter:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+    @contextmanager
+    def expect(self, count: int) -> Iterator[None]:
+        self.statements.clear()
+        yield
+        assert len(self.statements) == count, "\n".join(self.statements)
 
 
 @pytest.fixture(scope="session")
@@ -53,6 +74,48 @@ async def async_session(async_engine):
         await session.rollback()
 
 
+@pytest.fixture
+def session_factory(async_engine) -> async_sessionmaker[AsyncSession]:
+    """Independent sessions on the test engine, for background tasks under test."""
+    return async_sessionmaker(bind=async_engine, expire_on_commit=False, class_=AsyncSession)
+
+
+@pytest.fixture
+def seed_drop(async_session) -> Callable[..., Awaitable[tuple[Drop, list[User]]]]:
+    """Commit an active drop and ``users`` accounts, optionally joined to it."""
+
+    async def seed(
+        label: str,
+        *,
+        users: int,
+        capacity: int = 1,
+        opens_in: timedelta = timedelta(hours=-1),
+        join: bool = False,
+    ) -> tuple[Drop, list[User]]:
+        now = datetime.now(timezone.utc)
+        drop = Drop(
+            name=f"Seeded {label}",
+            capacity=capacity,
+            claim_window_start=now + opens_in,
+            claim_window_end=now + opens_in + timedelta(hours=2),
+            is_active=True,
+        )
+        members = [
+            User(email=f"{label}-{idx}@example.com", hashed_password=get_password_hash("pw"))
+            for idx in range(users)
+        ]
+        async_session.add_all([drop, *members])
+        await async_session.flush()
+        if join:
+            service = WaitlistService(async_session)
+            for user in members:
+                await service.join_waitlist(user=user, drop=drop)
+        await async_session.commit()
+        return drop, members
+
+    return seed
+
+
 @pytest.fixture(scope="function")
 async def app(async_session):
     def _get_test_db():
@@ -68,3 +131,60 @@ async def client(app: FastAPI) -> AsyncGenerator[AsyncClient, None]:
     async with AsyncClient(app=app, base_url="http://testserver") as ac:
         yield ac
 
+
+@pytest.fixture
+def sql_statements(async_engine) -> Iterator[StatementCounter]:
+    counter = StatementCounter()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", counter)
+
+
+@pytest.fixture
+def query_budget(async_engine) -> Callable[..., AbstractContextManager[QueryTracker]]:
+    """Fail the test if the block runs more SQL than declared.
+
+    ``repeated`` bounds the statements flagged as N+1 (same SQL, different
+    parameters); ``rows`` and ``objects`` are only checked when given.
+    """
+    install_query_tracking(async_engine.sync_engine)
+
+    @contextmanager
+    def budget(
+        *,
+        statements: int,
+        rows: int | None = None,
+        objects: int | None = None,
+        repeated: int = 0,
+    ) -> Iterator[QueryTracker]:
+        with track_queries() as tracker:
+            yield tracker
+        limits = {"statements": statements, "rows": rows, "objects": objects}
+        over = [
+            f"{name}: {getattr(tracker, name)} > {limit}"
+            for name, limit in limits.items()
+            if limit is not None and getattr(tracker, name) > limit
+        ]
+        flagged = tracker.repeated()
+        if len(flagged) > repeated:
+            over.append(f"repeated: {len(flagged)} > {repeated}")
+            over.extend(f"  x{count} {statement}" for statement, count in flagged.items())
+        if over:
+            pytest.fail(
+                "Query budget exceeded\n" + "\n".join(over) + "\n--\n" + "\n".join(tracker.executed)
+            )
+
+    return budget
+
+
+@pytest.fixture(autouse=True)
+def reset_process_caches() -> None:
+    # Tests write straight through the session, bypassing the routes that
+    # normally invalidate these process-local caches.
+    drop_list_snapshot.invalidate()
+    principal_cache.invalidate()
+    waitlist_rankings.invalidate()
+    waiting_room.invalidate()
+    rate_limiter.reset()
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import Settings
+from app.db.pool import InstrumentedAsyncPool, pool_status
+from app.db.session import engine_options, warm_pool
+
+
+def test_engine_options_wire_pool_settings():
+    config = Settings(
+        DATABASE_URL="postgresql+asyncpg://user:pw@db/dropspot",
+        DB_POOL_SIZE=7,
+        DB_MAX_OVERFLOW=3,
+        DB_POOL_TIMEOUT=2.5,
+        DB_POOL_RECYCLE=600,
+        DB_POOL_PRE_PING=False,
+        DB_STATEMENT_CACHE_SIZE=0,
+    )
+    options = engine_options(config)
+    assert options["poolclass"] is InstrumentedAsyncPool
+    assert (options["pool_size"], options["max_overflow"]) == (7, 3)
+    assert (options["pool_timeout"], options["pool_recycle"]) == (2.5, 600)
+    assert options["pool_pre_ping"] is False
+    assert options["connect_args"] == {"prepared_statement_cache_size": 0}
+
+    assert "poolclass" not in engine_options(Settings(DATABASE_URL="sqlite+aiosqlite:///./x.db"))
+
+
+@pytest.mark.asyncio
+async def test_instrumented_pool_reports_waits_and_utilisation(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedAsyncPool,
+        pool_size=2,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    try:
+        assert await warm_pool(engine, 2) == 2
+        assert pool_status(engine.pool)["checked_in"] == 2
+
+        held = [await engine.connect().start() for _ in range(2)]
+        status = pool_status(engine.pool)
+        assert status["checked_out"] == 2
+        assert status["utilisation"] == 1.0
+
+        with pytest.raises(Exception, match="QueuePool limit"):
+            await asyncio.wait_for(engine.connect().start(), timeout=5)
+        for connection in held:
+            await connection.close()
+
+        status = pool_status(engine.pool)
+        assert status["timeouts"] == 1
+        assert status["wait_seconds_max"] >= 0.05
+    finally:
+        await engine.dispose()
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+
+from app.core.priority import (
+    PriorityScorer,
+    compute_coefficients,
+    compute_priority_score,
+    compute_priority_scores,
+)
+
+
+def test_batch_scores_match_scalar_bit_for_bit():
+    rng = random.Random(7)
+    coefficients = compute_coefficients("a1b2c3d4")
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    user_ids, created_ats, joined_ats = [], [], []
+    for idx in range(500):
+        created_at = base + timedelta(seconds=rng.randint(0, 10**7), microseconds=rng.randint(0, 999_999))
+        joined_at = created_at + timedelta(milliseconds=rng.randint(-10**6, 10**10))
+        if idx % 3 == 0:
+            # Naive timestamps, as SQLite returns them, are treated as UTC.
+            created_at = created_at.replace(tzinfo=None)
+        user_ids.append(rng.randint(1, 10**6))
+        created_ats.append(created_at)
+        joined_ats.append(joined_at)
+
+    scores = compute_priority_scores(
+        user_ids=user_ids,
+        user_created_ats=created_ats,
+        joined_ats=joined_ats,
+        drop_id=42,
+        drop_capacity=250,
+        coefficients=coefficients,
+    )
+
+    expected = [
+        compute_priority_score(
+            user_id=user_id,
+            user_created_at=created_at,
+            drop_id=42,
+            drop_capacity=250,
+            joined_at=joined_at,
+            coefficients=coefficients,
+        )
+        for user_id, created_at, joined_at in zip(user_ids, created_ats, joined_ats)
+    ]
+    assert scores.typecode == "d"
+    assert scores.tolist() == expected
+
+
+def test_scorer_matches_reference_and_bounds_memo():
+    rng = random.Random(11)
+    coefficients = compute_coefficients("0f1e2d3c")
+    scorer = PriorityScorer(coefficients, max_drops=4)
+    now = datetime.now(timezone.utc)
+    for _ in range(200):
+        kwargs = {
+            "user_id": rng.randint(1, 10**6),
+            "user_created_at": now - timedelta(seconds=rng.randint(0, 10**8)),
+            "drop_id": rng.randint(1, 10),
+            "drop_capacity": rng.randint(1, 500),
+            "joined_at": now,
+        }
+        assert scorer.score(**kwargs) == compute_priority_score(coefficients=coefficients, **kwargs)
+    assert len(scorer._bases) == 4
@@ -0,0 +1,147 @@
+"""EXPLAIN-plan regression tests for the hot crud queries.
+
+Each hot path is run once against the schema built from the models, the
+statements it emits are captured, and their plans must not contain a full
+table scan or a sort. SQLite always runs; PostgreSQL runs when
+``TEST_POSTGRES_URL`` points at a disposable database.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from app import crud
+from app.db.base import Base
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+ENTRY = SimpleNamespace(id=10, drop_id=1, priority_score=Decimal("12.5"), joined_at=NOW)
+
+HOT_PATHS: dict[str, Callable[[AsyncSession], Awaitable[object]]] = {
+    "get_waitlist_entry": lambda s: crud.get_waitlist_entry(s, user_id=1, drop_id=1),
+    "get_waitlist_entry_by_claim_code": lambda s: crud.get_waitlist_entry_by_claim_code(
+        s, drop_id=1, claim_code="ABCDEF0123456789"
+    ),
+    "list_waitlist_by_drop": lambda s: crud.list_waitlist_by_drop(s, drop_id=1),
+    "list_waitlist_ranking": lambda s: crud.list_waitlist_ranking(s, drop_id=1),
+    "count_waitlist_ahead": lambda s: crud.count_waitlist_ahead(s, entry=ENTRY, limit=100),
+    "mark_waitlist_entry_claimed": lambda s: crud.mark_waitlist_entry_claimed(
+        s, entry_id=1, claim_code="ABCDEF0123456789", claimed_at=NOW
+    ),
+    "get_drop": lambda s: crud.get_drop(s, 1),
+    "reserve_claim_slot": lambda s: crud.reserve_claim_slot(s, 1),
+    "get_active_drops": lambda s: crud.get_active_drops(s, limit=20),
+    # The first page walks the primary key backwards and stops at the limit,
+    # which SQLite reports as a plain SCAN; later pages search the key.
+    "get_drops": lambda s: crud.get_drops(s, limit=20, after_id=1_000),
+    "get_due_unsettled_drops": lambda s: crud.get_due_unsettled_drops(s, now=NOW),
+    "get_drop_allocation": lambda s: crud.get_drop_allocation(s, drop_id=1, user_id=1),
+    "get_user_by_email": lambda s: crud.get_user_by_email(s, "plan@example.com"),
+}
+
+TABLES = set(Base.metadata.tables)
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+
+async def _capture(
+    engine: AsyncEngine,
+    session: AsyncSession,
+    run: Callable[[AsyncSession], Awaitable[object]],
+) -> list[tuple[str, object]]:
+    captured: list[tuple[str, object]] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany) -> None:
+        captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        await run(session)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _record)
+    return captured
+
+
+def sqlite_plan_problems(rows: list[tuple]) -> list[str]:
+    problems = []
+    for row in rows:
+        detail = row[-1]
+        match = _SQLITE_SCAN.match(detail)
+        if match and match.group(1) in TABLES:
+            problems.append(detail)
+        elif "TEMP B-TREE" in detail:
+            problems.append(detail)
+    return problems
+
+
+def postgres_plan_problems(plan: dict) -> list[str]:
+    problems = []
+    node_type = plan["Node Type"]
+    if node_type == "Seq Scan" and plan.get("Relation Name") in TABLES:
+        problems.append(f"Seq Scan on {plan['Relation Name']}")
+    elif node_type in {"Sort", "Incremental Sort"}:
+        problems.append(f"{node_type} on {plan.get('Sort Key')}")
+    for child in plan.get("Plans", ()):
+        problems.extend(postgres_plan_problems(child))
+    return problems
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", HOT_PATHS)
+async def test_sqlite_hot_path_plans(name, async_engine, async_session):
+    statements = await _capture(async_engine, async_session, HOT_PATHS[name])
+    assert statements
+    conn = await async_session.connection()
+    for statement, parameters in statements:
+        result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        rows = [tuple(row) for row in result.all()]
+        assert not sqlite_plan_problems(rows), f"{statement}\n" + "\n".join(map(str, rows))
+
+
+@pytest.fixture(scope="module")
+def postgres_url() -> str:
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    pytest.importorskip("asyncpg")
+    return url
+
+
+@pytest.mark.asyncio
+async def test_postgres_hot_path_plans(postgres_url):
+    engine = create_async_engine(postgres_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    failures = {}
+    try:
+        for name, run in HOT_PATHS.items():
+            async with AsyncSession(engine) as session:
+                conn = await session.connection()
+                # Empty tables make a sequential scan the cheapest plan; with
+                # these off a Seq Scan or Sort only remains if no index fits.
+                await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+                await conn.exec_driver_sql("SET LOCAL enable_sort = off")
+                for statement, parameters in await _capture(engine, session, run):
+                    result = await conn.exec_driver_sql(
+                        f"EXPLAIN (FORMAT JSON) {statement}", parameters
+                    )
+                    plan = result.scalar_one()
+                    if isinstance(plan, str):
+                        plan = json.loads(plan)
+                    problems = postgres_plan_problems(plan[0]["Plan"])
+                    if problems:
+                        failures[name] = (statement, problems)
+                await session.rollback()
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+    assert not failures, failures
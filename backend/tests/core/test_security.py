@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from app.core.security import HashingOverloadedError, PasswordHasher
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_rejects_beyond_pending_limit():
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    try:
+        results = await asyncio.gather(
+            *(hasher.hash("correct horse") for _ in range(3)),
+            return_exceptions=True,
+        )
+        rejected = [result for result in results if isinstance(result, HashingOverloadedError)]
+        hashed = [result for result in results if isinstance(result, str)]
+
+        assert len(rejected) == 1
+        assert len(hashed) == 2
+        assert await hasher.verify("correct horse", hashed[0]) is True
+        stats = hasher.stats()
+        assert stats["rejected"] == 1
+        assert stats["succeeded"] == 3 and stats["failed"] == 0
+        assert stats["queued"] == 0 and stats["in_flight"] == 0
+    finally:
+        hasher.shutdown()
+
+
+def _slow_hash(release: threading.Event) -> str:
+    release.wait(timeout=5)
+    return "hashed"
+
+
+def _broken_hash() -> str:
+    raise ValueError("malformed hash")
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_keeps_slot_until_cancelled_job_finishes():
+    hasher = PasswordHasher(workers=1, max_pending=2)
+    release = threading.Event()
+    try:
+        abandoned = asyncio.create_task(hasher._run(_slow_hash, release))
+        await asyncio.sleep(0.05)
+        abandoned.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await abandoned
+
+        # The worker is still busy, so the next caller has to queue.
+        waiting = asyncio.create_task(hasher._run(_slow_hash, release))
+        await asyncio.sleep(0.05)
+        assert hasher.stats()["in_flight"] == 1
+        assert hasher.stats()["queued"] == 1
+
+        release.set()
+        assert await waiting == "hashed"
+        with pytest.raises(ValueError):
+            await hasher._run(_broken_hash)
+        stats = hasher.stats()
+        assert stats["succeeded"] == 2 and stats["failed"] == 1
+        assert stats["queued"] == 0 and stats["in_flight"] == 0
+    finally:
+        release.set()
+        hasher.shutdown()
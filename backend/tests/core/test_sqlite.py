@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import Settings
+from app.db.sqlite import configure_sqlite
+
+
+@pytest.mark.asyncio
+async def test_sqlite_mode_sets_pragmas_and_serialises_writers(tmp_path):
+    config = Settings(
+        DATABASE_URL=f"sqlite+aiosqlite:///{tmp_path / 'app.db'}",
+        SQLITE_BUSY_TIMEOUT_MS=2000,
+    )
+    engine = create_async_engine(config.database_url)
+    writer = configure_sqlite(engine, config)
+    try:
+        async with engine.connect() as conn:
+            pragmas = {
+                name: (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+                for name in ("journal_mode", "busy_timeout", "synchronous", "cache_size")
+            }
+            await conn.execute(text("CREATE TABLE hits (id INTEGER PRIMARY KEY, n INTEGER)"))
+            await conn.commit()
+        assert pragmas == {
+            "journal_mode": "wal",
+            "busy_timeout": 2000,
+            "synchronous": 1,
+            "cache_size": config.sqlite_cache_size,
+        }
+
+        async def write(n: int) -> None:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT count(*) FROM hits"))
+                await conn.execute(text("INSERT INTO hits (n) VALUES (:n)"), {"n": n})
+                await asyncio.sleep(0.005)
+                await conn.execute(text("UPDATE hits SET n = n + 1 WHERE n = :n"), {"n": n})
+                await conn.commit()
+
+        transactions_before = writer.transactions
+        await asyncio.gather(*(write(n * 10) for n in range(20)))
+
+        async with engine.connect() as conn:
+            assert (await conn.execute(text("SELECT count(*) FROM hits"))).scalar() == 20
+        stats = writer.stats()
+        assert stats["transactions"] - transactions_before == 20
+        assert stats["busy"] == 0 and stats["waiting"] == 0
+        assert stats["wait_seconds_max"] > 0
+    finally:
+        await engine.dispose()
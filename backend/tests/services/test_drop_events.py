@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from app.db.query_tracking import install_query_tracking, track_queries
+from app.services.allocation import AllocationService
+from app.services.drop_events import DropEventHub, DropSubscription, drop_events
+from app.services.waitlist import WaitlistService
+
+
+@pytest.mark.asyncio
+async def test_subscribers_get_their_own_position_and_eligibility(
+    async_session, seed_drop, session_factory
+):
+    drop, (first, second) = await seed_drop("events-positions", users=2, join=True)
+    hub = DropEventHub(session_factory=session_factory, coalesce_seconds=0.0, buffer_size=4)
+    try:
+        subscriptions = {user.id: hub.subscribe(drop.id, user.id) for user in (first, second)}
+        updates = {
+            user_id: await subscription.next(timeout=1)
+            for user_id, subscription in subscriptions.items()
+        }
+        assert {update["phase"] for update in updates.values()} == {"live"}
+        assert {update["remaining"] for update in updates.values()} == {1}
+        # Order follows the priority score, not the join order.
+        leader, runner_up = sorted((first, second), key=lambda user: updates[user.id]["position"])
+        assert (updates[leader.id]["position"], updates[leader.id]["eligible"]) == (1, True)
+        assert (updates[runner_up.id]["position"], updates[runner_up.id]["eligible"]) == (2, False)
+
+        await WaitlistService(async_session).leave_waitlist(user=leader, drop=drop)
+        await async_session.commit()
+        hub.notify(drop.id)
+
+        assert (await subscriptions[leader.id].next(timeout=1))["state"] == "left"
+        promoted = await subscriptions[runner_up.id].next(timeout=1)
+        assert (promoted["position"], promoted["eligible"]) == (1, True)
+    finally:
+        hub.close()
+
+
+@pytest.mark.asyncio
+async def test_settled_drops_report_the_queue_behind_the_allocation(
+    async_session, seed_drop, session_factory
+):
+    drop, users = await seed_drop("events-settled", users=3, join=True)
+    await AllocationService(async_session).settle(drop)
+    await async_session.commit()
+    hub = DropEventHub(session_factory=session_factory, coalesce_seconds=0.0, buffer_size=4)
+    try:
+        subscriptions = {user.id: hub.subscribe(drop.id, user.id) for user in users}
+        updates = [await subscription.next(timeout=1) for subscription in subscriptions.values()]
+        assert sorted((update["position"], update["eligible"]) for update in updates) == [
+            (1, True),
+            (2, False),
+            (3, False),
+        ]
+    finally:
+        hub.close()
+
+
+@pytest.mark.asyncio
+async def test_broadcasters_do_not_count_sql_against_the_subscribing_request(
+    async_engine, seed_drop, session_factory
+):
+    drop, (user,) = await seed_drop("events-context", users=1, join=True)
+    hub = DropEventHub(session_factory=session_factory, coalesce_seconds=0.0, buffer_size=4)
+    install_query_tracking(async_engine.sync_engine)
+    try:
+        with track_queries() as tracker:
+            subscription = hub.subscribe(drop.id, user.id)
+            await subscription.next(timeout=1)
+        assert tracker.statements == 0
+    finally:
+        hub.close()
+
+
+@pytest.mark.asyncio
+async def test_bursts_of_changes_are_published_once(seed_drop, session_factory):
+    drop, (user,) = await seed_drop("events-burst", users=1, join=True)
+    hub = DropEventHub(session_factory=session_factory, coalesce_seconds=0.05, buffer_size=4)
+    try:
+        subscription = hub.subscribe(drop.id, user.id)
+        await subscription.next(timeout=1)
+        broadcaster = hub._broadcasters[drop.id]
+        published = 0
+        original = broadcaster.publish
+
+        async def counting_publish() -> None:
+            nonlocal published
+            published += 1
+            await original()
+
+        broadcaster.publish = counting_publish
+        for _ in range(20):
+            hub.notify(drop.id)
+        await asyncio.sleep(0.2)
+        assert published == 1
+    finally:
+        hub.close()
+
+
+@pytest.mark.asyncio
+async def test_unsubscribing_the_last_client_stops_the_broadcaster(seed_drop, session_factory):
+    drop, (user,) = await seed_drop("events-unsubscribe", users=1, join=True)
+    hub = DropEventHub(session_factory=session_factory, coalesce_seconds=0.0, buffer_size=4)
+    subscription = hub.subscribe(drop.id, user.id)
+    task = hub._broadcasters[drop.id]._task
+    assert hub.stats() == {"drops": 1, "subscribers": 1}
+
+    hub.unsubscribe(drop.id, subscription)
+    await asyncio.sleep(0)
+    assert hub.stats() == {"drops": 0, "subscribers": 0}
+    assert task.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_slow_subscribers_keep_only_the_newest_updates():
+    subscription = DropSubscription(1, buffer_size=2)
+    for remaining in (3, 3, 2, 1):
+        subscription.push({"remaining": remaining})
+
+    assert subscription.dropped == 1
+    assert await subscription.next(timeout=0) == {"remaining": 2}
+    assert await subscription.next(timeout=0) == {"remaining": 1}
+    assert await subscription.next(timeout=0.01) is None
+
+
+@pytest.mark.asyncio
+async def test_event_stream_ends_when_the_drop_is_deactivated(
+    async_session, seed_drop, session_factory, client: AsyncClient, monkeypatch
+):
+    monkeypatch.setattr(drop_events, "session_factory", session_factory)
+    monkeypatch.setattr(drop_events, "coalesce_seconds", 0.0)
+    drop, _ = await seed_drop("events-stream", users=0)
+    response = await client.post(
+        "/api/auth/signup", json={"email": "events-stream@example.com", "password": "streampass"}
+    )
+    token = response.json()["token"]["access_token"]
+    assert (await client.get(f"/api/drops/{drop.id}/events")).status_code == 401
+
+    stream = asyncio.create_task(client.get(f"/api/drops/{drop.id}/events?access_token={token}"))
+    while drop_events.subscriber_count(drop.id) == 0:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)
+    drop.is_active = False
+    await async_session.commit()
+    drop_events.notify(drop.id)
+
+    response = await asyncio.wait_for(stream, timeout=2)
+    assert response.headers["content-type"].startswith("text/event-stream")
+    updates = [
+        json.loads(line.removeprefix("data: "))
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert updates[0]["state"] is None and updates[0]["remaining"] == 1
+    assert updates[-1] == {"drop_id": drop.id, "phase": "closed"}
+    assert drop_events.subscriber_count(drop.id) == 0
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+from httpx import AsyncClient
+
+from app import crud
+from app.core.config import settings
+from app.db.query_tracking import install_query_tracking, track_queries
+from app.models.user import User
+from app.schemas.user import UserPrincipal
+from app.services.group_commit import WaitlistCommitPipeline, waitlist_pipeline
+from app.services.waitlist import WaitlistService
+
+UPCOMING = timedelta(hours=1)
+
+
+def _principals(users: list[User]) -> list[UserPrincipal]:
+    return [UserPrincipal.model_validate(user) for user in users]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_joins_share_one_commit(async_session, seed_drop, session_factory):
+    drop, users = await seed_drop("group-batch", users=4, opens_in=UPCOMING)
+    users = _principals(users)
+    pipeline = WaitlistCommitPipeline(
+        session_factory=session_factory, max_batch=100, max_wait_seconds=0.02
+    )
+    try:
+        results = await asyncio.gather(
+            *(pipeline.join(user=user, drop=drop) for user in users),
+            pipeline.join(user=users[0], drop=drop),
+        )
+    finally:
+        await pipeline.close()
+
+    assert [created for _, created in results] == [True, True, True, True, False]
+    assert results[4][0].id == results[0][0].id
+    assert pipeline.stats()["batches"] == 1
+    refreshed = await crud.get_drop(async_session, drop.id)
+    await async_session.refresh(refreshed)
+    assert refreshed.joined_count == 4
+
+
+@pytest.mark.asyncio
+async def test_mutations_apply_in_submission_order(seed_drop, session_factory):
+    drop, users = await seed_drop("group-order", users=1, opens_in=UPCOMING)
+    (user,) = _principals(users)
+    pipeline = WaitlistCommitPipeline(
+        session_factory=session_factory, max_batch=2, max_wait_seconds=0.02
+    )
+    try:
+        joined, left, rejoined = await asyncio.gather(
+            pipeline.join(user=user, drop=drop),
+            pipeline.leave(user=user, drop=drop),
+            pipeline.join(user=user, drop=drop),
+        )
+    finally:
+        await pipeline.close()
+
+    assert joined[1] is True
+    assert left.state == WaitlistService.LEFT_STATE
+    assert rejoined[0].state == WaitlistService.JOINED_STATE and rejoined[1] is False
+    assert pipeline.stats()["batches"] == 2
+
+
+@pytest.mark.asyncio
+async def test_a_failing_mutation_only_fails_its_caller(
+    async_session, seed_drop, session_factory, monkeypatch
+):
+    drop, users = await seed_drop("group-failure", users=2, opens_in=UPCOMING)
+    good, bad = _principals(users)
+    original = WaitlistService.join_waitlist
+
+    async def flaky_join(self, *, user, drop):
+        if user.id == bad.id:
+            raise RuntimeError("boom")
+        return await original(self, user=user, drop=drop)
+
+    monkeypatch.setattr(WaitlistService, "join_waitlist", flaky_join)
+    pipeline = WaitlistCommitPipeline(
+        session_factory=session_factory, max_batch=100, max_wait_seconds=0.02
+    )
+    try:
+        ok, failed = await asyncio.gather(
+            pipeline.join(user=good, drop=drop),
+            pipeline.join(user=bad, drop=drop),
+            return_exceptions=True,
+        )
+    finally:
+        await pipeline.close()
+
+    assert ok[1] is True
+    assert isinstance(failed, RuntimeError)
+    assert pipeline.stats()["replays"] == 1
+    assert await crud.get_waitlist_entry(async_session, user_id=bad.id, drop_id=drop.id) is None
+
+
+@pytest.mark.asyncio
+async def test_flusher_sql_is_not_counted_against_the_first_caller(
+    async_engine, seed_drop, session_factory
+):
+    drop, users = await seed_drop("group-context", users=1, opens_in=UPCOMING)
+    (user,) = _principals(users)
+    pipeline = WaitlistCommitPipeline(
+        session_factory=session_factory, max_batch=100, max_wait_seconds=0.02
+    )
+    install_query_tracking(async_engine.sync_engine)
+    try:
+        with track_queries() as tracker:
+            await pipeline.join(user=user, drop=drop)
+    finally:
+        await pipeline.close()
+
+    assert tracker.statements == 0
+
+
+@pytest.mark.asyncio
+async def test_join_route_uses_the_pipeline_when_enabled(
+    seed_drop, session_factory, client: AsyncClient, monkeypatch
+):
+    drop, _ = await seed_drop("group-route", users=0, opens_in=UPCOMING)
+    monkeypatch.setattr(settings, "waitlist_group_commit_enabled", True)
+    monkeypatch.setattr(waitlist_pipeline, "session_factory", session_factory)
+    response = await client.post(
+        "/api/auth/signup", json={"email": "group-route@example.com", "password": "grouppass"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['token']['access_token']}"}
+    batches = waitlist_pipeline.stats()["batches"]
+    try:
+        joined = await client.post(f"/api/drops/{drop.id}/join", headers=headers)
+        left = await client.post(f"/api/drops/{drop.id}/leave", headers=headers)
+    finally:
+        await waitlist_pipeline.close()
+
+    assert joined.status_code == 200 and joined.json()["created"] is True
+    assert left.json() == {"success": True, "state": WaitlistService.LEFT_STATE}
+    assert waitlist_pipeline.stats()["batches"] == batches + 2
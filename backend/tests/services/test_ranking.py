@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.drop import Drop
+from app.models.user import User
+from app.services.ranking import DropRanking, RankingRegistry
+from app.services.waitlist import WaitlistService
+
+
+def test_drop_ranking_orders_by_score_then_join_time():
+    now = datetime.now(timezone.utc)
+    ranking = DropRanking(
+        1,
+        [
+            (1, 10.5, now),
+            (2, 30.0, now),
+            (3, 10.5, now - timedelta(seconds=5)),
+        ],
+    )
+    assert ranking.entry_ids() == [2, 3, 1]
+    assert ranking.position(1) == 3
+
+    ranking.add(4, 20.25, now.replace(tzinfo=None))
+    assert ranking.top(2) == [2, 4]
+
+    ranking.discard(2)
+    assert ranking.position(4) == 1
+    assert ranking.position(2) is None
+    assert len(ranking) == 3
+
+
+@pytest.mark.asyncio
+async def test_staged_changes_apply_on_commit(async_session):
+    now = datetime.now(timezone.utc)
+    drop = Drop(
+        name="Ranking Drop",
+        capacity=5,
+        claim_window_start=now + timedelta(hours=1),
+        claim_window_end=now + timedelta(hours=2),
+        is_active=True,
+    )
+    user = User(email="ranking@example.com", hashed_password="x", is_active=True)
+    async_session.add_all([drop, user])
+    await async_session.commit()
+
+    registry = RankingRegistry(ttl_seconds=60)
+    ranking = await registry.get_or_load(async_session, drop.id)
+    assert len(ranking) == 0
+
+    service = WaitlistService(async_session)
+    service.rankings = registry
+    entry, _ = await service.join_waitlist(user=user, drop=drop)
+    entry_id = entry.id
+    assert entry_id not in ranking
+    await async_session.commit()
+
+    assert ranking.position(entry_id) == 1
+    assert await registry.verify(async_session, drop.id) is True
+
+    await service.leave_waitlist(user=user, drop=drop)
+    await async_session.rollback()
+    assert ranking.position(entry_id) == 1
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.models.drop import Drop
+from app.services.waiting_room import (
+    QUEUE_TICKET_HEADER,
+    ClaimSlotsBusyError,
+    InvalidTicketError,
+    WaitingRoom,
+    waiting_room,
+)
+
+
+def _room(**overrides) -> WaitingRoom:
+    options = {"secret_key": "test", "admit_per_second": 10.0, "burst": 2, "max_concurrent": 1}
+    options.update(overrides)
+    return WaitingRoom(**options)
+
+
+def _drop(drop_id: int, opens_in: timedelta) -> Drop:
+    now = datetime.now(timezone.utc)
+    return Drop(
+        id=drop_id,
+        name="Queue",
+        capacity=1,
+        claim_window_start=now + opens_in,
+        claim_window_end=now + opens_in + timedelta(hours=1),
+    )
+
+
+def test_tickets_are_ordered_and_reissued_to_the_same_user():
+    room = _room()
+    drop = _drop(1, timedelta(minutes=5))
+    sequences = [room.issue(drop=drop, user_id=user_id)[1].sequence for user_id in (7, 8, 7, 9)]
+    assert sequences == [1, 2, 1, 3]
+    assert room.stats()["issued"] == 3
+
+
+def test_admission_opens_with_the_window_at_the_configured_rate():
+    room = _room()
+    drop = _drop(1, timedelta(0))
+    for user_id in range(1, 6):
+        _, ticket = room.issue(drop=drop, user_id=user_id)
+    assert ticket.sequence == 5
+    opens_at = room.opens_at(drop.id)
+    assert opens_at == drop.claim_window_start.timestamp()
+
+    before_open = room.admission(ticket, opens_at=opens_at, now=opens_at - 10)
+    assert not before_open.admitted
+    assert before_open.retry_after == pytest.approx(10 + 0.3)
+    # Burst 2 at opening, then 10 per second: sequence 5 at +0.3s.
+    assert room.admission(ticket, opens_at=opens_at, now=opens_at + 0.15).ahead == 1
+    assert room.admission(ticket, opens_at=opens_at, now=opens_at + 0.31).admitted
+
+
+def test_closed_drops_are_forgotten():
+    room = _room()
+    closed = _drop(1, timedelta(hours=-2))
+    room.issue(drop=closed, user_id=1)
+    assert room.stats()["drops"] == 1
+
+    room.issue(drop=_drop(2, timedelta(0)), user_id=1)
+    assert room.stats()["drops"] == 1
+    assert room.opens_at(closed.id) is None
+
+
+def test_tampered_or_foreign_tickets_are_rejected():
+    room = _room()
+    token, _ = room.issue(drop=_drop(1, timedelta(0)), user_id=1)
+    assert room.verify(token, drop_id=1, user_id=1).sequence == 1
+
+    body, signature = token.rsplit(".", 1)
+    foreign, _ = _room(secret_key="other").issue(drop=_drop(1, timedelta(0)), user_id=1)
+    for bad, kwargs in (
+        (token, {"drop_id": 2}),
+        (token, {"drop_id": 1, "user_id": 2}),
+        (f"{body}x.{signature}", {"drop_id": 1}),
+        (foreign, {"drop_id": 1}),
+        ("garbage", {"drop_id": 1}),
+    ):
+        with pytest.raises(InvalidTicketError):
+            room.verify(bad, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_claim_slots_bound_concurrent_claims():
+    room = _room()
+    async with room.claim_slot(1):
+        with pytest.raises(ClaimSlotsBusyError):
+            async with room.claim_slot(1):
+                pass
+        async with room.claim_slot(2):
+            pass
+    async with room.claim_slot(1):
+        pass
+    assert room.stats()["rejected_busy"] == 1
+
+
+@pytest.mark.asyncio
+async def test_claims_need_an_admitted_ticket_when_enabled(
+    async_session, client: AsyncClient, monkeypatch
+):
+    monkeypatch.setattr(settings, "waiting_room_enabled", True)
+    monkeypatch.setattr(waiting_room, "burst", 1)
+    now = datetime.now(timezone.utc)
+    drop = Drop(
+        name="Waiting room",
+        capacity=2,
+        claim_window_start=now - timedelta(seconds=1),
+        claim_window_end=now + timedelta(hours=1),
+    )
+    async_session.add(drop)
+    await async_session.commit()
+
+    outsider = await client.post(
+        "/api/auth/signup",
+        json={"email": "waiting-room-outsider@example.com", "password": "waitingpass"},
+    )
+    outsider_auth = {"Authorization": f"Bearer {outsider.json()['token']['access_token']}"}
+    issued = waiting_room.stats()["issued"]
+    not_joined = await client.post(f"/api/drops/{drop.id}/queue", headers=outsider_auth)
+    assert not_joined.status_code == 403
+    assert waiting_room.stats()["issued"] == issued
+
+    headers = []
+    for idx in range(2):
+        response = await client.post(
+            "/api/auth/signup",
+            json={"email": f"waiting-room-{idx}@example.com", "password": "waitingpass"},
+        )
+        auth = {"Authorization": f"Bearer {response.json()['token']['access_token']}"}
+        await client.post(f"/api/drops/{drop.id}/join", headers=auth)
+        headers.append(auth)
+
+    # Opened a second ago: burst 1 plus ~50/s admits both, so slow the rate.
+    monkeypatch.setattr(waiting_room, "admit_per_second", 0.01)
+    first = (await client.post(f"/api/drops/{drop.id}/queue", headers=headers[0])).json()
+    second = (await client.post(f"/api/drops/{drop.id}/queue", headers=headers[1])).json()
+    assert (first["position"], first["admitted"]) == (1, True)
+    assert (second["position"], second["admitted"], second["ahead"]) == (2, False, 0)
+
+    status = await client.get(f"/api/drops/{drop.id}/queue", params={"ticket": second["ticket"]})
+    assert status.json()["admitted"] is False
+    assert int(status.headers["Retry-After"]) >= 1
+
+    no_ticket = await client.post(f"/api/drops/{drop.id}/claim", headers=headers[0])
+    assert no_ticket.status_code == 403
+    waiting = await client.post(
+        f"/api/drops/{drop.id}/claim",
+        headers={**headers[1], QUEUE_TICKET_HEADER: second["ticket"]},
+    )
+    assert waiting.status_code == 429 and "Retry-After" in waiting.headers
+    claimed = await client.post(
+        f"/api/drops/{drop.id}/claim",
+        headers={**headers[0], QUEUE_TICKET_HEADER: first["ticket"]},
+    )
+    assert claimed.status_code == 200
+
+    # Moving the window moves the queue; the ticket does not carry it.
+    drop.claim_window_start = now + timedelta(minutes=30)
+    await async_session.commit()
+    moved = await client.post(
+        f"/api/drops/{drop.id}/claim",
+        headers={**headers[1], QUEUE_TICKET_HEADER: second["ticket"]},
+    )
+    assert moved.status_code == 429
+    assert int(moved.headers["Retry-After"]) > 29 * 60
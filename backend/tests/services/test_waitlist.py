@@ -4,10 +4,13 @@ from datetime import datetime, timedelta, timezone
 
 import pytest
 
+from app import crud
+from app.core.priority import PriorityScorer, compute_coefficients
 from app.core.security import get_password_hash
 from app.models.drop import Drop
 from app.models.user import User
-from app.services.waitlist import WaitlistService
+from app.services.allocation import AllocationService
+from app.services.waitlist import CapacityExceededError, WaitlistService
 
 
 @pytest.mark.asyncio
@@ -41,3 +44,402 @@ async def test_join_waitlist_idempotent(async_session):
     assert second_entry.id == entry.id
     assert second_entry.state == WaitlistService.JOINED_STATE
 
+
+@pytest.mark.asyncio
+async def test_claim_position_respects_priority_ordering(async_session):
+    now = datetime.now(timezone.utc)
+    drop = Drop(
+        name="Ranked Drop",
+        description="Position check",
+        capacity=2,
+        claim_window_start=now - timedelta(hours=1),
+        claim_window_end=now + timedelta(hours=1),
+        is_active=True,
+    )
+    users = [
+        User(email=f"ranked{idx}@example.com", hashed_password="x", is_active=True)
+        for idx in range(3)
+    ]
+    async_session.add_all([drop, *users])
+    await async_session.flush()
+
+    service = WaitlistService(async_session)
+    # Exercise the live ranking path rather than the settled allocation.
+    service.allocations = None
+    entries = []
+    for user in users:
+        entry, _ = await service.join_waitlist(user=user, drop=drop)
+        entries.append(entry)
+    for score, entry in zip((10.5, 30.25, 20.125), entries):
+        entry.priority_score = score
+    await async_session.flush()
+
+    top_entry, position = await service.claim_waitlist_entry(user=users[1], drop=drop)
+    assert position == 1
+    assert top_entry.claim_code
+
+    with pytest.raises(CapacityExceededError):
+        # Claimed entries leave the joined ordering, so users[0] is now second
+        # behind users[2]; shrinking capacity pushes it past the cut-off.
+        drop.capacity = 1
+        await service.claim_waitlist_entry(user=users[0], drop=drop)
+
+    with pytest.raises(CapacityExceededError):
+        # users[2] is first in line, but the only unit is already claimed.
+        await service.claim_waitlist_entry(user=users[2], drop=drop)
+
+    drop.capacity = 2
+    _, position = await service.claim_waitlist_entry(user=users[2], drop=drop)
+    assert position == 1
+    assert (drop.claimed_count, drop.joined_count) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_join_and_leave_upsert_transitions(async_session):
+    user = User(email="upsert@example.com", hashed_password="x", is_active=True)
+    now = datetime.now(timezone.utc)
+    drop = Drop(
+        name="Upsert Drop",
+        capacity=10,
+        claim_window_start=now + timedelta(hours=1),
+        claim_window_end=now + timedelta(hours=2),
+        is_active=True,
+    )
+    async_session.add_all([user, drop])
+    await async_session.flush()
+
+    service = WaitlistService(async_session)
+    entry, created = await service.join_waitlist(user=user, drop=drop)
+    assert created is True
+    first_joined_at = entry.joined_at
+
+    left = await service.leave_waitlist(user=user, drop=drop)
+    assert left.id == entry.id and left.state == WaitlistService.LEFT_STATE
+    assert (await service.leave_waitlist(user=user, drop=drop)).state == WaitlistService.LEFT_STATE
+
+    rejoined, created = await service.join_waitlist(user=user, drop=drop)
+    assert created is False
+    assert rejoined.id == entry.id
+    assert rejoined.state == WaitlistService.JOINED_STATE
+    assert rejoined.joined_at > first_joined_at
+
+    other = User(email="upsert-other@example.com", hashed_password="x", is_active=True)
+    async_session.add(other)
+    await async_session.flush()
+    assert await service.leave_waitlist(user=other, drop=drop) is None
+
+
+@pytest.mark.asyncio
+async def test_claim_uses_settled_allocation(async_session):
+    now = datetime.now(timezone.utc)
+    drop = Drop(
+        name="Settled Drop",
+        capacity=2,
+        claim_window_start=now - timedelta(hours=1),
+        claim_window_end=now + timedelta(hours=1),
+        is_active=True,
+    )
+    users = [
+        User(email=f"settled{idx}@example.com", hashed_password="x", is_active=True)
+        for idx in range(4)
+    ]
+    async_session.add_all([drop, *users])
+    await async_session.flush()
+
+    service = WaitlistService(async_session)
+    entries = []
+    for user in users:
+        entry, _ = await service.join_waitlist(user=user, drop=drop)
+        entries.append(entry)
+    for score, entry in zip((10.5, 30.25, 20.125, 5.0), entries):
+        entry.priority_score = score
+    await async_session.flush()
+
+    assert await AllocationService(async_session).settle(drop) == 2
+    assert drop.settled_at is not None
+    allocation = await crud.get_drop_allocation(async_session, drop_id=drop.id, user_id=users[1].id)
+    assert allocation.rank == 1
+    assert allocation.claim_code == service.generate_claim_code(
+        user=users[1], drop=drop, entry=entries[1]
+    )
+
+    with pytest.raises(CapacityExceededError):
+        await service.claim_waitlist_entry(user=users[0], drop=drop)
+
+    claimed, position = await service.claim_waitlist_entry(user=users[1], drop=drop)
+    assert position == 1
+    assert claimed.claim_code == allocation.claim_code
+
+    # A leave hands the freed slot to the best unallocated entry.
+    await service.leave_waitlist(user=users[2], drop=drop)
+    _, position = await service.claim_waitlist_entry(user=users[0], drop=drop)
+    assert position == 2
+
+    # Shrinking capacity never revokes claimed slots.
+    drop.capacity = 1
+    await AllocationService(async_session).rebalance(drop)
+    allocations = await crud.list_drop_allocations(async_session, drop_id=drop.id)
+    assert [user_id for user_id, _, _ in allocations] == [users[1].id, users[0].id]
+
+    drop.capacity = 3
+    await AllocationService(async_session).rebalance(drop)
+    _, position = await service.claim_waitlist_entry(user=users[3], drop=drop)
+    assert position == 3
+
+
+@pytest.mark.asyncio
+async def test_claimed_entries_are_final_and_counted(async_session):
+    now = datetime.now(timezone.utc)
+    drop = Drop(
+        name="Counted Drop",
+        capacity=1,
+        claim_window_start=now - timedelta(hours=1),
+        claim_window_end=now + timedelta(hours=1),
+        is_active=True,
+    )
+    users = [
+        User(email=f"counted{idx}@example.com", hashed_password="x", is_active=True)
+        for idx in range(2)
+    ]
+    async_session.add_all([drop, *users])
+    await async_session.flush()
+
+    service = WaitlistService(async_session)
+    for score, user in zip((20.5, 10.25), users):
+        entry, _ = await service.join_waitlist(user=user, drop=drop)
+        entry.priority_score = score
+    await async_session.flush()
+    assert (drop.joined_count, drop.claimed_count) == (2, 0)
+
+    claimed, _ = await service.claim_waitlist_entry(user=users[0], drop=drop)
+    assert (drop.joined_count, drop.claimed_count) == (1, 1)
+
+    left = await service.leave_waitlist(user=users[0], drop=drop)
+    assert left.state == WaitlistService.CLAIMED_STATE
+    rejoined, created = await service.join_waitlist(user=users[0], drop=drop)
+    assert created is False
+    assert rejoined.state == WaitlistService.CLAIMED_STATE
+    assert rejoined.claim_code == claimed.claim_code
+    assert (drop.joined_count, drop.claimed_count) == (1, 1)
+
+    assert await crud.reserve_claim_slot(async_session, drop.id) is False
+
+
+@pytest.mark.asyncio
+async def test_rescore_drop_matches_scalar_scores(async_session):
+    now = datetime.now(timezone.utc)
+    drop = Drop(
+        name="Rescored Drop",
+        capacity=10,
+        claim_window_start=now + timedelta(hours=1),
+        claim_window_end=now + timedelta(hours=2),
+        is_active=True,
+    )
+    users = [
+        User(email=f"rescore{idx}@example.com", hashed_password="x", is_active=True)
+        for idx in range(5)
+    ]
+    async_session.add_all([drop, *users])
+    await async_session.flush()
+
+    service = WaitlistService(async_session)
+    entries = [(await service.join_waitlist(user=user, drop=drop))[0] for user in users]
+
+    drop.capacity = 37
+    service.scorer = PriorityScorer(compute_coefficients("ffeeddcc"))
+    assert await service.rescore_drop(drop=drop, chunk_size=2) == len(users)
+
+    await async_session.refresh(drop)
+    for user, entry in zip(users, entries):
+        await async_session.refresh(entry)
+        expected = service.calculate_priority_score(user=user, drop=drop, joined_at=entry.joined_at)
+        assert float(entry.priority_score) == round(expected, 6)
+
+
+@pytest.mark.asyncio
+async def test_bulk_rejoin_skips_entries_joined_concurrently(async_session, monkeypatch):
+    user = User(email="bulk-race@example.com", hashed_password="x", is_active=True)
+    now = datetime.now(timezone.utc)
+    drop = Drop(
+        name="Bulk Race Drop",
+        capacity=10,
+        claim_window_start=now + timedelta(hours=1),
+        claim_window_end=now + timedelta(hours=2),
+        is_active=True,
+    )
+    async_session.add_all([user, drop])
+    await async_session.flush()
+
+    service = WaitlistService(async_session)
+    await service.join_waitlist(user=user, drop=drop)
+    await service.leave_waitlist(user=user, drop=drop)
+    original = crud.get_waitlist_states
+
+    async def stale_states(session, **kwargs):
+        states = await original(session, **kwargs)
+        # The user rejoins on their own after the bulk request read "left".
+        await WaitlistService(session).join_waitlist(user=user, drop=drop)
+        return states
+
+    monkeypatch.setattr(crud, "get_waitlist_states", stale_states)
+    (result,) = await service.bulk_join_waitlist(drop=drop, references=[user.id])
+
+    assert result.status == WaitlistService.BULK_ALREADY_JOINED
+    await async_session.refresh(drop)
+    assert drop.joined_count == 1
+
+
+@pytest.mark.asyncio
+async def test_claim_on_a_full_drop_does_not_refill(async_session, monkeypatch):
+    now = datetime.now(timezone.utc)
+    drop = Drop(
+        name="Full Drop",
+        capacity=1,
+        claim_window_start=now - timedelta(hours=1),
+        claim_window_end=now + timedelta(hours=1),
+        is_active=True,
+    )
+    users = [
+        User(email=f"full{idx}@example.com", hashed_password="x", is_active=True)
+        for idx in range(2)
+    ]
+    async_session.add_all([drop, *users])
+    await async_session.flush()
+
+    service = WaitlistService(async_session)
+    for score, user in zip((20.5, 10.25), users):
+        entry, _ = await service.join_waitlist(user=user, drop=drop)
+        entry.priority_score = score
+    await async_session.flush()
+    await AllocationService(async_session).settle(drop)
+
+    async def no_refill(drop):
+        raise AssertionError("claim path must not refill a full drop")
+
+    monkeypatch.setattr(service.allocations, "refill", no_refill)
+    with pytest.raises(CapacityExceededError):
+        await service.claim_waitlist_entry(user=users[1], drop=drop)
+
+
+@pytest.mark.asyncio
+async def test_refill_keeps_allocation_ranks_dense(async_session):
+    now = datetime.now(timezone.utc)
+    drop = Drop(
+        name="Dense Drop",
+        capacity=2,
+        claim_window_start=now - timedelta(hours=1),
+        claim_window_end=now + timedelta(hours=1),
+        is_active=True,
+    )
+    users = [
+        User(email=f"dense{idx}@example.com", hashed_password="x", is_active=True)
+        for idx in range(3)
+    ]
+    async_session.add_all([drop, *users])
+    await async_session.flush()
+
+    service = WaitlistService(async_session)
+    for score, user in zip((30.5, 20.25, 10.125), users):
+        entry, _ = await service.join_waitlist(user=user, drop=drop)
+        entry.priority_score = score
+    await async_session.flush()
+    await AllocationService(async_session).settle(drop)
+
+    await service.leave_waitlist(user=users[0], drop=drop)
+    allocations = await crud.list_drop_allocations(async_session, drop_id=drop.id)
+    assert [(user_id, rank) for user_id, rank, _ in allocations] == [
+        (users[1].id, 1),
+        (users[2].id, 2),
+    ]
+    _, position = await service.claim_waitlist_entry(user=users[2], drop=drop)
+    assert position == 2
+
+
+@pytest.mark.asyncio
+async def test_release_in_the_middle_renumbers_following_ranks(async_session):
+    now = datetime.now(timezone.utc)
+    drop = Drop(
+        name="Middle Release Drop",
+        capacity=3,
+        claim_window_start=now - timedelta(hours=1),
+        claim_window_end=now + timedelta(hours=1),
+        is_active=True,
+    )
+    users = [
+        User(email=f"middle{idx}@example.com", hashed_password="x", is_active=True)
+        for idx in range(5)
+    ]
+    async_session.add_all([drop, *users])
+    await async_session.flush()
+
+    service = WaitlistService(async_session)
+    for score, user in zip((50.5, 40.25, 30.125, 20.0625, 10.0), users):
+        entry, _ = await service.join_waitlist(user=user, drop=drop)
+        entry.priority_score = score
+    await async_session.flush()
+    await AllocationService(async_session).settle(drop)
+
+    await service.leave_waitlist(user=users[1], drop=drop)
+    await service.leave_waitlist(user=users[2], drop=drop)
+    allocations = await crud.list_drop_allocations(async_session, drop_id=drop.id)
+    assert [(user_id, rank) for user_id, rank, _ in allocations] == [
+        (users[0].id, 1),
+        (users[3].id, 2),
+        (users[4].id, 3),
+    ]
+    assert await crud.renumber_drop_allocations(async_session, drop_id=drop.id) == 3
+
+
+@pytest.mark.asyncio
+async def test_upsert_join_reports_rejoins_and_claimed_entries(async_session):
+    now = datetime.now(timezone.utc)
+    drop = Drop(
+        name="Upsert Flags Drop",
+        capacity=5,
+        claim_window_start=now - timedelta(hours=1),
+        claim_window_end=now + timedelta(hours=1),
+        is_active=True,
+    )
+    rejoiner = User(email="flags-rejoin@example.com", hashed_password="x", is_active=True)
+    claimer = User(email="flags-claimed@example.com", hashed_password="x", is_active=True)
+    async_session.add_all([drop, rejoiner, claimer])
+    await async_session.flush()
+
+    def join(user, score=1.0):
+        return crud.upsert_waitlist_join(
+            async_session,
+            user_id=user.id,
+            drop_id=drop.id,
+            priority_score=score,
+            now=datetime.now(timezone.utc),
+        )
+
+    service = WaitlistService(async_session)
+    entry, created, changed = await join(rejoiner)
+    assert (created, changed) == (True, True)
+    _, created, changed = await join(rejoiner)
+    assert (created, changed) == (False, False)
+
+    await service.leave_waitlist(user=rejoiner, drop=drop)
+    rejoined, created, changed = await join(rejoiner, score=2.0)
+    assert (rejoined.id, rejoined.state, created, changed) == (entry.id, "joined", False, True)
+    assert float(rejoined.priority_score) == 2.0
+
+    await service.leave_waitlist(user=rejoiner, drop=drop)
+    await async_session.refresh(drop)
+    joined_before = drop.joined_count
+    _, created = await service.join_waitlist(user=rejoiner, drop=drop)
+    await async_session.refresh(drop)
+    assert created is False and drop.joined_count == joined_before + 1
+
+    await service.join_waitlist(user=claimer, drop=drop)
+    await service.claim_waitlist_entry(user=claimer, drop=drop)
+    await async_session.refresh(drop)
+    counts = (drop.joined_count, drop.claimed_count)
+    claimed, created, changed = await join(claimer)
+    assert (claimed.state, created, changed) == ("claimed", False, False)
+
+    _, created = await service.join_waitlist(user=claimer, drop=drop)
+    assert created is False
+    await async_session.refresh(drop)
+    assert (drop.joined_count, drop.claimed_count) == counts
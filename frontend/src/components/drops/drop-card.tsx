@@ -155,6 +155,14 @@ export const DropCard = ({ drop }: DropCardProps) => {
               <span className="font-semibold text-emerald-100">
                 {drop.capacity}
               </span>
+              {typeof drop.remaining === "number" && (
+                <>
+                  {" · "}Kalan{" "}
+                  <span className="font-semibold text-emerald-100">
+                    {drop.remaining}
+                  </span>
+                </>
+              )}
             </p>
           </div>
           <Link
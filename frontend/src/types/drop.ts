@@ -6,6 +6,9 @@ export interface Drop {
   claim_window_start: string;
   claim_window_end: string;
   is_active: boolean;
+  joined_count?: number;
+  claimed_count?: number;
+  remaining?: number;
   created_at: string;
   updated_at: string;
 }